@@ -0,0 +1,39 @@
+"""Bootstrap Django for standalone benchmark scripts."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup(test_database: bool = False):
+    """Configure Django; with ``test_database`` create a throwaway database.
+
+    On SQLite the throwaway database is a file rather than shared memory so
+    that several threads can write to it.
+    """
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+    from django.conf import settings
+
+    django.setup()
+    if not test_database:
+        return None
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    workdir = Path(tempfile.mkdtemp(prefix="p2p-bench-"))
+    settings.MEDIA_ROOT = workdir / "media"
+    db = settings.DATABASES["default"]
+    if db["ENGINE"].endswith("sqlite3"):
+        db.setdefault("TEST", {})["NAME"] = str(workdir / "bench.sqlite3")
+        db.setdefault("OPTIONS", {})["timeout"] = 60
+        if django.VERSION >= (5, 1):
+            # Take the write lock at BEGIN so concurrent writers queue instead of failing
+            db["OPTIONS"]["transaction_mode"] = "IMMEDIATE"
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    return lambda: connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,74 @@
+"""Minimal HTTP client and stats helpers for benchmarks that drive a running server."""
+import http.client
+import json
+import uuid
+from urllib.parse import urlsplit
+
+
+class Client:
+    """One keep-alive connection to ``base_url``; use one per thread."""
+
+    def __init__(self, base_url: str, timeout: float = 120):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._connect = lambda: connection_class(parts.hostname, parts.port, timeout=timeout)
+        self._prefix = parts.path.rstrip("/")
+        self._connection = self._connect()
+
+    def request(self, method: str, path: str, body: bytes = None, headers=None):
+        """``(status, body bytes)``; reconnects once if the server closed the connection."""
+        for attempt in (1, 2):
+            try:
+                self._connection.request(method, self._prefix + path, body=body, headers=headers or {})
+                response = self._connection.getresponse()
+                return response.status, response.read()
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest, BrokenPipeError,
+                    ConnectionResetError):
+                self._connection.close()
+                self._connection = self._connect()
+                if attempt == 2:
+                    raise
+
+    def json(self, method: str, path: str, payload=None, token: str = None):
+        """``(status, decoded JSON or None)``."""
+        headers = {"Accept": "application/json"}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers["Content-Type"] = "application/json"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        status, data = self.request(method, path, body, headers)
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+
+    def close(self):
+        self._connection.close()
+
+
+def multipart(fields=None, files=None):
+    """``(body, content type)`` of a multipart/form-data payload.
+
+    ``files`` maps field names to ``(filename, content bytes, content type)``.
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in (fields or {}).items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content, content_type) in (files or {}).items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode() + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (NaN when empty)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
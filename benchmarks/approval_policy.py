@@ -0,0 +1,122 @@
+"""Approval routing cost as the number of ApprovalPolicy rules grows.
+
+For each rule count, creates that many random amount/vendor rules and
+reports the compile time, the time per routing lookup through the compiled
+policy against a first-match scan of the rule list (checking both agree),
+and the wall time and queries of ``PurchaseRequest.approve``.
+
+    python -m benchmarks.approval_policy --rules 0 10 100 1000 10000
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from benchmarks._django import setup
+
+
+def scan(rules, amount, vendor):
+    """The uncompiled lookup: first rule in priority order matching the request."""
+    vendor = vendor.strip().casefold()
+    for rule in rules:
+        if rule.vendor and rule.vendor.strip().casefold() != vendor:
+            continue
+        if rule.min_amount is not None and amount < rule.min_amount:
+            continue
+        if rule.max_amount is not None and amount >= rule.max_amount:
+            continue
+        return rule.required_levels
+    return 0b11
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, nargs="+", default=[0, 10, 100, 1000, 5000])
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--approvals", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    teardown = setup(test_database=True)
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from core.models import ApprovalPolicy, PurchaseRequest, User
+    from core.services import approval_policy
+    from core.services.approval_policy import CompiledPolicy
+
+    rng = random.Random(1)
+    vendors = [f"Vendor {i}" for i in range(200)]
+    try:
+        staff = User.objects.create_user("bench-staff", role=User.ROLE_STAFF)
+        l1 = User.objects.create_user("bench-l1", role=User.ROLE_APPROVER_L1)
+        print(f"{'rules':>6} {'compile ms':>10} {'lookup us':>10} {'scan us':>10} {'approve ms':>11} {'queries':>8}  result")
+        failed = False
+        for count in args.rules:
+            ApprovalPolicy.objects.all().delete()
+            rules = []
+            for i in range(count):
+                low = Decimal(rng.randrange(0, 100000))
+                rules.append(
+                    ApprovalPolicy(
+                        name=f"rule {i}",
+                        priority=rng.randrange(1000),
+                        min_amount=low if rng.random() < 0.7 else None,
+                        max_amount=low + rng.randrange(1, 50000) if rng.random() < 0.7 else None,
+                        vendor=rng.choice(vendors) if rng.random() < 0.5 else "",
+                        required_levels=rng.choice((0b01, 0b10, 0b11)),
+                    )
+                )
+            # bulk_create skips ApprovalPolicy.save(), so invalidate once by hand
+            ApprovalPolicy.objects.bulk_create(rules)
+            approval_policy.policies_changed()
+            ordered = list(ApprovalPolicy.objects.order_by("priority", "id"))
+
+            started = time.perf_counter()
+            compiled = CompiledPolicy(ordered)
+            compile_seconds = time.perf_counter() - started
+
+            probes = [
+                (Decimal(rng.randrange(0, 16000000)) / 100, rng.choice(vendors) if rng.random() < 0.8 else "")
+                for _ in range(args.lookups)
+            ]
+            started = time.perf_counter()
+            fast = [compiled.required_levels(amount, vendor) for amount, vendor in probes]
+            lookup_seconds = time.perf_counter() - started
+            scanned = probes[:2000]
+            started = time.perf_counter()
+            slow = [scan(ordered, amount, vendor) for amount, vendor in scanned]
+            scan_seconds = time.perf_counter() - started
+            same = fast[: len(slow)] == slow
+
+            # Requests routed to level 1 with the current rules
+            requests = []
+            while len(requests) < args.approvals:
+                amount, vendor = rng.choice(probes)
+                requests.append(
+                    PurchaseRequest.objects.create(
+                        title="bench",
+                        amount=amount,
+                        vendor=vendor,
+                        created_by=staff,
+                        required_levels=approval_policy.required_levels(amount, vendor) | 0b01,
+                    )
+                )
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for pr in requests:
+                    pr.approve(l1)
+                approve_seconds = time.perf_counter() - started
+
+            failed |= not same
+            print(
+                f"{count:6d} {compile_seconds * 1000:10.1f} {lookup_seconds / len(probes) * 1e6:10.2f} "
+                f"{scan_seconds / len(scanned) * 1e6:10.2f} {approve_seconds / len(requests) * 1000:11.2f} "
+                f"{len(queries) / len(requests):8.1f}  {'ok' if same else 'MISMATCH'}"
+            )
+    finally:
+        teardown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
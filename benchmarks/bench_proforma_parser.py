@@ -0,0 +1,78 @@
+"""Throughput and accuracy of the proforma parser on a synthetic corpus.
+
+    python -m benchmarks.bench_proforma_parser --documents 2000
+    python -m benchmarks.bench_proforma_parser --parser mypkg.parsers:parse  # compare another parser
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+from django.utils.module_loading import import_string  # noqa: E402
+
+from benchmarks.proforma_corpus import generate  # noqa: E402
+
+
+def _item_key(item):
+    return (item["name"].lower(), int(item["quantity"]), round(float(item["unit_price"]), 2))
+
+
+def score(parsed, expected):
+    got = Counter(_item_key(i) for i in parsed.get("items", []))
+    want = Counter(_item_key(i) for i in expected["items"])
+    hits = sum((got & want).values())
+    return {
+        "vendor": parsed.get("vendor", "") == expected["vendor"],
+        "terms": parsed.get("terms", "") == expected["terms"],
+        "total": abs(float(parsed.get("total", 0)) - expected["total"]) <= 0.01,
+        "item_hits": hits,
+        "item_got": sum(got.values()),
+        "item_want": sum(want.values()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds; the best round is reported.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--parser", default="core.services.doc_processing.parse_proforma_text",
+                        help="Dotted path of a callable taking proforma text and returning the metadata dict.")
+    args = parser.parse_args(argv)
+
+    parse = import_string(args.parser.replace(":", "."))
+    corpus = list(generate(args.documents, seed=args.seed))
+    line_count = sum(text.count("\n") + 1 for text, _ in corpus)
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for text, _ in corpus:
+            parse(text)
+        best = min(best, time.perf_counter() - start)
+
+    totals = Counter()
+    for text, expected in corpus:
+        for key, value in score(parse(text), expected).items():
+            totals[key] += int(value)
+
+    n = len(corpus)
+    precision = totals["item_hits"] / totals["item_got"] if totals["item_got"] else 0.0
+    recall = totals["item_hits"] / totals["item_want"] if totals["item_want"] else 0.0
+    print(f"parser:          {args.parser}")
+    print(f"documents:       {n} ({line_count} lines)")
+    print(f"throughput:      {line_count / best:,.0f} lines/sec ({n / best:,.0f} docs/sec)")
+    print(f"vendor accuracy: {totals['vendor'] / n:.1%}")
+    print(f"terms accuracy:  {totals['terms'] / n:.1%}")
+    print(f"total accuracy:  {totals['total'] / n:.1%}")
+    print(f"item precision:  {precision:.1%}")
+    print(f"item recall:     {recall:.1%}")
+
+
+if __name__ == "__main__":
+    main()
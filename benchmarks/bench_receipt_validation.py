@@ -0,0 +1,57 @@
+"""Throughput and accuracy of receipt validation on a synthetic corpus.
+
+Each receipt is checked against a PO with its own vendor and total (should
+match) and against one with a different total (should not).
+
+    python -m benchmarks.bench_receipt_validation --documents 2000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+from benchmarks.proforma_corpus import generate_receipts  # noqa: E402
+from core.services.doc_processing import validate_receipt_text  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds; the best round is reported.")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    corpus = list(generate_receipts(args.documents, seed=args.seed))
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for text, expected in corpus:
+            validate_receipt_text([text], expected)
+        best = min(best, time.perf_counter() - start)
+
+    accepted = rejected = 0
+    misses = []
+    for text, expected in corpus:
+        if validate_receipt_text([text], expected)["matches"]:
+            accepted += 1
+        else:
+            misses.append(text.splitlines()[-2])
+        wrong_total = dict(expected, total=expected["total"] + 1)
+        rejected += not validate_receipt_text([text], wrong_total)["matches"]
+
+    n = len(corpus)
+    print(f"documents:        {n}")
+    print(f"throughput:       {n / best:,.0f} receipts/sec")
+    print(f"matching PO:      {accepted / n:.1%} accepted")
+    print(f"wrong total PO:   {rejected / n:.1%} rejected")
+    for line in sorted(set(misses))[:10]:
+        print(f"  missed total:   {line}")
+    return 0 if accepted == n and rejected == n else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
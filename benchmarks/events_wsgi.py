@@ -0,0 +1,83 @@
+"""Check that GET /api/requests/events/ streams under WSGI instead of buffering.
+
+Runs the endpoint through Django's WSGI handler, as gunicorn's default
+``config.wsgi`` worker does, and reads the body chunk by chunk: the first
+bytes must arrive right away, an event emitted while the stream is open must
+come through before the stream ends, and the stream must end after
+``EVENTS_WSGI_STREAM_SECONDS``. Fails with a non-zero exit otherwise.
+
+    python -m benchmarks.events_wsgi --seconds 3
+"""
+import argparse
+import io
+import time
+
+from benchmarks._django import setup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0, help="EVENTS_WSGI_STREAM_SECONDS for the run")
+    args = parser.parse_args(argv)
+
+    teardown = setup(test_database=True)
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test.utils import override_settings
+
+    from core.authentication import issue_stream_ticket
+    from core.models import PurchaseRequest, RequestEvent, User
+    from core.services import events
+
+    failed = False
+
+    def check(name, ok, detail=""):
+        nonlocal failed
+        failed |= not ok
+        print(f"{name:40} {detail:>16}  {'ok' if ok else 'FAILED'}")
+
+    try:
+        staff = User.objects.create_user("events-staff", role=User.ROLE_STAFF)
+        pr = PurchaseRequest.objects.create(title="events", amount=1, created_by=staff)
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": "/api/requests/events/",
+            "QUERY_STRING": f"ticket={issue_stream_ticket(staff)}",
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": io.StringIO(),
+        }
+        statuses = []
+        settings = dict(EVENTS_WSGI_STREAM_SECONDS=args.seconds, EVENTS_POLL_INTERVAL=0.1, EVENTS_COMMIT_LAG=0)
+        with override_settings(**settings):
+            started = time.monotonic()
+            body = WSGIHandler()(environ, lambda status, headers: statuses.append(status))
+            chunks = iter(body)
+            first = next(chunks)
+            first_seconds = time.monotonic() - started
+            check("status", statuses == ["200 OK"], statuses[0] if statuses else "-")
+            check("first bytes before the stream ends", first_seconds < args.seconds / 2, f"{first_seconds * 1000:.0f} ms")
+
+            events.emit(RequestEvent.KIND_CREATED, [pr], data={pr.pk: {"title": pr.title}})
+            received = None
+            for chunk in chunks:
+                if b"event: created" in chunk:
+                    received = time.monotonic() - started
+                    break
+            check("event emitted while open is streamed", received is not None and received < args.seconds,
+                  "-" if received is None else f"{received * 1000:.0f} ms")
+
+            for _ in chunks:
+                pass
+            body.close()
+            total = time.monotonic() - started
+            check("stream ends after the WSGI cap", args.seconds <= total < args.seconds + 2, f"{total:.1f} s")
+    finally:
+        teardown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
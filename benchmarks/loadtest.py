@@ -0,0 +1,305 @@
+"""Drive the procure-to-pay endpoints of a running server with a weighted mix of operations.
+
+Virtual users (threads) log in as the users written by ``manage.py seed_p2p``
+and repeatedly pick an operation: token, list, create, approve, reject or
+submit_receipt. Approvers work through pending requests seen in their lists
+and in create responses; staff submit receipts for their approved requests.
+Reports throughput and p50/p95/p99 latency per endpoint; ``--max-p95-ms``
+and server errors (5xx) make the run fail, for use as a pre-deploy check.
+
+    python manage.py seed_p2p --requests 5000
+    gunicorn config.wsgi:application --workers 4 &
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8000 --duration 60 --concurrency 16
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from benchmarks._http import Client, multipart, percentile
+from core.services.sample_documents import PRODUCTS, VENDORS, receipt_pdf
+
+OPERATIONS = ("token", "list", "create", "approve", "reject", "submit_receipt")
+DEFAULT_MIX = "token=5,list=40,create=15,approve=20,reject=5,submit_receipt=15"
+STAFF, APPROVER_L1, APPROVER_L2, FINANCE = "staff", "approver_l1", "approver_l2", "finance"
+LEVELS = {APPROVER_L1: 1, APPROVER_L2: 2}
+
+
+def parse_mix(value):
+    weights = dict.fromkeys(OPERATIONS, 0.0)
+    for part in filter(None, value.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in weights:
+            raise SystemExit(f"Unknown operation {name!r} in --mix; choose from {', '.join(OPERATIONS)}.")
+        weights[name] = float(weight)
+    return weights
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.skipped = defaultdict(int)
+
+    def record(self, operation, status, elapsed):
+        with self._lock:
+            self.statuses[operation][status] += 1
+            if status < 400:
+                self.latencies[operation].append(elapsed)
+
+    def skip(self, operation):
+        with self._lock:
+            self.skipped[operation] += 1
+
+
+class Workload:
+    """State shared by the virtual users: tokens and the request ids they can act on."""
+
+    def __init__(self, credentials, stats, rng):
+        self.password = credentials["password"]
+        self.users = {role: list(names) for role, names in credentials["users"].items() if names}
+        for role in (STAFF, APPROVER_L1, APPROVER_L2):
+            if not self.users.get(role):
+                raise SystemExit(f"The credentials file has no {role} users; run manage.py seed_p2p first.")
+        self.stats = stats
+        self.rng = rng
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self._pending = {level: set() for level in LEVELS.values()}
+        self._approved = defaultdict(dict)  # staff username -> {request id: (vendor, amount)}
+
+    def _timed(self, operation, call):
+        start = time.perf_counter()
+        status, data = call()
+        self.stats.record(operation, status, time.perf_counter() - start)
+        return status, data
+
+    def login(self, client, username):
+        status, data = self._timed(
+            "token",
+            lambda: client.json("POST", "/api/auth/token/", {"username": username, "password": self.password}),
+        )
+        if status != 200:
+            return None
+        with self._lock:
+            self._tokens[username] = data["access"]
+        return data["access"]
+
+    def token(self, client, username):
+        with self._lock:
+            token = self._tokens.get(username)
+        return token or self.login(client, username)
+
+    def call(self, client, operation, username, method, path, payload=None, **kwargs):
+        """Authenticated JSON call; logs in again once when the token has expired."""
+        for _ in range(2):
+            token = self.token(client, username)
+            if token is None:
+                return 401, None
+            if "body" in kwargs:
+                headers = {"Authorization": f"Bearer {token}", "Content-Type": kwargs["content_type"]}
+                status, raw = self._timed(operation, lambda: client.request(method, path, kwargs["body"], headers))
+                try:
+                    data = json.loads(raw) if raw else None
+                except ValueError:
+                    data = None
+            else:
+                status, data = self._timed(operation, lambda: client.json(method, path, payload, token))
+            if status != 401:
+                return status, data
+            with self._lock:
+                self._tokens.pop(username, None)
+        return status, data
+
+    def _user(self, *roles):
+        role = self.rng.choice([r for r in roles if self.users.get(r)])
+        return role, self.rng.choice(self.users[role])
+
+    def _remember(self, role, username, rows):
+        with self._lock:
+            for row in rows:
+                if role in LEVELS and row.get("status") == "pending":
+                    self._pending[LEVELS[role]].add(row["id"])
+                elif role == STAFF and row.get("status") == "approved" and row.get("purchase_order"):
+                    self._approved[username][row["id"]] = (row.get("vendor") or "", row.get("amount"))
+
+    # Operations; each returns False when it had nothing to act on
+
+    def op_token(self, client):
+        self.login(client, self._user(*self.users)[1])
+        return True
+
+    def op_list(self, client, role=None, username=None):
+        if username is None:
+            role, username = self._user(STAFF, APPROVER_L1, APPROVER_L2, FINANCE)
+        status, data = self.call(client, "list", username, "GET", "/api/requests/?page_size=50")
+        if status == 200 and data:
+            self._remember(role, username, data.get("results", []))
+        return True
+
+    def op_create(self, client):
+        _, username = self._user(STAFF)
+        vendor = self.rng.choice(VENDORS)
+        items = [
+            {"name": name, "quantity": self.rng.randint(1, 5), "unit_price": f"{price:.2f}", "vendor": vendor}
+            for name, price in self.rng.sample(PRODUCTS, self.rng.randint(1, 3))
+        ]
+        amount = sum(item["quantity"] * float(item["unit_price"]) for item in items)
+        payload = {"title": f"Load test {items[0]['name']}", "description": "loadtest", "amount": f"{amount:.2f}",
+                   "items": items}
+        status, data = self.call(client, "create", username, "POST", "/api/requests/", payload)
+        if status == 201 and data:
+            with self._lock:
+                for pending in self._pending.values():
+                    pending.add(data["id"])
+        return True
+
+    def _review(self, client, operation):
+        role, username = self._user(APPROVER_L1, APPROVER_L2)
+        level = LEVELS[role]
+        with self._lock:
+            pk = self._pending[level].pop() if self._pending[level] else None
+        if pk is None:
+            self.op_list(client, role, username)
+            with self._lock:
+                pk = self._pending[level].pop() if self._pending[level] else None
+        if pk is None:
+            return False
+        payload = {"reason": "Load test"} if operation == "reject" else None
+        status, data = self.call(client, operation, username, "PATCH", f"/api/requests/{pk}/{operation}/", payload)
+        if status == 200 and data:
+            with self._lock:
+                if data["status"] != "pending":
+                    for pending in self._pending.values():
+                        pending.discard(pk)
+                if data["status"] == "approved" and data.get("purchase_order"):
+                    owner = data["created_by"]["username"]
+                    self._approved[owner][pk] = (data.get("vendor") or "", data.get("amount"))
+        return True
+
+    def op_approve(self, client):
+        return self._review(client, "approve")
+
+    def op_reject(self, client):
+        return self._review(client, "reject")
+
+    def op_submit_receipt(self, client):
+        with self._lock:
+            owners = [name for name, approved in self._approved.items() if approved]
+        if not owners:
+            # Approved requests are found through the owners' lists
+            self.op_list(client, STAFF, self.rng.choice(self.users[STAFF]))
+            return False
+        username = self.rng.choice(owners)
+        with self._lock:
+            if not self._approved[username]:
+                return False
+            pk = self.rng.choice(list(self._approved[username]))
+            vendor, amount = self._approved[username].pop(pk)
+        # Unique bytes per upload, like real receipts (no extraction cache hits)
+        content = receipt_pdf(int(time.time() * 1e6) % 10**9, vendor, amount or 0)
+        body, content_type = multipart(files={"receipt": (f"receipt-{pk}.pdf", content, "application/pdf")})
+        self.call(client, "submit_receipt", username, "POST", f"/api/requests/{pk}/submit_receipt/",
+                  body=body, content_type=content_type)
+        return True
+
+
+def run(args):
+    credentials = json.loads(Path(args.credentials).read_text(encoding="utf-8"))
+    weights = parse_mix(args.mix)
+    operations = [op for op in OPERATIONS if weights[op] > 0]
+    stats = Stats()
+    workload = Workload(credentials, stats, random.Random(args.seed))
+    deadline = time.monotonic() + args.duration
+    remaining = [args.operations] if args.operations else None
+    counter_lock = threading.Lock()
+
+    def virtual_user(index):
+        rng = random.Random(None if args.seed is None else args.seed + index)
+        client = Client(args.base_url)
+        try:
+            while time.monotonic() < deadline:
+                if remaining is not None:
+                    with counter_lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                operation = rng.choices(operations, weights=[weights[op] for op in operations])[0]
+                if not getattr(workload, f"op_{operation}")(client):
+                    stats.skip(operation)
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=virtual_user, args=(n,), daemon=True) for n in range(args.concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - start
+
+
+def report(stats, wall, args):
+    rows = []
+    for operation in OPERATIONS:
+        statuses = stats.statuses.get(operation)
+        if not statuses:
+            continue
+        latencies = stats.latencies[operation]
+        rows.append({
+            "endpoint": operation,
+            "requests": sum(statuses.values()),
+            "per_second": round(sum(statuses.values()) / wall, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "client_errors": sum(n for code, n in statuses.items() if 400 <= code < 500),
+            "server_errors": sum(n for code, n in statuses.items() if code >= 500),
+            "statuses": {str(code): n for code, n in sorted(statuses.items())},
+            "skipped": stats.skipped.get(operation, 0),
+        })
+    total = sum(row["requests"] for row in rows)
+    print(f"{args.base_url}: {total} requests in {wall:.1f}s ({total / wall:.1f}/s), concurrency {args.concurrency}")
+    print(f"{'endpoint':15} {'requests':>8} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'4xx':>5} {'5xx':>5}")
+    for row in rows:
+        print(f"{row['endpoint']:15} {row['requests']:8d} {row['per_second']:7.1f} {row['p50_ms']:8.1f} "
+              f"{row['p95_ms']:8.1f} {row['p99_ms']:8.1f} {row['client_errors']:5d} {row['server_errors']:5d}")
+    if args.report:
+        Path(args.report).write_text(json.dumps({"wall_seconds": round(wall, 2), "endpoints": rows}, indent=2))
+
+    failures = [f"{row['endpoint']}: {row['server_errors']} server error(s)" for row in rows if row["server_errors"]]
+    if args.max_p95_ms:
+        failures += [
+            f"{row['endpoint']}: p95 {row['p95_ms']} ms > {args.max_p95_ms} ms"
+            for row in rows
+            if row["p95_ms"] > args.max_p95_ms
+        ]
+    for failure in failures:
+        print(f"FAILED {failure}")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--credentials", default="seed_users.json", help="file written by manage.py seed_p2p")
+    parser.add_argument("--duration", type=float, help="seconds to run (default 60 unless --operations is given)")
+    parser.add_argument("--operations", type=int, help="stop after this many operations")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="relative weights of the operations")
+    parser.add_argument("--seed", type=int, help="random seed")
+    parser.add_argument("--report", help="also write the results as JSON to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="fail if any endpoint's p95 exceeds this")
+    args = parser.parse_args(argv)
+    if args.duration is None:
+        args.duration = float("inf") if args.operations else 60.0
+    stats, wall = run(args)
+    return report(stats, wall, args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
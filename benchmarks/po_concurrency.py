@@ -0,0 +1,78 @@
+"""Approve many requests concurrently and check the generated PO numbers.
+
+Each thread performs the final (L2) approval of its own request, which
+allocates a PO number. The run fails if any number is duplicated or the
+sequence has gaps. Runs against a throwaway copy of the configured database
+(use Postgres via DB_* env vars for real row-lock contention).
+
+    python -m benchmarks.po_concurrency --approvals 50
+"""
+import argparse
+import threading
+import time
+
+from benchmarks._django import setup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--approvals", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    teardown = setup(test_database=True)
+    from django.db import connection, transaction
+
+    from core.models import PurchaseOrder, PurchaseRequest, RequestItem, User
+    from core.services.purchase_orders import create_purchase_order
+
+    try:
+        staff = User.objects.create_user("bench-staff", role=User.ROLE_STAFF)
+        l1 = User.objects.create_user("bench-l1", role=User.ROLE_APPROVER_L1)
+        l2 = User.objects.create_user("bench-l2", role=User.ROLE_APPROVER_L2)
+        ids = []
+        for n in range(args.approvals):
+            pr = PurchaseRequest.objects.create(title=f"Bench {n}", amount=100, created_by=staff)
+            RequestItem.objects.create(request=pr, name="Widget", quantity=2, unit_price=50, vendor="ACME")
+            pr.approve(l1)
+            ids.append(pr.pk)
+
+        barrier = threading.Barrier(args.approvals)
+        errors = []
+
+        def approve(pk):
+            try:
+                pr = PurchaseRequest.objects.prefetch_related("items").get(pk=pk)
+                barrier.wait()
+                with transaction.atomic():
+                    pr.approve(l2)
+                    create_purchase_order(pr)
+            except Exception as e:  # reported below
+                errors.append(f"#{pk}: {e!r}")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=approve, args=(pk,)) for pk in ids]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        numbers = sorted(PurchaseOrder.objects.values_list("number", flat=True))
+        expected = [f"PO-{n:06d}" for n in range(1, args.approvals + 1)]
+        print(f"database:   {connection.vendor}")
+        print(f"approvals:  {args.approvals} in {elapsed:.2f}s")
+        print(f"errors:     {len(errors)}")
+        for error in errors[:5]:
+            print(f"  {error}")
+        print(f"POs:        {len(numbers)} ({len(set(numbers))} unique)")
+        ok = not errors and numbers == expected
+        print("result:     " + ("OK - unique and gap-free" if ok else "FAILED"))
+        return 0 if ok else 1
+    finally:
+        teardown()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
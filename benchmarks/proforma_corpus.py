@@ -0,0 +1,126 @@
+"""Synthetic proforma and receipt texts with known ground truth, for parser benchmarks."""
+import random
+from typing import Any, Dict, Iterator, List, Tuple
+
+VENDORS = [
+    "ACME Supplies Ltd",
+    "Nairobi Office Mart",
+    "Kigali Tech Solutions",
+    "Lagos Print & Paper Co.",
+    "Accra Furniture Works",
+    "Boxwell Logistics",
+]
+PRODUCTS = [
+    "Office Chair",
+    "Standing Desk",
+    "Box of pens",
+    "Paper A4 ream",
+    "Toner cartridge",
+    "Laptop 14in",
+    "USB-C dock",
+    "Whiteboard",
+    "Extension cable 5m",
+    "Xerox service kit",
+]
+TERMS = ["Net 30", "Net 15", "50% upfront, balance on delivery", "Cash on delivery"]
+# Lines that look a bit like items or fields but must not be parsed as such
+NOISE = [
+    "PROFORMA INVOICE",
+    "P.O. Box 1234-00100",
+    "Tel: +254 700 000 000",
+    "Box",
+    "Boxes are returnable",
+    "Invoice no: PF-{n}",
+    "Date: 2024-0{m}-1{d}",
+    "Tax 16% included",
+    "Thank you for your business",
+    "Delivery within 7 x 24h of order",
+]
+SEPARATORS = [" - ", " ", ": "]
+MULTIPLY = ["x", "X", "×", "*"]
+
+
+def _price(rng: random.Random) -> float:
+    return round(rng.choice([rng.uniform(1, 100), rng.uniform(100, 5000)]), 2)
+
+
+def _fmt_price(rng: random.Random, price: float) -> str:
+    text = f"{price:,.2f}" if rng.random() < 0.5 else f"{price:.2f}"
+    return rng.choice(["", "$"]) + text
+
+
+def make_proforma(rng: random.Random, n_items: int) -> Tuple[str, Dict[str, Any]]:
+    vendor = rng.choice(VENDORS)
+    terms = rng.choice(TERMS)
+    lines: List[str] = [rng.choice(NOISE[:3]), vendor]
+    lines.append(rng.choice(["Vendor: ", "Vendor name - ", "VENDOR: "]) + vendor)
+    items = []
+    total = 0.0
+    for _ in range(n_items):
+        name = rng.choice(PRODUCTS)
+        qty = rng.randint(1, 50)
+        price = _price(rng)
+        lines.append(f"{name}{rng.choice(SEPARATORS)}{qty} {rng.choice(MULTIPLY)} {_fmt_price(rng, price)}")
+        items.append({"name": name, "quantity": qty, "unit_price": price})
+        total += qty * price
+        if rng.random() < 0.3:
+            lines.append(rng.choice(NOISE).format(n=rng.randint(100, 999), m=rng.randint(1, 9), d=rng.randint(0, 9)))
+    lines.append(f"Subtotal: {total:,.2f}")
+    lines.append(f"Total {total:.2f}")
+    lines.append(rng.choice(["Terms: ", "Payment terms: "]) + terms)
+    expected = {"vendor": vendor, "terms": terms, "items": items, "total": round(total, 2)}
+    return "\n".join(lines), expected
+
+
+def generate(documents: int = 500, items_per_document: Tuple[int, int] = (1, 40), seed: int = 1) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    rng = random.Random(seed)
+    for _ in range(documents):
+        yield make_proforma(rng, rng.randint(*items_per_document))
+
+
+# Ways receipts print their total; "{amount}" is the formatted number
+TOTAL_FORMATS = [
+    "Total {amount}",
+    "TOTAL: {amount}",
+    "Total:{amount}",
+    "Total due: ${amount}",
+    "Amount due $ {amount}",
+    "Grand total KES {amount}",
+    "Total paid KES{amount}",
+    "Balance due: USD{amount}",
+    "Total €{amount}",
+]
+# Receipt lines carrying numbers that are not the total
+RECEIPT_NOISE = [
+    "Date: 2024-0{m}-1{d}",
+    "Time 1{d}:3{m}",
+    "Receipt no: RC-{n}",
+    "VAT 16%",
+    "Tel: +254 700 000 {n}",
+    "Till KES{n}",
+    "Change 0.{m}0",
+]
+
+
+def make_receipt(rng: random.Random, n_items: int) -> Tuple[str, Dict[str, Any]]:
+    """A receipt with items, noise and one labelled total; the expected vendor and total."""
+    vendor = rng.choice(VENDORS)
+    lines: List[str] = [vendor, "RECEIPT"]
+    total = 0.0
+    for _ in range(n_items):
+        qty, price = rng.randint(1, 5), _price(rng)
+        lines.append(f"{rng.choice(PRODUCTS)} {qty} x {price:.2f}")
+        total += qty * price
+        if rng.random() < 0.5:
+            lines.append(rng.choice(RECEIPT_NOISE).format(n=rng.randint(100, 999), m=rng.randint(1, 9), d=rng.randint(0, 9)))
+    total = round(total, 2)
+    amount = f"{total:,.2f}" if rng.random() < 0.5 else f"{total:.2f}"
+    lines.append(rng.choice(TOTAL_FORMATS).format(amount=amount))
+    lines.append("Thank you for your business")
+    return "\n".join(lines), {"vendor": vendor, "total": total}
+
+
+def generate_receipts(documents: int = 500, items_per_document: Tuple[int, int] = (1, 15), seed: int = 1):
+    rng = random.Random(seed)
+    for _ in range(documents):
+        yield make_receipt(rng, rng.randint(*items_per_document))
@@ -0,0 +1,130 @@
+"""Check the query budget of every PurchaseRequestViewSet action.
+
+Calls each action through the API (JWT authentication included) on a small
+and on a larger data set: bigger pages, bulk batches and more items per
+request. The run fails if any call exceeds its budget in
+``core.testing.QUERY_BUDGETS``, or if its query count grows with the data
+(an N+1). ``--verbose`` prints the queries of failing actions.
+
+    python -m benchmarks.query_budgets --small 3 --large 30
+"""
+import argparse
+
+from benchmarks._django import setup
+
+
+def measure(size: int, verbose: bool):
+    """``{action: (queries, error or None)}`` for one data set of ``size`` requests."""
+    from django.core.cache import cache
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from rest_framework.test import APIClient
+
+    from core.authentication import UserClaimsTokenObtainPairSerializer
+    from core.models import PurchaseRequest, User
+    from core.services import seeding
+    from core.services.sample_documents import receipt_pdf
+    from core.testing import QueryBudgetExceeded, assert_query_budget
+
+    prefix = f"budget{size}"
+    users = seeding.seed_users(prefix, "pw", {
+        User.ROLE_STAFF: 1, User.ROLE_APPROVER_L1: 1, User.ROLE_APPROVER_L2: 1, User.ROLE_FINANCE: 1,
+    })
+    staff, l1, l2, finance = (users[role][0] for role in seeding.SEED_ROLES)
+
+    def client(user):
+        c = APIClient()
+        token = UserClaimsTokenObtainPairSerializer.get_token(user).access_token
+        c.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return c
+
+    api = {user.pk: client(user) for user in (staff, l1, l2, finance)}
+
+    def items(n):
+        return [{"name": f"Item {i}", "quantity": 1 + i % 3, "unit_price": "10.00", "vendor": "ACME"} for i in range(n)]
+
+    def create(n_items=size):
+        response = api[staff.pk].post(
+            "/api/requests/", {"title": "Budget", "description": "", "amount": "1", "items": items(n_items)},
+            format="json",
+        )
+        assert response.status_code == 201, response.data
+        return response.data["id"]
+
+    pending = [create() for _ in range(size * 2 + 3)]
+
+    results = {}
+
+    def run(action, user, method, path, data=None, fmt="json", consume=False):
+        cache.clear()
+        try:
+            with assert_query_budget(action) as captured:
+                response = getattr(api[user.pk], method)(path, data, format=fmt)
+                if consume:
+                    b"".join(response.streaming_content)
+            assert response.status_code < 300, f"{action}: HTTP {response.status_code} {getattr(response, 'data', '')}"
+            results[action] = (len(captured), None)
+        except QueryBudgetExceeded as e:
+            results[action] = (len(captured), str(e) if verbose else str(e).splitlines()[0])
+
+    first = pending.pop()
+    run("list", staff, "get", f"/api/requests/?page_size={size * 2}")
+    run("retrieve", staff, "get", f"/api/requests/{first}/")
+    run("create", staff, "post", "/api/requests/",
+        {"title": "Budget", "description": "", "amount": "1", "items": items(size)})
+    run("update", staff, "put", f"/api/requests/{first}/",
+        {"title": "Budget", "description": "", "amount": "1", "items": items(size + 1)})
+    run("partial_update", staff, "patch", f"/api/requests/{first}/", {"title": "Renamed"})
+    run("destroy", staff, "delete", f"/api/requests/{first}/")
+
+    target = pending.pop()
+    run("approve", l1, "patch", f"/api/requests/{target}/approve/")
+    run("approve_final", l2, "patch", f"/api/requests/{target}/approve/")
+    run("reject", l1, "patch", f"/api/requests/{pending.pop()}/reject/", {"reason": "No"})
+
+    batch = [pending.pop() for _ in range(size)]
+    run("bulk_approve", l1, "post", "/api/requests/bulk_approve/", {"ids": batch})
+    run("bulk_approve_final", l2, "post", "/api/requests/bulk_approve/", {"ids": batch})
+    run("bulk_reject", l1, "post", "/api/requests/bulk_reject/", {"ids": [pending.pop() for _ in range(size)]})
+
+    receipt = SimpleUploadedFile("receipt.pdf", receipt_pdf(size, "ACME", 0), content_type="application/pdf")
+    run("submit_receipt", staff, "post", f"/api/requests/{target}/submit_receipt/", {"receipt": receipt}, "multipart")
+    run("search", staff, "get", "/api/requests/search/?q=budget")
+    run("summary", finance, "get", "/api/requests/summary/")
+    run("export", finance, "get", "/api/requests/export/?entity=items", consume=True)
+    assert PurchaseRequest.objects.filter(pk=target, purchase_order__isnull=False).exists()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--small", type=int, default=3)
+    parser.add_argument("--large", type=int, default=30)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    teardown = setup(test_database=True)
+    from django.conf import settings
+
+    from core.testing import QUERY_BUDGETS
+
+    settings.ALLOWED_HOSTS = ["*"]
+    try:
+        small = measure(args.small, args.verbose)
+        large = measure(args.large, args.verbose)
+    finally:
+        teardown()
+
+    failed = False
+    print(f"{'action':20} {'budget':>6} {f'n={args.small}':>7} {f'n={args.large}':>7}  result")
+    for action, budget in QUERY_BUDGETS.items():
+        (few, few_error), (many, many_error) = small[action], large[action]
+        error = few_error or many_error or (f"{action}: grows with the data ({few} -> {many} queries)" if many > few else None)
+        failed = failed or bool(error)
+        print(f"{action:20} {budget:6d} {few:7d} {many:7d}  {'FAILED' if error else 'ok'}")
+        if error:
+            print("  " + error.replace("\n", "\n  "))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
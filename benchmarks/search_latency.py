@@ -0,0 +1,109 @@
+"""Full-text search latency on a synthetic corpus of requests.
+
+Fills a throwaway database with requests plus proforma-like document text,
+indexes them and reports query latency percentiles for a mix of common and
+rare terms, with and without the staff owner filter. Uses the SQLite FTS5
+index by default; point DB_* at Postgres to measure the tsvector/GIN path.
+
+    python -m benchmarks.search_latency --documents 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks._django import setup
+
+WORDS = (
+    "chair desk laptop monitor cable toner paper printer license subscription server rack switch router "
+    "catering travel hotel flight training workshop consulting audit insurance furniture lamp projector "
+    "headset keyboard mouse docking station storage backup cloud hosting domain certificate maintenance"
+).split()
+# Zipf-distributed vocabulary: a few very common terms and a long tail, like real documents
+VOCABULARY = WORDS + [f"term{n}" for n in range(5000)]
+CUM_WEIGHTS = []
+_total = 0.0
+for _rank in range(len(VOCABULARY)):
+    _total += 1.0 / (_rank + 1)
+    CUM_WEIGHTS.append(_total)
+VENDORS = ["Acme Supplies", "Globex Corporation", "Initech", "Umbrella Ltd", "Stark Industries", "Wayne Enterprises"]
+
+
+def make_text(rng, words):
+    return " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=words))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    teardown = setup(test_database=True)
+    from django.db import connection, transaction
+
+    from core.models import PurchaseRequest, SearchDocument, User
+    from core.services.search import search
+
+    rng = random.Random(args.seed)
+    try:
+        owners = [User.objects.create_user(f"bench-staff-{n}", role=User.ROLE_STAFF).pk for n in range(50)]
+        start = time.perf_counter()
+        for offset in range(0, args.documents, args.batch_size):
+            size = min(args.batch_size, args.documents - offset)
+            with transaction.atomic():
+                requests = PurchaseRequest.objects.bulk_create(
+                    [
+                        PurchaseRequest(
+                            title=make_text(rng, 3),
+                            description=make_text(rng, 12),
+                            vendor=rng.choice(VENDORS),
+                            amount=rng.randint(1, 5000),
+                            created_by_id=rng.choice(owners),
+                        )
+                        for _ in range(size)
+                    ]
+                )
+                SearchDocument.objects.bulk_create(
+                    [
+                        SearchDocument(
+                            request_id=pr.pk,
+                            owner_id=pr.created_by_id,
+                            title=pr.title,
+                            vendor=pr.vendor,
+                            description=pr.description,
+                            body=make_text(rng, 60),
+                        )
+                        for pr in requests
+                    ]
+                )
+        print(f"database:   {connection.vendor}")
+        print(f"documents:  {args.documents} indexed in {time.perf_counter() - start:.1f}s")
+
+        cases = {
+            "common term": lambda: rng.choice(WORDS[:5]),
+            "single term": lambda: rng.choice(WORDS),
+            "two terms": lambda: f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+            "vendor + term": lambda: f"{rng.choice(VENDORS).split()[0]} {rng.choice(WORDS)}",
+            "single term, owner": lambda: rng.choice(WORDS),
+        }
+        for name, make_query in cases.items():
+            owner = rng.choice(owners) if "owner" in name else None
+            timings = []
+            for _ in range(args.queries):
+                query = make_query()
+                t0 = time.perf_counter()
+                search(query, 20, owner_id=owner)
+                timings.append((time.perf_counter() - t0) * 1000)
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(f"{name:<20} p50 {statistics.median(timings):7.1f} ms   p95 {p95:7.1f} ms")
+        return 0
+    finally:
+        teardown()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
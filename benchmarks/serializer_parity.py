@@ -0,0 +1,110 @@
+"""Check that the fast read path renders the same bytes as DRF's serializers, and time both.
+
+Seeds requests in every workflow state (with proforma/receipt files, so file
+URLs are covered) and renders the detail and list representations twice:
+through the declared DRF fields with ``JSONRenderer``, and through the
+hand-written getters with ``FastJSONRenderer``. Any byte difference fails the
+run and prints the first differing request.
+
+    python -m benchmarks.serializer_parity --requests 500 --repeat 5
+"""
+import argparse
+import time
+
+from benchmarks._django import setup
+
+
+def render(serializer_class, instances, request, fast: bool):
+    """``(bytes, serialize seconds, render seconds)`` for one path."""
+    from django.test import override_settings
+    from rest_framework.renderers import JSONRenderer
+
+    from core.renderers import FastJSONRenderer
+
+    renderer = FastJSONRenderer() if fast else JSONRenderer()
+    with override_settings(FAST_SERIALIZATION=fast):
+        started = time.perf_counter()
+        data = serializer_class(instances, many=True, context={"request": request}).data
+        serialized = time.perf_counter()
+        content = renderer.render(data, "application/json")
+    return content, serialized - started, time.perf_counter() - serialized
+
+
+def first_difference(serializer_class, instances, request):
+    for instance in instances:
+        generic = render(serializer_class, [instance], request, fast=False)[0]
+        fast = render(serializer_class, [instance], request, fast=True)[0]
+        if generic != fast:
+            return f"request {instance.pk}:\n  generic {generic.decode()}\n  fast    {fast.decode()}"
+    return "the rows match one by one; the difference is in the envelope"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3, help="timed renders per path (best is reported)")
+    args = parser.parse_args(argv)
+
+    teardown = setup(test_database=True)
+    from django.utils import timezone
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from core.models import PurchaseRequest, User
+    from core.serializers import PurchaseRequestListSerializer, PurchaseRequestSerializer
+    from core.services import seeding
+    from core.views import PurchaseRequestViewSet
+
+    try:
+        seeding.seed(
+            args.requests,
+            {User.ROLE_STAFF: 5, User.ROLE_APPROVER_L1: 2, User.ROLE_APPROVER_L2: 2, User.ROLE_FINANCE: 1},
+            prefix="parity",
+            files=True,
+            random_seed=1,
+        )
+        # Text the encoders treat specially: non-ASCII, quotes, control and line separator characters
+        PurchaseRequest.objects.filter(pk=PurchaseRequest.objects.order_by("pk").values("pk")[:1]).update(
+            title='Café "Kigali" chairs', description="tab\there\nnew line \\ é中 "
+        )
+
+        factory = APIRequestFactory()
+        detail = list(PurchaseRequestViewSet.queryset.order_by("-created_at", "-id"))
+        listed = list(PurchaseRequest.objects.only(*PurchaseRequestListSerializer.Meta.fields).order_by("-id"))
+        cases = [
+            ("detail", PurchaseRequestSerializer, detail, Request(factory.get("/api/requests/1/")), None),
+            ("detail, no request", PurchaseRequestSerializer, detail, None, None),
+            ("detail, Africa/Kigali", PurchaseRequestSerializer, detail, Request(factory.get("/")), "Africa/Kigali"),
+            ("list", PurchaseRequestListSerializer, listed, Request(factory.get("/api/requests/")), None),
+            (
+                "list ?fields=",
+                PurchaseRequestListSerializer,
+                listed,
+                Request(factory.get("/api/requests/", {"fields": "id,amount,created_at,purchase_order"})),
+                None,
+            ),
+        ]
+
+        failed = False
+        print(f"{'case':24} {'rows':>5} {'drf ms':>8} {'fast ms':>8} {'speedup':>8}  result")
+        for name, serializer_class, instances, request, zone in cases:
+            with timezone.override(zone or timezone.get_default_timezone()):
+                generic = [render(serializer_class, instances, request, fast=False) for _ in range(args.repeat)]
+                fast = [render(serializer_class, instances, request, fast=True) for _ in range(args.repeat)]
+                generic_seconds = min(s + r for _, s, r in generic)
+                fast_seconds = min(s + r for _, s, r in fast)
+                same = generic[0][0] == fast[0][0]
+                print(
+                    f"{name:24} {len(instances):5d} {generic_seconds * 1000:8.1f} {fast_seconds * 1000:8.1f} "
+                    f"{generic_seconds / fast_seconds:7.1f}x  {'ok' if same else 'DIFFERENT'}"
+                )
+                if not same:
+                    failed = True
+                    print("  " + first_difference(serializer_class, instances, request))
+    finally:
+        teardown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
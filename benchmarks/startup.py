@@ -0,0 +1,164 @@
+"""Startup time and memory: import cost of the app and per-worker RSS under gunicorn.
+
+Measures, in fresh interpreters, how long loading the app takes (settings,
+URLconf and everything the views import) with the document libraries
+imported eagerly, as before they were made lazy, and on first use. Then
+starts gunicorn with ``--workers`` workers three ways and reports time to
+the first response plus RSS, PSS (RSS with shared pages split between
+their users) and private memory per worker:
+
+* eager imports (before): every worker imports the app and the PDF/OCR libraries
+* lazy imports: every worker imports the app only
+* preload + warm-up: the repo's gunicorn.conf.py; workers are forked from a warmed master
+
+Linux only (reads /proc).
+
+    python -m benchmarks.startup --workers 4 --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from benchmarks._django import ROOT
+from benchmarks.upload_throughput import _free_port
+
+# The imports core/services/{doc_processing,ocr}.py used to run at module load
+EAGER_IMPORTS = "import pdfplumber, pytesseract\nfrom PIL import Image, ImageOps\n"
+
+IMPORT_PROBE = """
+import json, os, sys, time
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+import django
+django.setup()
+import config.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+if {eager}:
+{eager_imports}
+elapsed = time.perf_counter() - started
+rss = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmRSS:"))
+print(json.dumps({{"seconds": elapsed, "rss_kb": rss, "pdfplumber": "pdfplumber" in sys.modules}}))
+"""
+
+SCENARIOS = {
+    "eager imports (before)": "preload_app = False\n\n\ndef post_worker_init(worker):\n"
+    + "".join(f"    {line}\n" for line in EAGER_IMPORTS.splitlines()),
+    "lazy imports": "preload_app = False\n",
+    "preload + warm-up": None,  # gunicorn.conf.py
+}
+
+
+def measure_import(eager: bool, repeat: int, env):
+    eager_imports = "".join(f"    {line}\n" for line in EAGER_IMPORTS.splitlines())
+    code = IMPORT_PROBE.format(eager=eager, eager_imports=eager_imports)
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True, capture_output=True)
+        runs.append(json.loads(output.stdout.decode().strip().splitlines()[-1]))
+    return statistics.median(r["seconds"] for r in runs), statistics.median(r["rss_kb"] for r in runs)
+
+
+def memory_kb(pid: int):
+    """``(rss, pss, private)`` in kB from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields["Rss"], fields["Pss"], fields["Private_Clean"] + fields["Private_Dirty"]
+
+
+def children(pid: int):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def run_scenario(config_text, args, env, workdir, name):
+    if config_text is None:
+        config = ROOT / "gunicorn.conf.py"
+    else:
+        config = workdir / f"{name.split()[0]}.conf.py"
+        config.write_text(config_text)
+    port = _free_port()
+    cmd = [sys.executable, "-m", "gunicorn", *args.app, "-c", str(config), "--bind", f"127.0.0.1:{port}",
+           "--workers", str(args.workers)]
+    with open(workdir / f"{name.split()[0]}.log", "w") as log:
+        started = time.perf_counter()
+        server = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            ready = None
+            # An unauthenticated list call: runs the full middleware/DRF stack without touching the database
+            url = f"http://127.0.0.1:{port}/api/requests/"
+            deadline = time.monotonic() + 120
+            while ready is None and time.monotonic() < deadline:
+                if server.poll() is not None:
+                    raise RuntimeError(f"gunicorn exited with {server.returncode}; see {log.name}")
+                try:
+                    _get(url)
+                    ready = time.perf_counter() - started
+                except OSError:
+                    time.sleep(0.05)
+            if ready is None:
+                raise RuntimeError(f"gunicorn did not answer; see {log.name}")
+            while len(children(server.pid)) < args.workers and time.monotonic() < deadline:
+                time.sleep(0.1)
+            for _ in range(args.workers * 10):
+                _get(url)
+            time.sleep(1)
+            workers = [memory_kb(pid) for pid in children(server.pid)]
+            master = memory_kb(server.pid)
+        finally:
+            server.terminate()
+            server.wait(30)
+    return ready, master, workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per import measurement")
+    parser.add_argument("--asgi", dest="app", action="store_const", default=["config.wsgi:application"],
+                        const=["config.asgi:application", "-k", "uvicorn_worker.UvicornWorker"],
+                        help="serve config.asgi with uvicorn workers (needs uvicorn-worker)")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="config.settings", PYTHONPATH=str(ROOT))
+    print(f"App import, median of {args.repeat} fresh interpreters")
+    print(f"{'document libraries':28} {'ms':>8} {'RSS MB':>8}")
+    for label, eager in (("eager (before)", True), ("on first use", False)):
+        seconds, rss = measure_import(eager, args.repeat, env)
+        print(f"{label:28} {seconds * 1000:8.0f} {rss / 1024:8.1f}")
+
+    print(f"\ngunicorn {' '.join(args.app)}, {args.workers} workers (MB; PSS splits shared pages between processes)")
+    print(f"{'scenario':24} {'ready ms':>9} {'master PSS':>10} {'worker RSS':>10} {'worker PSS':>10} "
+          f"{'private':>8} {'total PSS':>10}")
+    workdir = Path(tempfile.mkdtemp(prefix="p2p-startup-"))
+    for name, config_text in SCENARIOS.items():
+        ready, master, workers = run_scenario(config_text, args, env, workdir, name)
+        rss, pss, private = (statistics.mean(w[i] for w in workers) / 1024 for i in range(3))
+        total = (master[1] + sum(w[1] for w in workers)) / 1024
+        print(f"{name:24} {ready * 1000:9.0f} {master[1] / 1024:10.1f} {rss:10.1f} {pss:10.1f} "
+              f"{private:8.1f} {total:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,202 @@
+"""Concurrent receipt upload throughput: WSGI (sync gunicorn workers) vs ASGI (uvicorn workers).
+
+Seeds a throwaway SQLite database with approved requests, starts gunicorn
+against it once per profile and posts receipts concurrently: the WSGI
+profile to ``/api/requests/{id}/submit_receipt/``, the ASGI profile to the
+async variant under ``/api/async/``. Every receipt is a distinct document, so
+validation really parses (``--receipt-format png`` OCRs it with tesseract)
+instead of hitting the extraction cache. Needs gunicorn, plus uvicorn and
+uvicorn-worker for the ASGI profile.
+
+    python -m benchmarks.upload_throughput --uploads 200 --concurrency 32 --workers 2
+"""
+import argparse
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks._django import ROOT, setup
+from benchmarks._http import multipart, percentile
+from core.services.sample_documents import receipt_pdf
+
+PASSWORD = "bench-password"
+VENDOR = "Acme Supplies"
+PROFILES = {
+    "wsgi": (["config.wsgi:application"], "/api/requests/{id}/submit_receipt/"),
+    "asgi": (["config.asgi:application", "-k", "uvicorn_worker.UvicornWorker"], "/api/async/requests/{id}/submit_receipt/"),
+}
+
+
+def receipt_png(number: int, total: str) -> bytes:
+    """A scanned-looking receipt without a text layer (validated through OCR)."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    img = Image.new("L", (1240, 1754), 255)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=40)
+    for row, line in enumerate([VENDOR, f"Receipt no. {number}", "Office chairs 2 x 50.00", f"Total: {total}"]):
+        draw.text((120, 160 + row * 80), line, fill=0, font=font)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG", dpi=(150, 150))
+    return buffer.getvalue()
+
+
+def seed(requests: int):
+    """Create a staff user and ``requests`` approved requests with a PO; returns their ids."""
+    from django.core.management import call_command
+
+    from core.models import PurchaseRequest, RequestItem, User
+    from core.services.purchase_orders import create_purchase_order
+
+    call_command("migrate", verbosity=0)
+    staff = User.objects.create_user("bench-staff", password=PASSWORD, role=User.ROLE_STAFF)
+    l1 = User.objects.create_user("bench-l1", role=User.ROLE_APPROVER_L1)
+    l2 = User.objects.create_user("bench-l2", role=User.ROLE_APPROVER_L2)
+    ids = []
+    for n in range(requests):
+        pr = PurchaseRequest.objects.create(title=f"Chairs {n}", amount=100, vendor=VENDOR, created_by=staff)
+        RequestItem.objects.create(request=pr, name="Office chair", quantity=2, unit_price=50, vendor=VENDOR)
+        pr.approve(l1)
+        pr.approve(l2)
+        create_purchase_order(PurchaseRequest.objects.prefetch_related("items").get(pk=pr.pk))
+        ids.append(pr.pk)
+    return ids
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _post(url, body, headers, timeout=300):
+    request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def start_server(profile, env, workers, port, log):
+    app_args, _ = PROFILES[profile]
+    cmd = [sys.executable, "-m", "gunicorn", *app_args, "--bind", f"127.0.0.1:{port}", "--workers", str(workers),
+           "--timeout", "300"]
+    server = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"{profile} server exited with {server.returncode}; see {log.name}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return server, base
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"{profile} server did not start; see {log.name}")
+
+
+def run_profile(profile, args, env, ids, workdir, first_number):
+    port = _free_port()
+    with open(workdir / f"{profile}.log", "w") as log:
+        server, base = start_server(profile, env, args.workers, port, log)
+        try:
+            status, body = _post(
+                f"{base}/api/auth/token/",
+                json.dumps({"username": "bench-staff", "password": PASSWORD}).encode(),
+                {"Content-Type": "application/json"},
+            )
+            if status != 200:
+                raise RuntimeError(f"token request failed ({status}): {body[:200]!r}")
+            token = json.loads(body)["access"]
+            if args.receipt_format == "png":
+                make, content_type = receipt_png, "image/png"
+            else:
+                make, content_type = (lambda number, total: receipt_pdf(number, VENDOR, total)), "application/pdf"
+            uploads = []
+            for n in range(args.uploads):
+                # Unique content per upload so nothing is served from the extraction cache
+                receipt = (f"receipt-{n}.{args.receipt_format}", make(first_number + n, "100.00"), content_type)
+                body, multipart_type = multipart(files={"receipt": receipt})
+                uploads.append((PROFILES[profile][1].format(id=ids[n % len(ids)]), body, multipart_type))
+
+            latencies, failures = [], []
+            lock = threading.Lock()
+
+            def upload(item):
+                path, body, multipart_type = item
+                start = time.perf_counter()
+                status, response = _post(
+                    base + path, body, {"Authorization": f"Bearer {token}", "Content-Type": multipart_type}
+                )
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if status == 200:
+                        latencies.append(elapsed)
+                    else:
+                        failures.append(f"{status}: {response[:120]!r}")
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                list(pool.map(upload, uploads))
+            wall = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return wall, latencies, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=200, help="uploads per profile")
+    parser.add_argument("--concurrency", type=int, default=32, help="uploads in flight")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes per profile")
+    parser.add_argument("--requests", type=int, default=50, help="requests the uploads are spread over")
+    parser.add_argument("--receipt-format", choices=("pdf", "png"), default="pdf")
+    parser.add_argument("--profiles", nargs="+", choices=tuple(PROFILES), default=list(PROFILES))
+    args = parser.parse_args(argv)
+
+    workdir = Path(tempfile.mkdtemp(prefix="p2p-upload-bench-"))
+    overrides = {
+        "SQLITE_PATH": str(workdir / "bench.sqlite3"),
+        "MEDIA_ROOT": str(workdir / "media"),
+        "OCR_LOCK_DIR": str(workdir / "ocr-slots"),
+        "DEBUG": "false",
+        "ALLOWED_HOSTS": "127.0.0.1,localhost",
+        "DB_NAME": "",
+    }
+    os.environ.update(overrides)
+    setup()
+    ids = seed(args.requests)
+    from django.db import connection
+
+    connection.close()
+    env = {**os.environ, **overrides, "PYTHONPATH": str(ROOT)}
+
+    print(f"uploads: {args.uploads} x {args.receipt_format}, concurrency {args.concurrency}, "
+          f"{args.workers} worker(s) per profile, logs in {workdir}")
+    print(f"{'profile':8} {'uploads/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for index, profile in enumerate(args.profiles):
+        wall, latencies, failures = run_profile(profile, args, env, ids, workdir, index * args.uploads)
+        print(
+            f"{profile:8} {len(latencies) / wall:10.1f} {percentile(latencies, 50) * 1000:9.0f} "
+            f"{percentile(latencies, 95) * 1000:9.0f} {percentile(latencies, 99) * 1000:9.0f} {len(failures):7d}"
+        )
+        for failure in failures[:3]:
+            print(f"  {failure}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 
+import django
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -27,6 +28,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the other middleware too
+    "core.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -73,9 +76,14 @@ else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            # Concurrent writers (several workers, async views) wait for the lock instead of failing
+            "OPTIONS": {"timeout": float(os.getenv("SQLITE_TIMEOUT", "20"))},
         }
     }
+    if django.VERSION >= (5, 1):
+        # Take the write lock at BEGIN; a deferred transaction upgrading it fails without waiting
+        DATABASES["default"]["OPTIONS"]["transaction_mode"] = "IMMEDIATE"
 
 AUTH_USER_MODEL = "core.User"
 
@@ -89,22 +97,137 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [BASE_DIR / "core" / "static"]
 
 MEDIA_URL = "/media/"
-MEDIA_ROOT = BASE_DIR / "media"
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", BASE_DIR / "media"))
+
+# Uploaded files larger than MAX_UPLOAD_SIZE bytes are rejected while streaming in
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(20 * 1024 * 1024)))
+FILE_UPLOAD_HANDLERS = [
+    "core.uploadhandlers.MaxSizeUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Tokens carry the user's role as a claim, so API requests authenticate without loading
+# the User row (core/authentication.py). A token stops working at most
+# JWT_AUTH_VERSION_TTL seconds after the user's role, password or active flag changed.
+JWT_STATELESS_USER = os.getenv("JWT_STATELESS_USER", "true").lower() == "true"
+JWT_AUTH_VERSION_TTL = float(os.getenv("JWT_AUTH_VERSION_TTL", "30"))
+
+# Approval routing rules (ApprovalPolicy, core/services/approval_policy.py) are compiled
+# once per process; other processes pick up a change within APPROVAL_POLICY_CACHE_TTL seconds
+APPROVAL_POLICY_CACHE_TTL = float(os.getenv("APPROVAL_POLICY_CACHE_TTL", "5"))
+
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "core.authentication.UserClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "core.authentication.UserClaimsTokenRefreshSerializer",
+    "TOKEN_USER_CLASS": "core.authentication.TokenUser",
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.StatelessJWTAuthentication"
+        if JWT_STATELESS_USER
+        else "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "Procure-to-Pay API",
     "DESCRIPTION": "Mini Procure-to-Pay system with multi-level approvals and document processing.",
     "VERSION": "1.0.0",
-}
\ No newline at end of file
+}
+
+# Background jobs (see core/services/jobs.py and `manage.py run_worker`)
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+JOB_VISIBILITY_TIMEOUT = int(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF = int(os.getenv("JOB_RETRY_BACKOFF", "10"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+
+# Document text extraction cache (see core/services/extraction_cache.py)
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Seconds between LRU eviction passes in each process
+EXTRACTION_CACHE_EVICT_INTERVAL = float(os.getenv("EXTRACTION_CACHE_EVICT_INTERVAL", "300"))
+
+# PDF extraction: documents with at least PDF_PARALLEL_MIN_PAGES pages are split
+# across a pool of PDF_EXTRACT_WORKERS processes
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+PDF_PAGE_TIMEOUT = float(os.getenv("PDF_PAGE_TIMEOUT", "60"))
+
+# OCR (see core/services/ocr.py): at most OCR_MAX_CONCURRENCY tesseract processes
+# per machine, each bounded by OCR_TIMEOUT seconds
+OCR_MAX_CONCURRENCY = int(os.getenv("OCR_MAX_CONCURRENCY", str(os.cpu_count() or 1)))
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", "60"))
+OCR_SLOT_WAIT = float(os.getenv("OCR_SLOT_WAIT", "120"))
+OCR_LOCK_DIR = os.getenv("OCR_LOCK_DIR", "")
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+OCR_MAX_DIMENSION = int(os.getenv("OCR_MAX_DIMENSION", "3500"))
+
+# Threads the async upload views (/api/async/...) run PDF parsing and OCR on, per process
+DOCUMENT_EXECUTOR_WORKERS = int(os.getenv("DOCUMENT_EXECUTOR_WORKERS", str(max(2, OCR_MAX_CONCURRENCY))))
+
+# Cache: Redis when configured, otherwise a bounded per-process LRU
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "5000"))},
+        }
+    }
+
+# Request change stream (GET /api/requests/events/, see core/services/events.py)
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "1.0"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_STREAM_MAX_SECONDS = float(os.getenv("EVENTS_STREAM_MAX_SECONDS", "300"))
+EVENTS_RETRY_MS = int(os.getenv("EVENTS_RETRY_MS", "3000"))
+# Under WSGI a stream holds a worker: end it before gunicorn's 30 s worker timeout, clients reconnect
+EVENTS_WSGI_STREAM_SECONDS = float(os.getenv("EVENTS_WSGI_STREAM_SECONDS", "25"))
+# Events younger than this many seconds are held back so ones committed out of id order aren't skipped
+EVENTS_COMMIT_LAG = float(os.getenv("EVENTS_COMMIT_LAG", "2.0"))
+# Lifetime of the stream tickets from POST /api/requests/events/ticket/
+EVENTS_TICKET_TTL = int(os.getenv("EVENTS_TICKET_TTL", "60"))
+EVENTS_RETENTION_DAYS = int(os.getenv("EVENTS_RETENTION_DAYS", "7"))
+
+# Exports (see core/services/exports.py): the watermark lags this many seconds behind
+# now and incremental exports overlap by as much, so rows committed late aren't skipped
+EXPORT_WATERMARK_LAG = int(os.getenv("EXPORT_WATERMARK_LAG", "60"))
+
+# manage.py archive_requests: approved/rejected requests untouched for this many days
+# move to the archive tables (still readable through GET /api/requests/{id}/)
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+
+# Seconds a serialized list/detail payload stays in the cache (see core/services/response_cache.py)
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "300"))
+
+# Request instrumentation (see core/middleware.py): Server-Timing response header and
+# the Prometheus endpoint GET /api/metrics/, which needs "Authorization: Bearer
+# <METRICS_TOKEN>" (without a token it is only served when DEBUG is on)
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", str(DEBUG)).lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Directory the worker processes share their metrics through, so a scrape covers all of
+# them; unset, each worker reports only the requests it served itself
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+
+# Read responses: request payloads are built by hand-written getters instead of DRF's
+# field machinery (core/serializers.py) and encoded with orjson when it is installed
+# (core/renderers.py); both produce the same bytes as the generic path
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "true").lower() == "true"
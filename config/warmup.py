@@ -0,0 +1,39 @@
+"""Load the application in a server's master process before it forks workers.
+
+Used by gunicorn.conf.py (``preload_app``): everything imported or built here
+is shared copy-on-write by the workers instead of being rebuilt by each one.
+"""
+import gc
+
+
+def warm_up(document_libraries: bool = True) -> None:
+    """Import the views and everything they reference, then freeze the heap for forking.
+
+    With ``document_libraries`` the PDF/OCR libraries, imported on first use
+    otherwise, are loaded too. Database connections opened along the way are
+    closed: a forked worker must not share its parent's socket.
+    """
+    from django.db import connections
+    from django.urls import get_resolver
+    from rest_framework.settings import api_settings
+
+    # Importing the URLconf imports every view, serializer and service module
+    get_resolver().url_patterns
+    get_resolver()._populate()
+    for name in (
+        "DEFAULT_AUTHENTICATION_CLASSES",
+        "DEFAULT_PERMISSION_CLASSES",
+        "DEFAULT_RENDERER_CLASSES",
+        "DEFAULT_PARSER_CLASSES",
+    ):
+        getattr(api_settings, name)
+    if document_libraries:
+        from core.services import doc_processing
+
+        doc_processing.import_libraries()
+    connections.close_all()
+
+    # Move everything allocated so far out of the collector's reach: a collection in
+    # a worker would otherwise write to (and so copy) every page holding these objects
+    gc.collect()
+    gc.freeze()
@@ -1,5 +1,26 @@
 from django.contrib import admin
-from .models import User, PurchaseRequest, RequestItem, Approval, PurchaseOrder
+from django.db import transaction
+from .services import approval_policy, rollups, search
+from .services.exports import record_deletions, record_request_deletions
+from .services.response_cache import bump_list_versions, touch_request
+from .storage import release
+from .models import (
+    User,
+    PurchaseRequest,
+    RequestItem,
+    Approval,
+    ApprovalPolicy,
+    ArchivedApproval,
+    ArchivedPurchaseRequest,
+    ArchivedRequestItem,
+    PurchaseOrder,
+    BackgroundJob,
+    ExtractionCacheEntry,
+    SpendRollup,
+    DocumentExtraction,
+    StoredBlob,
+    RequestEvent,
+)
 
 
 @admin.register(User)
@@ -19,15 +40,148 @@ class ApprovalInline(admin.TabularInline):
     extra = 0
 
 
+class DocumentExtractionInline(admin.TabularInline):
+    model = DocumentExtraction
+    extra = 0
+    fields = ("kind", "sha256", "extractor_version", "created_at")
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(PurchaseRequest)
 class PurchaseRequestAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "status", "amount", "created_by", "created_at")
-    list_filter = ("status",)
+    list_display = ("id", "title", "status", "amount", "extraction_status", "created_by", "created_at")
+    list_filter = ("status", "extraction_status")
     search_fields = ("title", "description")
-    inlines = [RequestItemInline, ApprovalInline]
+    inlines = [RequestItemInline, ApprovalInline, DocumentExtractionInline]
+    # Moved on by touch_request() only; see save_model()
+    readonly_fields = ("version",)
+
+    def save_model(self, request, obj, form, change):
+        previous = PurchaseRequest.objects.filter(pk=obj.pk).values_list("proforma", "receipt").first() if change else None
+        with transaction.atomic(), rollups.tracking([obj.pk] if change else []) as tracked:
+            if obj.status == PurchaseRequest.STATUS_PENDING:
+                approval_policy.route(obj)
+            if change:
+                # A full save would write back the version read with the form and undo
+                # bumps made since; save_related() moves it on
+                obj.save(update_fields=[f.name for f in obj._meta.concrete_fields if not f.primary_key and f.name != "version"])
+            else:
+                super().save_model(request, obj, form, change)
+            tracked.add(obj.pk)
+            if previous:
+                # A re-upload of the same bytes keeps the name but still took a reference
+                release(old for old, field in zip(previous, ("proforma", "receipt")) if field in form.changed_data)
+
+    def save_related(self, request, form, formsets, change):
+        with transaction.atomic():
+            super().save_related(request, form, formsets, change)
+            for formset in formsets:
+                entity = {RequestItem: "items", Approval: "approvals"}.get(formset.model)
+                if entity:
+                    record_deletions(entity, [obj.pk for obj in formset.deleted_objects])
+        search.index_requests([form.instance.pk])
+        touch_request(form.instance)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of icontains scans over title/description
+        if not search_term.strip():
+            return queryset, False
+        ids = [pk for pk, _ in search.search(search_term, limit=1000)]
+        return queryset.filter(pk__in=ids), False
+
+    def delete_model(self, request, obj):
+        owner_id = obj.created_by_id
+        files = [obj.proforma.name, obj.receipt.name]
+        with transaction.atomic(), rollups.tracking([obj.pk]):
+            record_request_deletions([obj.pk])
+            super().delete_model(request, obj)
+            release(files)
+        bump_list_versions([owner_id])
+
+    def delete_queryset(self, request, queryset):
+        rows = list(queryset.values_list("pk", "created_by_id", "proforma", "receipt"))
+        with transaction.atomic(), rollups.tracking([row[0] for row in rows]):
+            record_request_deletions(row[0] for row in rows)
+            super().delete_queryset(request, queryset)
+            release(name for row in rows for name in row[2:])
+        bump_list_versions([row[1] for row in rows])
+
+
+@admin.register(ApprovalPolicy)
+class ApprovalPolicyAdmin(admin.ModelAdmin):
+    list_display = ("name", "priority", "vendor", "min_amount", "max_amount", "required_levels", "is_active")
+    list_filter = ("is_active", "required_levels")
+    list_editable = ("priority", "is_active")
+    search_fields = ("name", "vendor")
+
+    def delete_queryset(self, request, queryset):
+        # Bulk deletes skip ApprovalPolicy.delete()
+        with transaction.atomic():
+            super().delete_queryset(request, queryset)
+            approval_policy.policies_changed()
 
 
 @admin.register(PurchaseOrder)
 class PurchaseOrderAdmin(admin.ModelAdmin):
     list_display = ("id", "number", "vendor", "total_amount", "created_at")
-    search_fields = ("number", "vendor")
\ No newline at end of file
+    search_fields = ("number", "vendor")
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "attempts", "max_attempts", "run_after", "locked_by", "updated_at")
+    list_filter = ("kind", "status")
+
+
+@admin.register(ExtractionCacheEntry)
+class ExtractionCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ("digest", "extractor_version", "size", "hits", "last_used_at", "created_at")
+    search_fields = ("digest",)
+
+
+@admin.register(SpendRollup)
+class SpendRollupAdmin(admin.ModelAdmin):
+    list_display = ("dimension", "bucket", "status", "request_count", "amount", "po_amount", "receipt_validated_amount")
+    list_filter = ("dimension", "status")
+    search_fields = ("bucket",)
+
+
+@admin.register(StoredBlob)
+class StoredBlobAdmin(admin.ModelAdmin):
+    list_display = ("name", "size", "ref_count", "created_at")
+    search_fields = ("digest",)
+
+
+@admin.register(RequestEvent)
+class RequestEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "request_id", "level", "status", "created_at")
+    list_filter = ("kind",)
+
+
+class ArchivedRequestItemInline(admin.TabularInline):
+    model = ArchivedRequestItem
+    extra = 0
+
+
+class ArchivedApprovalInline(admin.TabularInline):
+    model = ArchivedApproval
+    extra = 0
+
+
+@admin.register(ArchivedPurchaseRequest)
+class ArchivedPurchaseRequestAdmin(admin.ModelAdmin):
+    """Read-only: rows get here through ``manage.py archive_requests``."""
+
+    list_display = ("id", "title", "status", "amount", "created_by", "created_at", "archived_at")
+    list_filter = ("status",)
+    search_fields = ("title",)
+    inlines = [ArchivedRequestItemInline, ArchivedApprovalInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
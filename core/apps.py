@@ -3,4 +3,11 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "core"
\ No newline at end of file
+    name = "core"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .services.metrics import install_query_wrapper
+
+        connection_created.connect(install_query_wrapper, dispatch_uid="core.metrics.query_wrapper")
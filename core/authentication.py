@@ -0,0 +1,142 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser as BaseTokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+
+# Claims copied from the user into every token (access tokens inherit them from the refresh token)
+USER_CLAIMS = ("username", "role", "auth_version")
+
+
+def add_user_claims(token, user: User):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class TokenUser(BaseTokenUser):
+    """User backed by the token claims; compare it with ``User`` rows by ``pk`` (``obj.created_by_id == user.pk``)."""
+
+    @cached_property
+    def id(self):
+        # simplejwt writes the id claim as a string
+        return User._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @property
+    def role(self) -> Optional[str]:
+        return self.token.get("role")
+
+
+class AuthVersionCache:
+    """Short-lived per-process copy of ``User.auth_version`` (``None`` for inactive or deleted users).
+
+    An entry is reloaded after ``ttl`` seconds, or as soon as a token carries a
+    newer version than the cached one (the user logged in again after a
+    change), so a revoked token keeps working for at most ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: float = None, max_entries: int = 10000):
+        self._ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[int, Tuple[Optional[int], float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> float:
+        return settings.JWT_AUTH_VERSION_TTL if self._ttl is None else self._ttl
+
+    def get(self, user_id, at_least: int = None) -> Optional[int]:
+        now = time.monotonic()
+        with self._lock:
+            version, expires = self._entries.get(user_id, (None, 0.0))
+        if expires > now and (at_least is None or (version is not None and version >= at_least)):
+            return version
+        version = User.objects.filter(pk=user_id, is_active=True).values_list("auth_version", flat=True).first()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[user_id] = (version, now + self.ttl)
+        return version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+auth_versions = AuthVersionCache()
+
+
+def check_auth_version(token) -> None:
+    """Reject tokens issued before the user's role, password or active flag changed."""
+    claimed = token.get("auth_version")
+    user_id = User._meta.pk.to_python(token[api_settings.USER_ID_CLAIM])
+    if auth_versions.get(user_id, at_least=claimed) != claimed:
+        raise AuthenticationFailed("Token has been revoked.", code="token_revoked")
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """JWT authentication without loading the ``User`` row on every request.
+
+    Permissions and role filtering read the ``role``/``username`` claims of a
+    ``TokenUser``; the only lookup left is the cached ``auth_version`` check.
+    Tokens issued before these claims existed still authenticate through the
+    database.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in USER_CLAIMS):
+            return JWTAuthentication.get_user(self, validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        check_auth_version(validated_token)
+        return TokenUser(validated_token)
+
+
+class UserClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user) -> RefreshToken:
+        return add_user_claims(super().get_token(user), user)
+
+
+class UserClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuses refresh tokens from before a role/password change, whose claims are stale: log in again."""
+
+    def validate(self, attrs):
+        token = self.token_class(attrs["refresh"])
+        if "auth_version" in token:
+            check_auth_version(token)
+        return super().validate(attrs)
+
+
+STREAM_TICKET_SALT = "core.events.ticket"
+
+
+def issue_stream_ticket(user) -> str:
+    """Signed ticket opening the event stream as ``user``, valid ``EVENTS_TICKET_TTL`` seconds.
+
+    ``EventSource`` can't send an Authorization header, so the stream takes
+    ``?ticket=`` instead; unlike an access token in the URL, a ticket left in
+    a proxy log is good for nothing else and expires quickly.
+    """
+    claims = {api_settings.USER_ID_CLAIM: str(user.pk), **{claim: getattr(user, claim) for claim in USER_CLAIMS}}
+    return signing.dumps(claims, salt=STREAM_TICKET_SALT)
+
+
+def stream_ticket_user(ticket: str) -> Optional[TokenUser]:
+    """The user a stream ticket was issued to, or None when it is forged, expired or revoked."""
+    try:
+        claims = signing.loads(ticket, salt=STREAM_TICKET_SALT, max_age=settings.EVENTS_TICKET_TTL)
+        check_auth_version(claims)
+    except (signing.BadSignature, AuthenticationFailed):
+        return None
+    return TokenUser(claims)
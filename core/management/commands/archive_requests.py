@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.services import archive
+
+
+class Command(BaseCommand):
+    help = "Move approved/rejected requests idle for N days, with their items and approvals, to the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                            help="Archive closed requests last changed more than N days ago.")
+        parser.add_argument("--batch-size", type=int, default=500,
+                            help="Requests moved per transaction.")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many requests.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the archivable requests.")
+        parser.add_argument("--partition", action="store_true",
+                            help="First turn the archived requests table into yearly range partitions (Postgres).")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        if options["dry_run"]:
+            count = archive.archivable(cutoff).count()
+            self.stdout.write(f"Would archive {count} request(s) last changed before {cutoff:%Y-%m-%d}.")
+            return
+        if options["partition"]:
+            try:
+                converted = archive.partition_by_created_at()
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write("Partitioned the archive table by created_at." if converted else "Archive table already partitioned.")
+
+        moved, limit = 0, options["limit"]
+        while limit is None or moved < limit:
+            size = options["batch_size"] if limit is None else min(options["batch_size"], limit - moved)
+            ids = archive.archive_batch(cutoff, size)
+            if not ids:
+                break
+            moved += len(ids)
+            self.stdout.write(f"Archived {moved} request(s) (up to #{ids[-1]})")
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} request(s) last changed before {cutoff:%Y-%m-%d}."))
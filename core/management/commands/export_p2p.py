@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import exports
+
+
+class Command(BaseCommand):
+    help = "Stream requests, items, approvals, purchase orders or deletions as CSV/NDJSON for accounting sync."
+
+    def add_arguments(self, parser):
+        parser.add_argument("entity", choices=list(exports.EXPORTS))
+        parser.add_argument("--output-format", choices=list(exports.CONTENT_TYPES), default=exports.FORMAT_CSV)
+        parser.add_argument("--since", help="Only rows whose request changed after this ISO 8601 timestamp.")
+        parser.add_argument("--file", help="Write to this path instead of stdout.")
+        parser.add_argument("--chunk-size", type=int, default=exports.DEFAULT_CHUNK_SIZE,
+                            help="Rows read per database round trip.")
+
+    def handle(self, *args, **options):
+        try:
+            since, until = exports.export_window(exports.parse_watermark(options["since"]))
+            lines = exports.render(options["entity"], options["output_format"], since, until, options["chunk_size"])
+        except exports.ExportError as e:
+            raise CommandError(str(e))
+        if options["file"]:
+            with open(options["file"], "w", encoding="utf-8", newline="") as out:
+                out.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
+        # Watermark for the next incremental run, kept off stdout so it never mixes with the data
+        self.stderr.write(f"watermark: {exports.format_watermark(until)}")
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import ArchivedPurchaseRequest, PurchaseRequest, StoredBlob
+from core.storage import BLOB_PREFIX, upload_storage
+
+
+class Command(BaseCommand):
+    help = "Recount references to content-addressed uploads and delete blobs nothing refers to."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would change.")
+        parser.add_argument("--min-age", type=float, default=3600,
+                            help="Leave untracked files younger than this many seconds (uploads in flight).")
+
+    def handle(self, *args, **options):
+        storage = upload_storage()
+        dry_run = options["dry_run"]
+        counts = {}
+        for model in (PurchaseRequest, ArchivedPurchaseRequest):
+            refs = model.objects.filter(
+                Q(proforma__startswith=f"{BLOB_PREFIX}/") | Q(receipt__startswith=f"{BLOB_PREFIX}/")
+            ).values_list("proforma", "receipt")
+            for names in refs.iterator():
+                for name in names:
+                    if name and name.startswith(f"{BLOB_PREFIX}/"):
+                        counts[name] = counts.get(name, 0) + 1
+
+        fixed = removed = 0
+        with transaction.atomic():
+            for blob in StoredBlob.objects.select_for_update().iterator():
+                expected = counts.get(blob.name, 0)
+                if expected == blob.ref_count and expected:
+                    continue
+                if expected:
+                    fixed += 1
+                    if not dry_run:
+                        StoredBlob.objects.filter(pk=blob.pk).update(ref_count=expected)
+                else:
+                    removed += 1
+                    if not dry_run:
+                        StoredBlob.objects.filter(pk=blob.pk).update(ref_count=0)
+                        transaction.on_commit(lambda name=blob.name: storage.remove_if_unreferenced(name))
+
+        orphans = list(storage.orphaned_files(options["min_age"]))
+        if not dry_run:
+            for name in orphans:
+                storage.remove_if_unreferenced(name)
+        prefix = "Would fix" if dry_run else "Fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {fixed} reference count(s); {removed} unreferenced blob(s); {len(orphans)} untracked file(s)."
+        ))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import SpendRollup
+from core.services.rollups import MEASURES, compute_from_scratch
+
+
+class Command(BaseCommand):
+    help = "Recompute the spend rollups from the request and archive tables (backfill), or report drift with --check."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true",
+                            help="Only compare the stored rollups with a fresh computation; exit 1 on drift.")
+        parser.add_argument("--chunk-size", type=int, default=2000,
+                            help="Requests read per database round trip.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            expected = {
+                key: values for key, values in compute_from_scratch(options["chunk_size"]).items() if values[0]
+            }
+            stored = {
+                (row[0], row[1], row[2]): list(row[3:])
+                for row in SpendRollup.objects.select_for_update().values_list(
+                    "dimension", "bucket", "status", *MEASURES
+                )
+            }
+            drift = sorted(
+                key for key in expected.keys() | stored.keys()
+                if expected.get(key, [0] * len(MEASURES)) != stored.get(key, [0] * len(MEASURES))
+            )
+
+            if options["check"]:
+                for key in drift:
+                    self.stdout.write(f"{':'.join(key)} stored={stored.get(key)} expected={expected.get(key)}")
+                if drift:
+                    raise CommandError(f"{len(drift)} rollup row(s) drifted; run rebuild_rollups to fix.")
+                self.stdout.write(self.style.SUCCESS(f"{len(stored)} rollup row(s) match the request and archive tables."))
+                return
+
+            SpendRollup.objects.all().delete()
+            SpendRollup.objects.bulk_create(
+                [
+                    SpendRollup(dimension=dimension, bucket=bucket, status=status, **dict(zip(MEASURES, values)))
+                    for (dimension, bucket, status), values in expected.items()
+                ],
+                batch_size=500,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(expected)} rollup row(s); {len(drift)} had drifted."))
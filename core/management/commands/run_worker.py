@@ -0,0 +1,58 @@
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from core.services.jobs import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Process queued background jobs (proforma extraction, ...) without an external broker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=settings.JOB_CONCURRENCY,
+                            help="Number of worker threads.")
+        parser.add_argument("--visibility-timeout", type=int, default=settings.JOB_VISIBILITY_TIMEOUT,
+                            help="Seconds a claimed job stays invisible before another worker may retry it.")
+        parser.add_argument("--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL,
+                            help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--kind", action="append", dest="kinds",
+                            help="Only process jobs of this kind (repeatable).")
+        parser.add_argument("--once", action="store_true",
+                            help="Exit once the queue is drained instead of polling forever.")
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        stop = threading.Event()
+        base_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        def loop(n):
+            worker_id = f"{base_id}:{n}"
+            try:
+                while not stop.is_set():
+                    close_old_connections()
+                    job = claim_job(worker_id, options["visibility_timeout"], options["kinds"])
+                    if job is None:
+                        if options["once"]:
+                            return
+                        stop.wait(options["poll_interval"])
+                        continue
+                    run_job(job)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=loop, args=(n,), daemon=True) for n in range(concurrency)]
+        self.stdout.write(f"Starting {concurrency} job worker thread(s)")
+        for t in threads:
+            t.start()
+        try:
+            while any(t.is_alive() for t in threads):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            stop.set()
+            for t in threads:
+                t.join()
@@ -0,0 +1,81 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import User
+from core.services import seeding
+
+
+class Command(BaseCommand):
+    help = "Generate users per role and requests with items, approvals, POs and synthetic documents for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--staff", type=int, default=20, help="Staff users to create.")
+        parser.add_argument("--approvers", type=int, default=5, help="Approvers to create per level.")
+        parser.add_argument("--finance", type=int, default=2, help="Finance users to create.")
+        parser.add_argument("--prefix", default="seed", help="Username prefix, e.g. seed-staff-1.")
+        parser.add_argument("--password", default="seed-password", help="Password of every seeded user.")
+        parser.add_argument("--max-items", type=int, default=4, help="Items per request (1..N).")
+        parser.add_argument("--days", type=int, default=180, help="Spread creation dates over the last N days.")
+        parser.add_argument("--mix", default="approved=30,rejected=10,partial=20,pending=40",
+                            help="Relative weights of the request outcomes (partial = approved at level 1 only).")
+        parser.add_argument("--receipts", type=float, default=0.6,
+                            help="Share of approved requests that get a receipt.")
+        parser.add_argument("--files", action="store_true",
+                            help="Attach synthetic proforma and receipt PDFs (slower, fills MEDIA_ROOT).")
+        parser.add_argument("--batch-size", type=int, default=500, help="Requests written per transaction.")
+        parser.add_argument("--seed", type=int, help="Random seed for a reproducible data set.")
+        parser.add_argument("--credentials", default="seed_users.json",
+                            help="Write the seeded usernames and password here for benchmarks/loadtest.py "
+                                 "('' to skip).")
+
+    def _mix(self, value):
+        weights = {"approved": 0.0, "rejected": 0.0, "partial": 0.0, "pending": 0.0}
+        try:
+            for part in filter(None, value.split(",")):
+                name, weight = part.split("=")
+                if name.strip() not in weights:
+                    raise ValueError(name)
+                weights[name.strip()] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid --mix {value!r}; expected e.g. approved=30,rejected=10,partial=20,pending=40.")
+        if not any(weights.values()):
+            raise CommandError("--mix needs at least one positive weight.")
+        return tuple(weights.values())
+
+    def handle(self, *args, **options):
+        users = {
+            User.ROLE_STAFF: options["staff"],
+            User.ROLE_APPROVER_L1: options["approvers"],
+            User.ROLE_APPROVER_L2: options["approvers"],
+            User.ROLE_FINANCE: options["finance"],
+        }
+        try:
+            result = seeding.seed(
+                options["requests"],
+                users,
+                prefix=options["prefix"],
+                password=options["password"],
+                days=options["days"],
+                max_items=options["max_items"],
+                ratios=self._mix(options["mix"]),
+                files=options["files"],
+                receipt_ratio=options["receipts"],
+                batch_size=options["batch_size"],
+                random_seed=options["seed"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options["credentials"]:
+            with open(options["credentials"], "w", encoding="utf-8") as out:
+                json.dump({"password": options["password"], "users": result.users}, out, indent=2)
+        statuses = ", ".join(f"{count} {status}" for status, count in sorted(result.statuses.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {sum(len(names) for names in result.users.values())} user(s) and {result.requests} request(s) "
+            f"({statuses}) with {result.items} item(s), {result.approvals} approval(s), "
+            f"{result.purchase_orders} PO(s) and {result.receipts} receipt(s)."
+        ))
+        if options["credentials"]:
+            self.stdout.write(f"Credentials written to {options['credentials']}.")
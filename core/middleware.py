@@ -0,0 +1,50 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .services import metrics
+
+
+class ServerTimingMiddleware:
+    """Time each request, count its queries and report both.
+
+    Adds a ``Server-Timing`` header (``db``, ``serialize``, ``documents`` and
+    ``total``) and feeds the per-endpoint registry behind ``/api/metrics/``.
+    Streaming responses are measured up to their first byte.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings, token = metrics.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.stop(token)
+        return self._finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings, token = metrics.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.stop(token)
+        return self._finish(request, response, timings)
+
+    def _finish(self, request, response, timings):
+        total = timings.elapsed()
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = timings.server_timing(total)
+        match = getattr(request, "resolver_match", None)
+        # URL names keep the label set small (ids are not part of them)
+        endpoint = match.view_name if match else "unmatched"
+        metrics.registry.observe(endpoint, request.method, response.status_code, total, timings)
+        return response
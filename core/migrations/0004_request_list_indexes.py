@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_extraction_cache'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['-created_at', '-id'], name='core_pr_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='core_pr_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='core_pr_status_created_idx'),
+        ),
+    ]
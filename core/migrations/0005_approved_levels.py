@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:08
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_approved_levels(apps, schema_editor):
+    PurchaseRequest = apps.get_model("core", "PurchaseRequest")
+    Approval = apps.get_model("core", "Approval")
+    levels = Approval.objects.filter(status="approved").values_list("level", flat=True).distinct()
+    for level in levels:
+        approved = Approval.objects.filter(status="approved", level=level).values("request_id")
+        PurchaseRequest.objects.filter(pk__in=approved).update(
+            approved_levels=F("approved_levels").bitor(1 << (level - 1))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_request_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaserequest',
+            name='approved_levels',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_approved_levels, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='approval',
+            index=models.Index(fields=['approver', 'request'], name='core_approval_approver_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['approved_levels', '-created_at', '-id'], name='core_pr_pending_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:10
+
+from django.db import migrations, models
+
+
+def create_sequence(apps, schema_editor):
+    PurchaseOrderSequence = apps.get_model("core", "PurchaseOrderSequence")
+    PurchaseOrderSequence.objects.get_or_create(name="purchase_order")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_approved_levels'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseOrderSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:13
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# Frozen copies of core.services.rollups as of this migration, so later changes there can't break it
+MEASURES = (
+    "request_count",
+    "amount",
+    "po_count",
+    "po_amount",
+    "receipt_validated_count",
+    "receipt_validated_amount",
+)
+SNAPSHOT_FIELDS = ("status", "amount", "vendor", "created_by_id", "created_at", "purchase_order_id", "receipt_validated")
+ZERO = Decimal("0")
+
+
+def accumulate(rows):
+    totals = defaultdict(lambda: [0, ZERO, 0, ZERO, 0, ZERO])
+    for row in rows:
+        amount = row["amount"] or ZERO
+        has_po = row["purchase_order_id"] is not None
+        validated = has_po and bool(row["receipt_validated"])
+        measures = (1, amount, int(has_po), amount if has_po else ZERO, int(validated), amount if validated else ZERO)
+        status = row["status"]
+        for key in (
+            ("all", "", status),
+            ("vendor", row["vendor"] or "", status),
+            ("creator", str(row["created_by_id"]), status),
+            ("month", row["created_at"].strftime("%Y-%m"), status),
+        ):
+            current = totals[key]
+            for i, value in enumerate(measures):
+                current[i] += value
+    return totals
+
+
+def backfill(apps, schema_editor):
+    PurchaseRequest = apps.get_model("core", "PurchaseRequest")
+    RequestItem = apps.get_model("core", "RequestItem")
+    SpendRollup = apps.get_model("core", "SpendRollup")
+
+    vendors = {}
+    for request_id, vendor in RequestItem.objects.exclude(vendor="").order_by("-pk").values_list("request_id", "vendor"):
+        vendors[request_id] = vendor
+    for pr in PurchaseRequest.objects.select_related("purchase_order").only("pk", "vendor", "purchase_order__vendor"):
+        vendor = vendors.get(pr.pk) or (pr.purchase_order.vendor if pr.purchase_order else "")
+        if vendor:
+            PurchaseRequest.objects.filter(pk=pr.pk).update(vendor=vendor)
+
+    totals = accumulate(PurchaseRequest.objects.values(*SNAPSHOT_FIELDS).iterator())
+    SpendRollup.objects.bulk_create(
+        [
+            SpendRollup(dimension=dimension, bucket=bucket, status=status, **dict(zip(MEASURES, values)))
+            for (dimension, bucket, status), values in totals.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_response_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaserequest',
+            name='receipt_validated',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='purchaserequest',
+            name='vendor',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.CreateModel(
+            name='SpendRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('all', 'All'), ('vendor', 'Vendor'), ('creator', 'Creator'), ('month', 'Month')], max_length=16)),
+                ('bucket', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], max_length=20)),
+                ('request_count', models.BigIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('po_count', models.BigIntegerField(default=0)),
+                ('po_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('receipt_validated_count', models.BigIntegerField(default=0)),
+                ('receipt_validated_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'bucket', 'status'), name='core_spend_rollup_key')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
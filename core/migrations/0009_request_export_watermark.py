@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_spend_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['updated_at', 'id'], name='core_pr_updated_id_idx'),
+        ),
+    ]
@@ -0,0 +1,122 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE core_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(vendor, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(body, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX core_search_vector_idx ON core_searchdocument USING GIN (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS core_search_vector_idx",
+    "ALTER TABLE core_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+# External-content FTS5 table: the text lives once, in core_searchdocument
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_search_fts USING fts5(
+        title, vendor, description, body,
+        content='core_searchdocument', content_rowid='request_id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER core_search_fts_ai AFTER INSERT ON core_searchdocument BEGIN
+        INSERT INTO core_search_fts(rowid, title, vendor, description, body)
+        VALUES (new.request_id, new.title, new.vendor, new.description, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_fts_ad AFTER DELETE ON core_searchdocument BEGIN
+        INSERT INTO core_search_fts(core_search_fts, rowid, title, vendor, description, body)
+        VALUES ('delete', old.request_id, old.title, old.vendor, old.description, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_fts_au AFTER UPDATE ON core_searchdocument BEGIN
+        INSERT INTO core_search_fts(core_search_fts, rowid, title, vendor, description, body)
+        VALUES ('delete', old.request_id, old.title, old.vendor, old.description, old.body);
+        INSERT INTO core_search_fts(rowid, title, vendor, description, body)
+        VALUES (new.request_id, new.title, new.vendor, new.description, new.body);
+    END
+    """,
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_search_fts_au",
+    "DROP TRIGGER IF EXISTS core_search_fts_ad",
+    "DROP TRIGGER IF EXISTS core_search_fts_ai",
+    "DROP TABLE IF EXISTS core_search_fts",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_BACKWARD, "sqlite": SQLITE_BACKWARD})
+
+
+def backfill(apps, schema_editor):
+    PurchaseRequest = apps.get_model("core", "PurchaseRequest")
+    SearchDocument = apps.get_model("core", "SearchDocument")
+    rows = PurchaseRequest.objects.values_list("pk", "created_by_id", "title", "vendor", "description").iterator()
+    batch = []
+    for pk, owner_id, title, vendor, description in rows:
+        batch.append(SearchDocument(request_id=pk, owner_id=owner_id, title=title, vendor=vendor, description=description))
+        if len(batch) == 1000:
+            SearchDocument.objects.bulk_create(batch)
+            batch = []
+    SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_request_export_watermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('request', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='core.purchaserequest')),
+                ('owner_id', models.BigIntegerField(db_index=True)),
+                ('title', models.TextField(blank=True)),
+                ('vendor', models.TextField(blank=True)),
+                ('description', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DocumentExtraction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('proforma', 'Proforma'), ('receipt', 'Receipt')], max_length=20)),
+                ('sha256', models.CharField(blank=True, max_length=64)),
+                ('extractor_version', models.CharField(max_length=32)),
+                ('text', models.TextField(blank=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='extractions', to='core.purchaserequest')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('request', 'kind'), name='core_extraction_request_kind')],
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
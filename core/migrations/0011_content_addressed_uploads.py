@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:25
+
+import core.storage
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('digest', models.CharField(db_index=True, max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='purchaserequest',
+            name='proforma',
+            field=models.FileField(blank=True, null=True, storage=core.storage.upload_storage, upload_to='proformas/'),
+        ),
+        migrations.AlterField(
+            model_name='purchaserequest',
+            name='receipt',
+            field=models.FileField(blank=True, null=True, storage=core.storage.upload_storage, upload_to='receipts/'),
+        ),
+    ]
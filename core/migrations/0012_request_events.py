@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:27
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_content_addressed_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('request_id', models.BigIntegerField()),
+                ('owner_id', models.BigIntegerField()),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('po_generated', 'PO generated'), ('receipt_validated', 'Receipt validated')], max_length=32)),
+                ('level', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('status', models.CharField(max_length=20)),
+                ('approved_levels', models.PositiveSmallIntegerField(default=0)),
+                ('previous_status', models.CharField(blank=True, max_length=20)),
+                ('previous_levels', models.PositiveSmallIntegerField(default=0)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:57
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_user_auth_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaserequest',
+            name='required_levels',
+            field=models.PositiveSmallIntegerField(default=3),
+        ),
+        migrations.CreateModel(
+            name='ApprovalPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('priority', models.PositiveIntegerField(default=100, help_text='Rules are tried from the lowest priority up.')),
+                ('min_amount', models.DecimalField(blank=True, decimal_places=2, help_text='Inclusive; blank for no lower bound.', max_digits=12, null=True)),
+                ('max_amount', models.DecimalField(blank=True, decimal_places=2, help_text='Exclusive; blank for no upper bound.', max_digits=12, null=True)),
+                ('vendor', models.CharField(blank=True, help_text='Matched case-insensitively; blank for any vendor.', max_length=255)),
+                ('required_levels', models.PositiveSmallIntegerField(choices=[(1, 'Level 1'), (2, 'Level 2'), (3, 'Levels 1 and 2')], default=3)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'approval policies',
+                'ordering': ['priority', 'id'],
+                'constraints': [models.CheckConstraint(condition=models.Q(('min_amount__isnull', True), ('max_amount__isnull', True), ('min_amount__lt', models.F('max_amount')), _connector='OR'), name='core_approval_policy_amount_range', violation_error_message='The minimum amount must be below the maximum amount.')],
+            },
+        ),
+    ]
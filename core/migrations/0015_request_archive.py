@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:01
+
+import core.storage
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_approval_policies'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPurchaseRequest',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('vendor', models.CharField(blank=True, max_length=255)),
+                ('proforma', models.FileField(blank=True, null=True, storage=core.storage.upload_storage, upload_to='proformas/')),
+                ('receipt', models.FileField(blank=True, null=True, storage=core.storage.upload_storage, upload_to='receipts/')),
+                ('receipt_validated', models.BooleanField(blank=True, null=True)),
+                ('extraction_status', models.CharField(choices=[('none', 'None'), ('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed')], max_length=20)),
+                ('approved_levels', models.PositiveSmallIntegerField(default=0)),
+                ('required_levels', models.PositiveSmallIntegerField(default=3)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_by', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_requests', to=settings.AUTH_USER_MODEL)),
+                ('purchase_order', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.purchaseorder')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedApproval',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('level', models.PositiveSmallIntegerField()),
+                ('status', models.CharField(choices=[('approved', 'Approved'), ('rejected', 'Rejected')], max_length=20)),
+                ('comment', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('approver', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('request', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='approvals', to='core.archivedpurchaserequest')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedRequestItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('vendor', models.CharField(blank=True, max_length=255)),
+                ('request', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='core.archivedpurchaserequest')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedpurchaserequest',
+            index=models.Index(fields=['created_by', '-created_at'], name='core_archpr_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedpurchaserequest',
+            index=models.Index(fields=['purchase_order'], name='core_archpr_po_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedpurchaserequest',
+            index=models.Index(fields=['archived_at'], name='core_archpr_archived_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedapproval',
+            index=models.Index(fields=['approver', 'request'], name='core_archapproval_approver_idx'),
+        ),
+    ]
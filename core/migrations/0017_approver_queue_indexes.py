@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:22
+
+import django.db.models.expressions
+import django.db.models.lookups
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_export_tombstones'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='purchaserequest',
+            name='core_pr_pending_queue_idx',
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(condition=models.Q(django.db.models.lookups.Exact(django.db.models.expressions.CombinedExpression(models.F('approved_levels'), '&', models.Value(1)), 0), ('status', 'pending')), fields=['-created_at', '-id'], name='core_pr_pending_l1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(condition=models.Q(django.db.models.lookups.Exact(django.db.models.expressions.CombinedExpression(models.F('approved_levels'), '&', models.Value(2)), 0), ('status', 'pending')), fields=['-created_at', '-id'], name='core_pr_pending_l2_idx'),
+        ),
+    ]
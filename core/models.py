@@ -2,8 +2,12 @@ from __future__ import annotations
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.lookups import Exact
 from django.utils import timezone
 
+from .storage import upload_storage
+
 
 class User(AbstractUser):
     ROLE_STAFF = "staff"
@@ -18,7 +22,32 @@ class User(AbstractUser):
         (ROLE_FINANCE, "Finance"),
     ]
 
+    APPROVER_ROLES = (ROLE_APPROVER_L1, ROLE_APPROVER_L2)
+
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default=ROLE_STAFF)
+    # Embedded in JWTs and bumped whenever a change must invalidate the tokens already
+    # issued (see core/authentication.py); queryset.update() bypasses save() and the bump
+    auth_version = models.PositiveIntegerField(default=0)
+
+    AUTH_FIELDS = ("role", "is_active", "password")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._auth_state = user._auth_fields()
+        return user
+
+    def _auth_fields(self):
+        return tuple(self.__dict__.get(name) for name in self.AUTH_FIELDS)
+
+    def save(self, *args, **kwargs):
+        state = getattr(self, "_auth_state", None)
+        if state is not None and self._auth_fields() != state:
+            self.auth_version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "auth_version"}
+        super().save(*args, **kwargs)
+        self._auth_state = self._auth_fields()
 
 
 class PurchaseOrder(models.Model):
@@ -33,6 +62,26 @@ class PurchaseOrder(models.Model):
         return self.number
 
 
+class PurchaseOrderSequence(models.Model):
+    """Counter row handing out gap-free purchase order numbers (see services/purchase_orders.py)."""
+
+    name = models.CharField(max_length=64, unique=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.name}={self.last_value}"
+
+
+class CacheVersion(models.Model):
+    """Monotonic counter per cache scope (e.g. ``user:42``, ``role:finance``) used to version cached lists."""
+
+    key = models.CharField(max_length=64, primary_key=True)
+    value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.key}={self.value}"
+
+
 class PurchaseRequest(models.Model):
     STATUS_PENDING = "pending"
     STATUS_APPROVED = "approved"
@@ -44,6 +93,18 @@ class PurchaseRequest(models.Model):
         (STATUS_REJECTED, "Rejected"),
     ]
 
+    EXTRACTION_NONE = "none"
+    EXTRACTION_PENDING = "pending"
+    EXTRACTION_COMPLETED = "completed"
+    EXTRACTION_FAILED = "failed"
+
+    EXTRACTION_CHOICES = [
+        (EXTRACTION_NONE, "None"),
+        (EXTRACTION_PENDING, "Pending"),
+        (EXTRACTION_COMPLETED, "Completed"),
+        (EXTRACTION_FAILED, "Failed"),
+    ]
+
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
@@ -52,13 +113,46 @@ class PurchaseRequest(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
-    proforma = models.FileField(upload_to="proformas/", blank=True, null=True)
-    receipt = models.FileField(upload_to="receipts/", blank=True, null=True)
+    # Vendor of the first item that names one (or of the PO); denormalized for reporting
+    vendor = models.CharField(max_length=255, blank=True)
+
+    # Content-addressed: stored once per distinct content under blobs/ (see core/storage.py)
+    proforma = models.FileField(upload_to="proformas/", storage=upload_storage, blank=True, null=True)
+    receipt = models.FileField(upload_to="receipts/", storage=upload_storage, blank=True, null=True)
+    # Outcome of the last receipt check against the PO; null until one was validated
+    receipt_validated = models.BooleanField(blank=True, null=True)
+    extraction_status = models.CharField(max_length=20, choices=EXTRACTION_CHOICES, default=EXTRACTION_NONE)
+    # Bitmask of approval levels granted so far (bit ``level - 1``), kept in sync by approve()
+    approved_levels = models.PositiveSmallIntegerField(default=0)
+    # Bitmask of the levels this request needs, routed by the ApprovalPolicy rules when its
+    # amount or vendor is set (see core/services/approval_policy.py)
+    required_levels = models.PositiveSmallIntegerField(default=0b11)
+    # Bumped on every change that affects the API representation; backs the detail ETag
+    version = models.PositiveIntegerField(default=1)
 
     purchase_order = models.OneToOneField(
         PurchaseOrder, on_delete=models.SET_NULL, blank=True, null=True, related_name="request"
     )
 
+    class Meta:
+        indexes = [
+            # Incremental export watermark
+            models.Index(fields=["updated_at", "id"], name="core_pr_updated_id_idx"),
+            models.Index(fields=["-created_at", "-id"], name="core_pr_created_id_idx"),
+            models.Index(fields=["created_by", "-created_at", "-id"], name="core_pr_owner_created_idx"),
+            models.Index(fields=["status", "-created_at", "-id"], name="core_pr_status_created_idx"),
+            # Approver queues, one per level: pending requests still missing it. The condition repeats
+            # visibility_q's bitand predicate so the planner can match it; a plain column index can't serve it
+            *(
+                models.Index(
+                    fields=["-created_at", "-id"],
+                    condition=models.Q(Exact(F("approved_levels").bitand(1 << (level - 1)), 0), status="pending"),
+                    name=f"core_pr_pending_l{level}_idx",
+                )
+                for level in (1, 2)
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"#{self.pk} {self.title} ({self.status})"
 
@@ -66,7 +160,7 @@ class PurchaseRequest(models.Model):
     def approve(self, user: User) -> None:
         if self.status != self.STATUS_PENDING:
             raise ValueError("Only pending requests can be approved.")
-        if user.role not in (User.ROLE_APPROVER_L1, User.ROLE_APPROVER_L2):
+        if user.role not in User.APPROVER_ROLES:
             raise PermissionError("User not allowed to approve.")
 
         # Lock row to prevent races
@@ -75,33 +169,36 @@ class PurchaseRequest(models.Model):
             .filter(pk=self.pk)
             .get()
         )
+        if locked.status != self.STATUS_PENDING:
+            raise ValueError("Only pending requests can be approved.")
 
         # Prevent duplicate approvals per level
-        existing = self.approvals.filter(level=Approval.level_for_role(user.role), status=Approval.STATUS_APPROVED)
-        if existing.exists():
+        level = Approval.level_for_role(user.role)
+        bit = Approval.level_bit(level)
+        if locked.approved_levels & bit:
             return
+        if not locked.required_levels & bit:
+            raise PermissionError("This request does not need an approval at your level.")
 
         Approval.objects.create(
             request=self,
-            approver=user,
-            level=Approval.level_for_role(user.role),
+            approver_id=user.pk,
+            level=level,
             status=Approval.STATUS_APPROVED,
         )
 
         # If all required levels approved, mark approved and generate PO
-        levels_required = {1, 2}
-        approved_levels = set(
-            self.approvals.filter(status=Approval.STATUS_APPROVED).values_list("level", flat=True)
-        )
-        if levels_required.issubset(approved_levels):
+        self.approved_levels = locked.approved_levels | bit
+        self.required_levels = locked.required_levels
+        if self.approved_levels & self.required_levels == self.required_levels:
             self.status = self.STATUS_APPROVED
-            self.save(update_fields=["status"])
+        self.save(update_fields=["approved_levels", "status", "updated_at"])
 
     @transaction.atomic
     def reject(self, user: User, reason: str = "") -> None:
         if self.status != self.STATUS_PENDING:
             raise ValueError("Only pending requests can be rejected.")
-        if user.role not in (User.ROLE_APPROVER_L1, User.ROLE_APPROVER_L2):
+        if user.role not in User.APPROVER_ROLES:
             raise PermissionError("User not allowed to reject.")
 
         locked = (
@@ -109,17 +206,152 @@ class PurchaseRequest(models.Model):
             .filter(pk=self.pk)
             .get()
         )
+        if locked.status != self.STATUS_PENDING:
+            raise ValueError("Only pending requests can be rejected.")
 
         Approval.objects.create(
             request=self,
-            approver=user,
+            approver_id=user.pk,
             level=Approval.level_for_role(user.role),
             status=Approval.STATUS_REJECTED,
             comment=reason,
         )
 
         self.status = self.STATUS_REJECTED
-        self.save(update_fields=["status"])
+        self.save(update_fields=["status", "updated_at"])
+
+    @classmethod
+    def visibility_q(cls, user, **fields) -> Q:
+        """Filter for the requests ``user`` may see.
+
+        ``fields`` renames ``pk``, ``created_by``, ``status``,
+        ``approved_levels`` and ``required_levels`` so the same rules apply to
+        tables mirroring them; ``required_levels=None`` for tables without
+        routing, where approvers see every pending request missing their level.
+        """
+        f = {
+            "pk": "pk",
+            "created_by": "created_by",
+            "status": "status",
+            "approved_levels": "approved_levels",
+            "required_levels": "required_levels",
+            **fields,
+        }
+        if user.role == User.ROLE_STAFF:
+            return Q(**{f["created_by"]: user.pk})
+        if user.role in User.APPROVER_ROLES:
+            # Pending requests routed to and still awaiting their level, or ones they've reviewed
+            bit = Approval.level_bit(Approval.level_for_role(user.role))
+            reviewed = Approval.objects.filter(approver_id=user.pk).values("request_id")
+            awaiting = Q(Exact(F(f["approved_levels"]).bitand(bit), 0), **{f["status"]: cls.STATUS_PENDING})
+            if f["required_levels"] is not None:
+                awaiting &= ~Q(Exact(F(f["required_levels"]).bitand(bit), 0))
+            return awaiting | Q(**{f"{f['pk']}__in": reviewed})
+        if user.role == User.ROLE_FINANCE:
+            return Q()
+        return Q(**{f"{f['pk']}__in": []})
+
+    @staticmethod
+    def vendor_from_items(items) -> str:
+        return next((item.vendor for item in items if item.vendor), "")
+
+    def items_total(self):
+        """Sum of ``quantity * unit_price`` over the items, computed by the database."""
+        total = self.items.aggregate(
+            total=models.Sum(F("quantity") * F("unit_price"), output_field=models.DecimalField(max_digits=14, decimal_places=2))
+        )["total"]
+        return total or 0
+
+    # Per-request outcomes of bulk_approve()/bulk_reject()
+    BULK_APPROVED = "approved"
+    BULK_RECORDED = "recorded"
+    BULK_ALREADY_APPROVED = "already_approved"
+    BULK_REJECTED = "rejected"
+    BULK_NOT_PENDING = "not_pending"
+    BULK_NOT_FOUND = "not_found"
+
+    @classmethod
+    def _lock_for_review(cls, user: User, ids, action: str):
+        if user.role not in User.APPROVER_ROLES:
+            raise PermissionError(f"User not allowed to {action}.")
+        ids = sorted(set(ids))
+        # One statement locks the whole batch; ordering by pk gives every
+        # concurrent batch the same lock order, so they cannot deadlock.
+        # Requests the caller can't see come back as not_found, like the detail view's 404
+        locked = {
+            pr.pk: pr
+            for pr in cls.objects.select_for_update()
+            .filter(cls.visibility_q(user), pk__in=ids)
+            .order_by("pk")
+            .only("pk", "status", "approved_levels", "required_levels")
+        }
+        return ids, locked
+
+    @classmethod
+    @transaction.atomic
+    def bulk_approve(cls, user: User, ids) -> dict:
+        """Approve many requests at the caller's level with a constant number of queries.
+
+        Returns ``{id: outcome}`` where ``approved`` means the request is now
+        fully approved and ``recorded`` that it still awaits other levels.
+        Requests outside the caller's ``visibility_q``, including ones not
+        routed to the caller's level, are ``not_found``.
+        """
+        ids, locked = cls._lock_for_review(user, ids, "approve")
+        level = Approval.level_for_role(user.role)
+        bit = Approval.level_bit(level)
+
+        results, approvals, touched, completed = {}, [], [], []
+        for pk in ids:
+            pr = locked.get(pk)
+            if pr is None:
+                results[pk] = cls.BULK_NOT_FOUND
+            elif pr.status != cls.STATUS_PENDING:
+                results[pk] = cls.BULK_NOT_PENDING
+            elif pr.approved_levels & bit:
+                results[pk] = cls.BULK_ALREADY_APPROVED
+            else:
+                approvals.append(Approval(request_id=pk, approver_id=user.pk, level=level, status=Approval.STATUS_APPROVED))
+                touched.append(pk)
+                if (pr.approved_levels | bit) & pr.required_levels == pr.required_levels:
+                    completed.append(pk)
+                    results[pk] = cls.BULK_APPROVED
+                else:
+                    results[pk] = cls.BULK_RECORDED
+
+        if approvals:
+            now = timezone.now()
+            Approval.objects.bulk_create(approvals)
+            cls.objects.filter(pk__in=touched).update(approved_levels=F("approved_levels").bitor(bit), updated_at=now)
+            if completed:
+                cls.objects.filter(pk__in=completed).update(status=cls.STATUS_APPROVED, updated_at=now)
+        return results
+
+    @classmethod
+    @transaction.atomic
+    def bulk_reject(cls, user: User, ids, reason: str = "") -> dict:
+        ids, locked = cls._lock_for_review(user, ids, "reject")
+        level = Approval.level_for_role(user.role)
+
+        results, approvals = {}, []
+        for pk in ids:
+            pr = locked.get(pk)
+            if pr is None:
+                results[pk] = cls.BULK_NOT_FOUND
+            elif pr.status != cls.STATUS_PENDING:
+                results[pk] = cls.BULK_NOT_PENDING
+            else:
+                approvals.append(
+                    Approval(request_id=pk, approver_id=user.pk, level=level, status=Approval.STATUS_REJECTED, comment=reason)
+                )
+                results[pk] = cls.BULK_REJECTED
+
+        if approvals:
+            Approval.objects.bulk_create(approvals)
+            cls.objects.filter(pk__in=[a.request_id for a in approvals]).update(
+                status=cls.STATUS_REJECTED, updated_at=timezone.now()
+            )
+        return results
 
 
 class RequestItem(models.Model):
@@ -150,9 +382,385 @@ class Approval(models.Model):
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["approver", "request"], name="core_approval_approver_idx"),
+        ]
+
+    ROLE_LEVELS = {User.ROLE_APPROVER_L1: 1, User.ROLE_APPROVER_L2: 2}
+
     @staticmethod
     def level_for_role(role: str) -> int:
-        return 1 if role == User.ROLE_APPROVER_L1 else 2
+        return Approval.ROLE_LEVELS[role]
+
+    @staticmethod
+    def level_bit(level: int) -> int:
+        return 1 << (level - 1)
+
+    def __str__(self) -> str:
+        return f"Req {self.request_id} L{self.level} {self.status} by {self.approver_id}"
+
+
+class ApprovalPolicy(models.Model):
+    """Routing rule: the approval levels a request needs, by amount range and vendor.
+
+    The first active rule in ``priority`` order matching a request wins;
+    requests no rule matches need every level. The rules are compiled into an
+    in-memory lookup by ``core.services.approval_policy``, and saving or
+    deleting one re-routes the pending requests (``queryset.update()`` and
+    ``bulk_create()`` bypass this).
+    """
+
+    LEVELS_CHOICES = [
+        (0b01, "Level 1"),
+        (0b10, "Level 2"),
+        (0b11, "Levels 1 and 2"),
+    ]
+
+    name = models.CharField(max_length=255)
+    priority = models.PositiveIntegerField(default=100, help_text="Rules are tried from the lowest priority up.")
+    min_amount = models.DecimalField(
+        max_digits=12, decimal_places=2, blank=True, null=True, help_text="Inclusive; blank for no lower bound."
+    )
+    max_amount = models.DecimalField(
+        max_digits=12, decimal_places=2, blank=True, null=True, help_text="Exclusive; blank for no upper bound."
+    )
+    vendor = models.CharField(max_length=255, blank=True, help_text="Matched case-insensitively; blank for any vendor.")
+    required_levels = models.PositiveSmallIntegerField(choices=LEVELS_CHOICES, default=0b11)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["priority", "id"]
+        verbose_name_plural = "approval policies"
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(min_amount__isnull=True) | Q(max_amount__isnull=True) | Q(min_amount__lt=F("max_amount")),
+                name="core_approval_policy_amount_range",
+                violation_error_message="The minimum amount must be below the maximum amount.",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+    def save(self, *args, **kwargs):
+        from .services import approval_policy
+
+        super().save(*args, **kwargs)
+        approval_policy.policies_changed()
+
+    def delete(self, *args, **kwargs):
+        from .services import approval_policy
+
+        result = super().delete(*args, **kwargs)
+        approval_policy.policies_changed()
+        return result
+
+
+class BackgroundJob(models.Model):
+    """A unit of deferred work picked up by the ``run_worker`` management command."""
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=128, blank=True)
+    locked_until = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="core_job_status_run_after_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Job #{self.pk} {self.kind} ({self.status})"
+
+
+
+class ExtractionCacheEntry(models.Model):
+    """Text extracted from a document, keyed by the SHA-256 of its bytes."""
+
+    digest = models.CharField(max_length=64)
+    extractor_version = models.CharField(max_length=32)
+    text = models.TextField()
+    size = models.PositiveIntegerField(default=0)
+    hits = models.PositiveIntegerField(default=0)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["digest", "extractor_version"], name="core_extraction_cache_key"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.digest[:12]}@{self.extractor_version}"
+
+
+class SpendRollup(models.Model):
+    """Pre-aggregated request counts/amounts per reporting dimension and status.
+
+    Maintained incrementally by ``core.services.rollups``; rebuilt from scratch
+    with ``manage.py rebuild_rollups``.
+    """
+
+    DIMENSION_ALL = "all"
+    DIMENSION_VENDOR = "vendor"
+    DIMENSION_CREATOR = "creator"
+    DIMENSION_MONTH = "month"
+
+    DIMENSION_CHOICES = [
+        (DIMENSION_ALL, "All"),
+        (DIMENSION_VENDOR, "Vendor"),
+        (DIMENSION_CREATOR, "Creator"),
+        (DIMENSION_MONTH, "Month"),
+    ]
+
+    dimension = models.CharField(max_length=16, choices=DIMENSION_CHOICES)
+    bucket = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=PurchaseRequest.STATUS_CHOICES)
+    request_count = models.BigIntegerField(default=0)
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    po_count = models.BigIntegerField(default=0)
+    po_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    receipt_validated_count = models.BigIntegerField(default=0)
+    receipt_validated_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["dimension", "bucket", "status"], name="core_spend_rollup_key"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.dimension}:{self.bucket}:{self.status}"
+
+
+class DocumentExtraction(models.Model):
+    """Text and parsed metadata extracted from a request's proforma or receipt."""
+
+    KIND_PROFORMA = "proforma"
+    KIND_RECEIPT = "receipt"
+
+    KIND_CHOICES = [
+        (KIND_PROFORMA, "Proforma"),
+        (KIND_RECEIPT, "Receipt"),
+    ]
+
+    request = models.ForeignKey(PurchaseRequest, on_delete=models.CASCADE, related_name="extractions")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    sha256 = models.CharField(max_length=64, blank=True)
+    extractor_version = models.CharField(max_length=32)
+    text = models.TextField(blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            # Only the current file of each kind is kept
+            models.UniqueConstraint(fields=["request", "kind"], name="core_extraction_request_kind"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} of request {self.request_id}"
+
+
+class SearchDocument(models.Model):
+    """Denormalized searchable text of a request, maintained by ``core.services.search``.
+
+    The full-text index over it lives outside the ORM: a generated ``tsvector``
+    column with a GIN index on Postgres, an FTS5 table on SQLite.
+    """
+
+    request = models.OneToOneField(PurchaseRequest, on_delete=models.CASCADE, primary_key=True, related_name="+")
+    owner_id = models.BigIntegerField(db_index=True)
+    title = models.TextField(blank=True)
+    vendor = models.TextField(blank=True)
+    description = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+
+
+class StoredBlob(models.Model):
+    """Reference count of a content-addressed upload (see ``core.storage``)."""
+
+    name = models.CharField(max_length=255, unique=True)
+    digest = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class RequestEvent(models.Model):
+    """Append-only log of request changes, streamed to clients (``/api/requests/events/``).
+
+    The state before and after the change is copied onto the row so events
+    can be filtered with the same rules as the request list, even after the
+    request itself was deleted.
+    """
+
+    KIND_CREATED = "created"
+    KIND_APPROVED = "approved"
+    KIND_REJECTED = "rejected"
+    KIND_PO_GENERATED = "po_generated"
+    KIND_RECEIPT_VALIDATED = "receipt_validated"
+
+    KIND_CHOICES = [
+        (KIND_CREATED, "Created"),
+        (KIND_APPROVED, "Approved"),
+        (KIND_REJECTED, "Rejected"),
+        (KIND_PO_GENERATED, "PO generated"),
+        (KIND_RECEIPT_VALIDATED, "Receipt validated"),
+    ]
+
+    request_id = models.BigIntegerField()
+    owner_id = models.BigIntegerField()
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    level = models.PositiveSmallIntegerField(blank=True, null=True)
+    status = models.CharField(max_length=20)
+    approved_levels = models.PositiveSmallIntegerField(default=0)
+    # State before the change; an empty status means the request didn't exist
+    previous_status = models.CharField(max_length=20, blank=True)
+    previous_levels = models.PositiveSmallIntegerField(default=0)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    @classmethod
+    def visibility_q(cls, user) -> Q:
+        """Events of requests ``user`` could see before or after the change."""
+        after = PurchaseRequest.visibility_q(user, pk="request_id", created_by="owner_id", required_levels=None)
+        before = PurchaseRequest.visibility_q(
+            user,
+            pk="request_id",
+            created_by="owner_id",
+            status="previous_status",
+            approved_levels="previous_levels",
+            required_levels=None,
+        )
+        return after | before
+
+
+class ArchivedPurchaseRequest(models.Model):
+    """A closed request moved out of the working tables by ``manage.py archive_requests``.
+
+    Keeps the columns and id of the live row, plus ``archived_at``. Foreign
+    keys have no database constraints so the table can be range-partitioned
+    by ``created_at`` on Postgres (``archive_requests --partition``); the ORM
+    still applies ``on_delete``. The archived uploads stay referenced.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    status = models.CharField(max_length=20, choices=PurchaseRequest.STATUS_CHOICES)
+    created_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_requests", db_constraint=False, db_index=False
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    vendor = models.CharField(max_length=255, blank=True)
+    proforma = models.FileField(upload_to="proformas/", storage=upload_storage, blank=True, null=True)
+    receipt = models.FileField(upload_to="receipts/", storage=upload_storage, blank=True, null=True)
+    receipt_validated = models.BooleanField(blank=True, null=True)
+    extraction_status = models.CharField(max_length=20, choices=PurchaseRequest.EXTRACTION_CHOICES)
+    approved_levels = models.PositiveSmallIntegerField(default=0)
+    required_levels = models.PositiveSmallIntegerField(default=0b11)
+    version = models.PositiveIntegerField(default=1)
+    purchase_order = models.ForeignKey(
+        PurchaseOrder, on_delete=models.SET_NULL, blank=True, null=True, related_name="+", db_constraint=False,
+        db_index=False,
+    )
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # Declared here rather than with db_index so the partitioning can recreate every index
+        indexes = [
+            models.Index(fields=["created_by", "-created_at"], name="core_archpr_owner_created_idx"),
+            models.Index(fields=["purchase_order"], name="core_archpr_po_idx"),
+            models.Index(fields=["archived_at"], name="core_archpr_archived_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"#{self.pk} {self.title} ({self.status}, archived)"
+
+    @classmethod
+    def visibility_q(cls, user) -> Q:
+        """Archived requests ``user`` may read: the live rules, less the (always pending) approver queue."""
+        if user.role == User.ROLE_STAFF:
+            return Q(created_by=user.pk)
+        if user.role in User.APPROVER_ROLES:
+            return Q(pk__in=ArchivedApproval.objects.filter(approver_id=user.pk).values("request_id"))
+        if user.role == User.ROLE_FINANCE:
+            return Q()
+        return Q(pk__in=[])
+
+
+class ArchivedRequestItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    request = models.ForeignKey(
+        ArchivedPurchaseRequest, on_delete=models.CASCADE, related_name="items", db_constraint=False
+    )
+    name = models.CharField(max_length=255)
+    quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+    vendor = models.CharField(max_length=255, blank=True)
+
+    @property
+    def total_price(self):
+        return self.quantity * self.unit_price
+
+
+class ArchivedApproval(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    request = models.ForeignKey(
+        ArchivedPurchaseRequest, on_delete=models.CASCADE, related_name="approvals", db_constraint=False
+    )
+    approver = models.ForeignKey(User, on_delete=models.PROTECT, related_name="+", db_constraint=False, db_index=False)
+    level = models.PositiveSmallIntegerField()
+    status = models.CharField(max_length=20, choices=Approval.STATUS_CHOICES)
+    comment = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["approver", "request"], name="core_archapproval_approver_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Req {self.request_id} L{self.level} {self.status} by {self.approver_id} (archived)"
+
+
+class ExportTombstone(models.Model):
+    """Id of a row removed from an exported table, exported as ``deletions`` (see ``core.services.exports``).
+
+    Written when a request, item or approval is deleted or moved to the
+    archive, so incremental export consumers can drop their copy.
+    """
+
+    entity = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
 
     def __str__(self) -> str:
-        return f"Req {self.request_id} L{self.level} {self.status} by {self.approver_id}"
\ No newline at end of file
+        return f"{self.entity} {self.object_id} deleted"
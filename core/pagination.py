@@ -0,0 +1,14 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Keyset pagination over ``(created_at, id)``, newest first.
+
+    The cursor encodes the last ``created_at`` seen, so each page is an index
+    range scan instead of an ``OFFSET`` over all earlier rows.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("-created_at", "-id")
@@ -5,7 +5,7 @@ from .models import User, PurchaseRequest
 class IsStaffCanEditPending(BasePermission):
     def has_object_permission(self, request, view, obj: PurchaseRequest):
         if request.method in ("PUT", "PATCH"):
-            return obj.status == PurchaseRequest.STATUS_PENDING and request.user == obj.created_by and request.user.role == User.ROLE_STAFF
+            return obj.status == PurchaseRequest.STATUS_PENDING and obj.created_by_id == request.user.pk and request.user.role == User.ROLE_STAFF
         return True
 
 
@@ -20,7 +20,7 @@ class RolePermission(BasePermission):
 
 class IsApprover(BasePermission):
     def has_permission(self, request, view):
-        return getattr(request.user, "role", None) in (User.ROLE_APPROVER_L1, User.ROLE_APPROVER_L2)
+        return getattr(request.user, "role", None) in User.APPROVER_ROLES
 
 
 class IsFinance(BasePermission):
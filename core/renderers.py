@@ -0,0 +1,51 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .services import metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` whose encoding time counts towards the request's ``serialize`` phase."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with metrics.timed(metrics.PHASE_SERIALIZE):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONRenderer(TimedJSONRenderer):
+    """Encodes with orjson when it is installed, producing the same bytes as ``JSONRenderer``.
+
+    Types orjson would format differently (datetimes, Decimal, lazy strings, ...)
+    go through DRF's encoder; indented or ASCII-only output and anything
+    orjson refuses fall back to ``JSONRenderer``. The differences: floats in
+    exponent notation (``1e16`` vs ``1e+16``), unreachable with this API's
+    two-decimal amounts, and NaN/Infinity, rendered as null instead of failing.
+    """
+
+    if orjson is not None:
+        _options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+    _default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        with metrics.timed(metrics.PHASE_SERIALIZE):
+            try:
+                ret = orjson.dumps(data, default=self._default, option=self._options)
+            except orjson.JSONEncodeError:
+                return super().render(data, accepted_media_type, renderer_context)
+            if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+                # Same as JSONRenderer: keep the output a strict JavaScript subset
+                ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+            return ret
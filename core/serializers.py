@@ -1,5 +1,14 @@
-from rest_framework import serializers
+import decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
 from .models import User, PurchaseRequest, RequestItem, Approval, PurchaseOrder
+from .services import approval_policy, exports, metrics
+from .storage import release
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -9,6 +18,9 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class RequestItemSerializer(serializers.ModelSerializer):
+    # Writable so updates can address existing items; items without an id are created
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model = RequestItem
         fields = ["id", "name", "quantity", "unit_price", "vendor", "total_price"]
@@ -29,7 +41,191 @@ class ApprovalSerializer(serializers.ModelSerializer):
         fields = ["id", "level", "status", "comment", "created_at", "approver"]
 
 
-class PurchaseRequestSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """Restrict output to the comma-separated ``?fields=`` query parameter, if given."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        requested = request.query_params.get("fields") if request is not None else None
+        if requested:
+            keep = {f.strip() for f in requested.split(",")}
+            for name in set(self.fields) - keep:
+                self.fields.pop(name)
+
+
+class TimedRepresentationMixin:
+    """Count ``to_representation`` (nested serializers included) towards the request's ``serialize`` phase."""
+
+    def to_representation(self, instance):
+        with metrics.timed(metrics.PHASE_SERIALIZE):
+            return super().to_representation(instance)
+
+
+def fast_serialization_enabled() -> bool:
+    # The hand-written getters below assume DRF's default output formats
+    return (
+        settings.FAST_SERIALIZATION
+        and settings.USE_TZ
+        and api_settings.DATETIME_FORMAT == ISO_8601
+        and api_settings.COERCE_DECIMAL_TO_STRING
+        and api_settings.UPLOADED_FILES_USE_URL
+    )
+
+
+def _attr(name):
+    return lambda obj, serializer: getattr(obj, name)
+
+
+def _datetime(name):
+    def get(obj, serializer):
+        value = getattr(obj, name)
+        if value is None:
+            return None
+        value = value.astimezone(serializer._fast_timezone).isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return get
+
+
+def _decimal(model, name):
+    field = model._meta.get_field(name)
+    exponent = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.Context(prec=field.max_digits)
+
+    def get(obj, serializer):
+        value = getattr(obj, name)
+        return None if value is None else f"{value.quantize(exponent, context=context):f}"
+
+    return get
+
+
+def _file(name):
+    def get(obj, serializer):
+        value = getattr(obj, name)
+        if not value:
+            return None
+        request = serializer.context.get("request")
+        return request.build_absolute_uri(value.url) if request is not None else value.url
+
+    return get
+
+
+def _user(user):
+    return {"id": user.pk, "username": user.username, "email": user.email, "role": user.role}
+
+
+_item_unit_price = _decimal(RequestItem, "unit_price")
+_approval_created_at = _datetime("created_at")
+_po_total_amount = _decimal(PurchaseOrder, "total_amount")
+_po_document = _file("document")
+_po_created_at = _datetime("created_at")
+
+
+def _items(obj, serializer):
+    return [
+        {
+            "id": item.pk,
+            "name": item.name,
+            "quantity": item.quantity,
+            "unit_price": _item_unit_price(item, serializer),
+            "vendor": item.vendor,
+            "total_price": item.quantity * item.unit_price,
+        }
+        for item in obj.items.all()
+    ]
+
+
+def _approvals(obj, serializer):
+    return [
+        {
+            "id": approval.pk,
+            "level": approval.level,
+            "status": approval.status,
+            "comment": approval.comment,
+            "created_at": _approval_created_at(approval, serializer),
+            "approver": _user(approval.approver),
+        }
+        for approval in obj.approvals.all()
+    ]
+
+
+def _purchase_order(obj, serializer):
+    po = obj.purchase_order
+    if po is None:
+        return None
+    return {
+        "id": po.pk,
+        "number": po.number,
+        "vendor": po.vendor,
+        "terms": po.terms,
+        "total_amount": _po_total_amount(po, serializer),
+        "document": _po_document(po, serializer),
+        "created_at": _po_created_at(po, serializer),
+    }
+
+
+class FastRepresentationMixin:
+    """Read representation built straight from model attributes and prefetched relations.
+
+    ``fast_fields`` maps every readable field to a ``getter(instance,
+    serializer)`` producing exactly what the DRF field would; this skips the
+    per-field machinery (nested serializers included) on reads. Check changes
+    with ``python -m benchmarks.serializer_parity``. Set FAST_SERIALIZATION to
+    false to render through the declared fields again.
+    """
+
+    fast_fields = {}
+
+    def to_representation(self, instance):
+        if not fast_serialization_enabled():
+            return super().to_representation(instance)
+        getters = self.__dict__.get("_fast_getters")
+        if getters is None:
+            # Once per serializer; honours fields removed by DynamicFieldsMixin
+            getters = self._fast_getters = [
+                (name, self.fast_fields[name]) for name, field in self.fields.items() if not field.write_only
+            ]
+        self._fast_timezone = timezone.get_current_timezone()
+        return {name: get(instance, self) for name, get in getters}
+
+
+class PurchaseRequestListSerializer(
+    TimedRepresentationMixin, FastRepresentationMixin, DynamicFieldsMixin, serializers.ModelSerializer
+):
+    """Compact, non-nested representation used by the list endpoint."""
+
+    class Meta:
+        model = PurchaseRequest
+        fields = [
+            "id",
+            "title",
+            "amount",
+            "status",
+            "vendor",
+            "extraction_status",
+            "created_by",
+            "created_at",
+            "updated_at",
+            "purchase_order",
+        ]
+        read_only_fields = fields
+
+    fast_fields = {
+        "id": _attr("pk"),
+        "title": _attr("title"),
+        "amount": _decimal(PurchaseRequest, "amount"),
+        "status": _attr("status"),
+        "vendor": _attr("vendor"),
+        "extraction_status": _attr("extraction_status"),
+        "created_by": _attr("created_by_id"),
+        "created_at": _datetime("created_at"),
+        "updated_at": _datetime("updated_at"),
+        "purchase_order": _attr("purchase_order_id"),
+    }
+
+
+class PurchaseRequestSerializer(TimedRepresentationMixin, FastRepresentationMixin, serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
     items = RequestItemSerializer(many=True, required=False)
     approvals = ApprovalSerializer(many=True, read_only=True)
@@ -43,33 +239,124 @@ class PurchaseRequestSerializer(serializers.ModelSerializer):
             "description",
             "amount",
             "status",
+            "vendor",
             "created_by",
             "created_at",
             "updated_at",
             "proforma",
             "receipt",
+            "extraction_status",
             "items",
             "approvals",
             "purchase_order",
         ]
-        read_only_fields = ["status", "created_by", "created_at", "updated_at", "approvals", "purchase_order"]
+        read_only_fields = [
+            "status",
+            "vendor",
+            "created_by",
+            "created_at",
+            "updated_at",
+            "extraction_status",
+            "approvals",
+            "purchase_order",
+        ]
+
+    fast_fields = {
+        "id": _attr("pk"),
+        "title": _attr("title"),
+        "description": _attr("description"),
+        "amount": _decimal(PurchaseRequest, "amount"),
+        "status": _attr("status"),
+        "vendor": _attr("vendor"),
+        "created_by": lambda obj, serializer: _user(obj.created_by),
+        "created_at": _datetime("created_at"),
+        "updated_at": _datetime("updated_at"),
+        "proforma": _file("proforma"),
+        "receipt": _file("receipt"),
+        "extraction_status": _attr("extraction_status"),
+        "items": _items,
+        "approvals": _approvals,
+        "purchase_order": _purchase_order,
+    }
 
     def create(self, validated_data):
-        items_data = validated_data.pop("items", [])
-        request = PurchaseRequest.objects.create(created_by=self.context["request"].user, **validated_data)
-        for item in items_data:
-            RequestItem.objects.create(request=request, **item)
+        items = [
+            RequestItem(**{k: v for k, v in item.items() if k != "id"}) for item in validated_data.pop("items", [])
+        ]
+        vendor = PurchaseRequest.vendor_from_items(items)
+        request = PurchaseRequest.objects.create(
+            created_by_id=self.context["request"].user.pk,
+            vendor=vendor,
+            required_levels=approval_policy.required_levels(validated_data["amount"], vendor),
+            **validated_data,
+        )
+        for item in items:
+            item.request = request
+        RequestItem.objects.bulk_create(items)
         return request
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        if instance.status != PurchaseRequest.STATUS_PENDING:
+        # get_object() read the row unlocked: an approval may have landed since, so
+        # re-check on the locked row and write only the submitted columns
+        locked = (
+            PurchaseRequest.objects.select_for_update()
+            .only("pk", "status", "approved_levels", "required_levels", "proforma")
+            .get(pk=instance.pk)
+        )
+        if locked.status != PurchaseRequest.STATUS_PENDING:
             raise serializers.ValidationError("Only pending requests can be updated.")
+        instance.status = locked.status
+        instance.approved_levels = locked.approved_levels
+        instance.required_levels = locked.required_levels
         items_data = validated_data.pop("items", None)
+        previous_proforma = locked.proforma.name
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        instance.save(update_fields=[*validated_data, "updated_at"])
+        # Storing the new file took a reference even when it has the same bytes (and name) as the old one
+        if previous_proforma and "proforma" in validated_data:
+            release([previous_proforma])
         if items_data is not None:
-            instance.items.all().delete()
-            for item in items_data:
-                RequestItem.objects.create(request=instance, **item)
-        return instance
\ No newline at end of file
+            self._sync_items(instance, items_data)
+            vendor = PurchaseRequest.vendor_from_items(instance.items.order_by("pk").only("request", "vendor"))
+            if vendor != instance.vendor:
+                instance.vendor = vendor
+                instance.save(update_fields=["vendor"])
+        if approval_policy.route(instance):
+            instance.save(update_fields=["required_levels"])
+        return instance
+
+    def _sync_items(self, instance, items_data):
+        """Apply the submitted item list as a diff: only new, changed and removed rows are written."""
+        existing = {item.pk: item for item in instance.items.all()}
+        kept, to_create, to_update, changed_fields = set(), [], [], set()
+        for data in items_data:
+            data = dict(data)
+            current = existing.get(data.pop("id", None))
+            if current is None:
+                to_create.append(RequestItem(request=instance, **data))
+                continue
+            kept.add(current.pk)
+            dirty = False
+            for attr, value in data.items():
+                if getattr(current, attr) != value:
+                    setattr(current, attr, value)
+                    changed_fields.add(attr)
+                    dirty = True
+            if dirty:
+                to_update.append(current)
+
+        removed = existing.keys() - kept
+        if removed:
+            exports.record_deletions("items", removed)
+            RequestItem.objects.filter(pk__in=removed).delete()
+        if to_update:
+            RequestItem.objects.bulk_update(to_update, sorted(changed_fields))
+        if to_create:
+            RequestItem.objects.bulk_create(to_create)
+
+
+class BulkReviewSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000)
+    reason = serializers.CharField(required=False, allow_blank=True)
@@ -0,0 +1,193 @@
+"""Approval routing: the levels a request needs, decided by the ``ApprovalPolicy`` rules.
+
+The active rules are compiled into sorted amount breakpoints, one set for
+the rules matching any vendor and one per vendor named by a rule, each
+interval holding the levels of the first rule covering it. Routing a request
+is then a dict lookup and two binary searches however many rules there are.
+
+The compiled policy is cached per process and rebuilt when the
+``approval_policy`` ``CacheVersion`` counter moves on, which other processes
+check every ``APPROVAL_POLICY_CACHE_TTL`` seconds. Requests store the result
+in ``required_levels`` so approvals and approver queues read it from the row.
+A rule change re-routes pending requests twice: right away, and once every
+process has seen the change, for requests routed meanwhile with the old rules.
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from ..models import Approval, ApprovalPolicy, CacheVersion, PurchaseRequest
+from . import jobs, response_cache
+
+VERSION_KEY = "approval_policy"
+REROUTE_BATCH_SIZE = 1000
+# Added to the cache TTL before the second re-route, for requests still being written with old rules
+REROUTE_GRACE_SECONDS = 30
+# Requests no rule matches need every level
+ALL_LEVELS = sum(Approval.level_bit(level) for level in Approval.ROLE_LEVELS.values())
+
+
+def _vendor_key(vendor: str) -> str:
+    return (vendor or "").strip().casefold()
+
+
+def _compile(ranked: List[Tuple[int, ApprovalPolicy]]) -> Tuple[List[Decimal], List[Optional[Tuple[int, int]]]]:
+    """Amount bounds and, per interval between them, the ``(rank, levels)`` of the best-ranked rule covering it.
+
+    ``winners[i]`` applies to amounts in ``[bounds[i - 1], bounds[i])``,
+    ``winners[0]`` to those below ``bounds[0]``.
+    """
+    bounds = sorted({bound for _, rule in ranked for bound in (rule.min_amount, rule.max_amount) if bound is not None})
+    winners: List[Optional[Tuple[int, int]]] = [None] * (len(bounds) + 1)
+    # Rules claim intervals in rank order; free[i] leads to the first unclaimed interval from i on
+    free = list(range(len(bounds) + 2))
+
+    def first_free(i: int) -> int:
+        while free[i] != i:
+            free[i] = free[free[i]]
+            i = free[i]
+        return i
+
+    for rank, rule in ranked:
+        start = 0 if rule.min_amount is None else bisect_left(bounds, rule.min_amount) + 1
+        stop = len(bounds) + 1 if rule.max_amount is None else bisect_left(bounds, rule.max_amount) + 1
+        i = first_free(start)
+        while i < stop:
+            winners[i] = (rank, rule.required_levels)
+            free[i] = i + 1
+            i = first_free(i + 1)
+    return bounds, winners
+
+
+def _winner(table, amount) -> Optional[Tuple[int, int]]:
+    bounds, winners = table
+    return winners[bisect_right(bounds, amount)]
+
+
+class CompiledPolicy:
+    """Decision tables built from ``rules``, given in priority order.
+
+    Rules for any vendor and each vendor's own rules are compiled apart, so
+    every rule is compiled once; a lookup takes the better-ranked of the two
+    matches.
+    """
+
+    def __init__(self, rules: Iterable[ApprovalPolicy], version: int = 0):
+        self.version = version
+        scopes: Dict[str, List[Tuple[int, ApprovalPolicy]]] = defaultdict(list)
+        for rank, rule in enumerate(rules):
+            scopes[_vendor_key(rule.vendor)].append((rank, rule))
+        self._any_vendor = _compile(scopes.pop("", []))
+        self._vendors = {vendor: _compile(ranked) for vendor, ranked in scopes.items()}
+
+    def required_levels(self, amount, vendor: str = "") -> int:
+        best = _winner(self._any_vendor, amount)
+        table = self._vendors.get(_vendor_key(vendor))
+        if table is not None:
+            own = _winner(table, amount)
+            if own is not None and (best is None or own < best):
+                best = own
+        return ALL_LEVELS if best is None else best[1]
+
+
+class PolicyCache:
+    """Per-process compiled policy, revalidated against its version at most every ``ttl`` seconds."""
+
+    def __init__(self, ttl: float = None):
+        self._ttl = ttl
+        self._compiled: Optional[CompiledPolicy] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> float:
+        return settings.APPROVAL_POLICY_CACHE_TTL if self._ttl is None else self._ttl
+
+    def get(self, refresh: bool = False) -> CompiledPolicy:
+        now = time.monotonic()
+        with self._lock:
+            compiled, checked = self._compiled, self._checked
+        if compiled is not None and not refresh and now < checked + self.ttl:
+            return compiled
+        version = CacheVersion.objects.filter(key=VERSION_KEY).values_list("value", flat=True).first() or 0
+        if compiled is None or compiled.version != version:
+            # Rules saved between the two reads get compiled under the older version and recompiled next time
+            compiled = CompiledPolicy(ApprovalPolicy.objects.filter(is_active=True).order_by("priority", "id"), version)
+        with self._lock:
+            self._compiled, self._checked = compiled, now
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._compiled = None
+
+
+policies = PolicyCache()
+
+
+def required_levels(amount, vendor: str = "") -> int:
+    return policies.get().required_levels(amount, vendor)
+
+
+def route(pr: PurchaseRequest, compiled: CompiledPolicy = None) -> bool:
+    """Set ``pr.required_levels`` from its amount and vendor; returns whether it changed.
+
+    Once some level approved, a request may come to need more levels but
+    never fewer: dropping one could leave it pending with nobody to approve it.
+    """
+    required = (compiled or policies.get()).required_levels(pr.amount, pr.vendor)
+    if pr.approved_levels:
+        required |= pr.required_levels
+    changed = required != pr.required_levels
+    pr.required_levels = required
+    return changed
+
+
+def policies_changed() -> None:
+    """Invalidate the compiled policy everywhere and re-route pending requests in the background.
+
+    Call inside the transaction changing the rules.
+    """
+    CacheVersion.objects.bulk_create([CacheVersion(key=VERSION_KEY)], ignore_conflicts=True)
+    CacheVersion.objects.filter(key=VERSION_KEY).update(value=F("value") + 1)
+    transaction.on_commit(policies.clear)
+    jobs.enqueue("reroute_requests", {})
+    # Other processes may route with their cached rules for up to a TTL after the commit
+    jobs.enqueue("reroute_requests", {}, delay=policies.ttl + REROUTE_GRACE_SECONDS)
+
+
+@jobs.non_atomic
+def reroute_pending(payload=None) -> int:
+    """Job handler: apply the current rules to every pending request; returns how many changed.
+
+    Requests are locked and updated ``REROUTE_BATCH_SIZE`` at a time, each
+    batch in its own transaction, so approvals aren't held up behind the
+    whole queue.
+    """
+    compiled = policies.get(refresh=True)
+    pending = (
+        PurchaseRequest.objects.select_for_update()
+        .filter(status=PurchaseRequest.STATUS_PENDING)
+        .order_by("pk")
+        .only("pk", "created_by_id", "amount", "vendor", "approved_levels", "required_levels")
+    )
+    total = last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(pending.filter(pk__gt=last_pk)[:REROUTE_BATCH_SIZE])
+            if not batch:
+                return total
+            last_pk = batch[-1].pk
+            changed = [pr for pr in batch if route(pr, compiled)]
+            if changed:
+                PurchaseRequest.objects.bulk_update(changed, ["required_levels"])
+                # Approver queues are filtered on the routing
+                response_cache.bump_list_versions({pr.created_by_id for pr in changed})
+        total += len(changed)
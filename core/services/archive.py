@@ -0,0 +1,125 @@
+"""Hot/cold split: closed requests move to the ``Archived*`` tables, out of every list and queue.
+
+A request is archivable once it is approved or rejected and hasn't changed
+for a while. ``archive_batch`` copies a batch of them, with their items and
+approvals, and deletes the live rows in one transaction. Extracted document
+text and search entries go with the live rows; rollups keep counting
+archived requests, and their uploads stay referenced.
+
+On Postgres the archived requests table can be range-partitioned by
+``created_at``, one partition per year, created as rows arrive.
+"""
+from datetime import datetime
+from typing import Iterable, List
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import (
+    Approval,
+    ArchivedApproval,
+    ArchivedPurchaseRequest,
+    ArchivedRequestItem,
+    PurchaseRequest,
+    RequestItem,
+)
+from . import exports, response_cache
+
+CLOSED_STATUSES = (PurchaseRequest.STATUS_APPROVED, PurchaseRequest.STATUS_REJECTED)
+
+
+def archivable(cutoff: datetime):
+    """Closed requests last changed before ``cutoff``."""
+    return PurchaseRequest.objects.filter(status__in=CLOSED_STATUSES, updated_at__lt=cutoff)
+
+
+def _copy(model, obj, **values):
+    fields = [f.attname for f in model._meta.concrete_fields if f.attname not in values]
+    return model(**{name: getattr(obj, name) for name in fields}, **values)
+
+
+@transaction.atomic
+def archive_batch(cutoff: datetime, batch_size: int = 500) -> List[int]:
+    """Move up to ``batch_size`` archivable requests with their items and approvals; returns their ids."""
+    # Same lock order as PurchaseRequest._lock_for_review
+    requests = list(archivable(cutoff).select_for_update().order_by("pk")[:batch_size])
+    if not requests:
+        return []
+    ids = [pr.pk for pr in requests]
+    now = timezone.now()
+    if is_partitioned():
+        create_partitions(pr.created_at.year for pr in requests)
+    ArchivedPurchaseRequest.objects.bulk_create([_copy(ArchivedPurchaseRequest, pr, archived_at=now) for pr in requests])
+    ArchivedRequestItem.objects.bulk_create(
+        [_copy(ArchivedRequestItem, item) for item in RequestItem.objects.filter(request_id__in=ids)]
+    )
+    ArchivedApproval.objects.bulk_create(
+        [_copy(ArchivedApproval, approval) for approval in Approval.objects.filter(request_id__in=ids)]
+    )
+    # Live exports see them leave; the archived_* exports pick them up
+    exports.record_request_deletions(ids)
+    # Not under rollups.tracking(): the rollups keep counting archived requests
+    PurchaseRequest.objects.filter(pk__in=ids).delete()
+    response_cache.bump_list_versions({pr.created_by_id for pr in requests})
+    return ids
+
+
+def visible(user):
+    """Archived requests ``user`` may read, ready for ``PurchaseRequestSerializer``."""
+    return (
+        ArchivedPurchaseRequest.objects.filter(ArchivedPurchaseRequest.visibility_q(user))
+        .select_related("created_by", "purchase_order")
+        .prefetch_related("items", "approvals__approver")
+    )
+
+
+# Postgres range partitioning of the archived requests table
+
+TABLE = ArchivedPurchaseRequest._meta.db_table
+
+
+def is_partitioned() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def create_partitions(years: Iterable[int]) -> None:
+    with connection.cursor() as cursor:
+        for year in sorted({int(year) for year in years}):
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{TABLE}_y{year}" PARTITION OF "{TABLE}" '
+                f"FOR VALUES FROM ('{year}-01-01 00:00:00+00') TO ('{year + 1}-01-01 00:00:00+00')"
+            )
+
+
+@transaction.atomic
+def partition_by_created_at() -> bool:
+    """Rebuild the archived requests table as ``PARTITION BY RANGE (created_at)``, keeping its rows.
+
+    Partitioned tables need the partition key in their primary key, so it
+    becomes ``(id, created_at)``. Returns False when already partitioned.
+    """
+    if connection.vendor != "postgresql":
+        raise ValueError("Range partitioning needs Postgres.")
+    if is_partitioned():
+        return False
+    old = f"{TABLE}_unpartitioned"
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{old}"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            "PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute(f'SELECT DISTINCT EXTRACT(YEAR FROM created_at AT TIME ZONE \'UTC\')::int FROM "{old}"')
+        create_partitions(row[0] for row in cursor.fetchall())
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{old}"')
+        # Dropping the old table frees its constraint and index names for the new ones
+        cursor.execute(f'DROP TABLE "{old}"')
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id, created_at)')
+    with connection.schema_editor(atomic=False) as editor:
+        for index in ArchivedPurchaseRequest._meta.indexes:
+            editor.add_index(ArchivedPurchaseRequest, index)
+    return True
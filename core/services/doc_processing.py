@@ -1,99 +1,388 @@
 import json
+import os
+import re
+import signal
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 
-import pdfplumber
-import pytesseract
-from PIL import Image
+from . import metrics, ocr
 
+# Bump whenever extraction output may change so cached text is not reused
+EXTRACTOR_VERSION = "3"
+# Resolution scanned PDF pages are rasterized at for OCR
+_RASTER_DPI = 300
+
+# Extracted text and whether it is complete: False when a page timed out or OCR
+# failed, in which case the result is used but not cached
+Result = Tuple[str, bool]
+
+
+def import_libraries() -> None:
+    """Import the PDF/image/OCR libraries, which every function here otherwise imports on first use.
+
+    Called before forking workers (config/warmup.py) so they share one copy.
+    """
+    import pdfplumber  # noqa: F401
+    import pytesseract  # noqa: F401
+    from PIL import Image
+
+    Image.init()  # registers every image plugin; also deferred until the first open() otherwise
+
+
+def _ocr_pdf_page(page, profile: str = ocr.PROFILE_DEFAULT) -> Result:
+    # Scanned pages have no text layer; rasterize and OCR them instead
+    try:
+        image = page.to_image(resolution=_RASTER_DPI).original
+    except Exception:
+        return "", False
+    return ocr.recognize(image, profile, dpi=_RASTER_DPI)
+
+
+def _page_text(page, profile: str = ocr.PROFILE_DEFAULT) -> Result:
+    text = page.extract_text() or ""
+    if not text.strip():
+        return _ocr_pdf_page(page, profile)
+    return text, True
+
+
+def _join(pages: Iterable[Result]) -> Result:
+    pages = list(pages)
+    return "\n".join(text for text, _ in pages), all(complete for _, complete in pages)
+
+
+def _extract_pdf_pages(file_path: str, page_numbers: List[int], profile: str = ocr.PROFILE_DEFAULT) -> List[Result]:
+    """Extract a run of (1-based) pages; runs inside a pool worker process."""
+    import pdfplumber
+
+    try:
+        with pdfplumber.open(file_path, pages=page_numbers) as pdf:
+            return [_page_text(page, profile) for page in pdf.pages]
+    except Exception:
+        return [("", False)] * len(page_numbers)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    # Lead a process group of its own, so terminating the worker also reaches the tesseract it runs
+    if hasattr(os, "setsid"):
+        os.setsid()
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker)
+        return _pool
+
+
+def _reset_pool(pool: ProcessPoolExecutor, terminate: bool = False) -> None:
+    """Drop ``pool`` unless another caller already replaced it; ``terminate`` also kills its workers.
+
+    ``shutdown`` alone leaves busy workers running. Killing them breaks the
+    pool, which fails the runs other documents still have on it with
+    ``BrokenProcessPool``; those documents read them themselves (see
+    ``_extract_pages_parallel``). The runs aren't cancelled instead: a
+    cancelled future doesn't wake a ``wait()`` already blocked on it.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not pool:
+            return
+        _pool = None
+    processes = list((pool._processes or {}).values()) if terminate else []
+    pool.shutdown(wait=False)
+    for process in processes:
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(process.pid, signal.SIGTERM)
+            else:
+                process.terminate()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def _extract_pages_parallel(
+    file_path: str, page_count: int, max_workers: int, page_timeout: float, profile: str = ocr.PROFILE_DEFAULT
+) -> List[Result]:
+    # Contiguous runs amortize re-opening the document in each worker; two runs
+    # per worker keep the pool busy when some pages need OCR and others don't
+    run_length = max(1, -(-page_count // (max_workers * 2)))
+    runs = [list(range(n, min(n + run_length, page_count + 1))) for n in range(1, page_count + 1, run_length)]
+    pool = _get_pool(max_workers)
+    try:
+        futures = [pool.submit(_extract_pdf_pages, file_path, run, profile) for run in runs]
+    except RuntimeError as e:
+        # Broken, or shut down by another document's timeout since _get_pool()
+        _reset_pool(pool)
+        raise BrokenProcessPool("The PDF extraction pool is unavailable.") from e
+    # One deadline for the whole document: each worker gets page_timeout per page of its share
+    _, unfinished = wait(futures, timeout=page_timeout * -(-page_count // max_workers))
+    if unfinished:
+        # Workers still busy are likely stuck in OCR; replace them rather than let them hold the pool
+        _reset_pool(pool, terminate=True)
+    pages: List[Result] = []
+    for run, future in zip(runs, futures):
+        if future in unfinished and not future.cancelled():
+            pages.extend([("", False)] * len(run))
+            continue
+        try:
+            pages.extend(future.result())
+        except (BrokenProcessPool, CancelledError):
+            # Lost when another document's timeout killed the shared pool's workers (or a
+            # worker died): this document isn't at fault, so read the run here
+            _reset_pool(pool)
+            pages.extend(_extract_pdf_pages(file_path, run, profile))
+    return pages
+
+
+def extract_text_from_pdf(
+    file_path: str, parallel: Optional[bool] = None, profile: str = ocr.PROFILE_DEFAULT
+) -> str:
+    """Extract the text of every page, in page order (see ``_read_pdf``)."""
+    return _read_pdf(file_path, parallel, profile)[0]
+
+
+def _read_pdf(file_path: str, parallel: Optional[bool] = None, profile: str = ocr.PROFILE_DEFAULT) -> Result:
+    """Text of every page, in page order, and whether every page was read.
+
+    Documents with at least ``PDF_PARALLEL_MIN_PAGES`` pages are fanned out
+    in runs of pages to a shared process pool unless ``parallel`` says
+    otherwise. The pool gets ``PDF_PAGE_TIMEOUT`` per page of each worker's
+    share in all; runs unfinished by then contribute no text and the pool's
+    workers are killed and replaced. Runs other documents lose to that are
+    read in their own process instead.
+    """
+    import pdfplumber
+    from django.conf import settings
 
-def extract_text_from_pdf(file_path: str) -> str:
-    text = ""
     try:
         with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
+            page_count = len(pdf.pages)
+            if parallel is None:
+                parallel = settings.PDF_EXTRACT_WORKERS > 1 and page_count >= settings.PDF_PARALLEL_MIN_PAGES
+            if not parallel:
+                return _join(_page_text(page, profile) for page in pdf.pages)
+        try:
+            pages = _extract_pages_parallel(
+                file_path, page_count, settings.PDF_EXTRACT_WORKERS, settings.PDF_PAGE_TIMEOUT, profile
+            )
+        except BrokenProcessPool:
+            return _read_pdf(file_path, parallel=False, profile=profile)
+        return _join(pages)
     except Exception:
-        text = ""
-    return text
+        return "", False
+
+
+def extract_text_from_image(file_path: str, profile: str = ocr.PROFILE_DEFAULT) -> str:
+    return _read_image(file_path, profile)[0]
+
 
+def _read_image(file_path: str, profile: str = ocr.PROFILE_DEFAULT) -> Result:
+    from PIL import Image
 
-def extract_text_from_image(file_path: str) -> str:
     try:
-        img = Image.open(file_path)
-        return pytesseract.image_to_string(img)
+        with Image.open(file_path) as img:
+            img.load()
+            return ocr.recognize(img, profile)
     except Exception:
-        return ""
+        return "", False
 
 
-def extract_proforma_metadata(file_path: str) -> Dict[str, Any]:
-    text = ""
+def _extract_text_uncached(file_path: str, profile: str = ocr.PROFILE_DEFAULT) -> Result:
     if file_path.lower().endswith(".pdf"):
-        text = extract_text_from_pdf(file_path)
-    else:
-        text = extract_text_from_image(file_path)
+        return _read_pdf(file_path, profile=profile)
+    return _read_image(file_path, profile)
+
+
+def extractor_version(profile: str = ocr.PROFILE_DEFAULT) -> str:
+    """Cache key version: OCR output depends on the profile as well as the extractor."""
+    return f"{EXTRACTOR_VERSION}/{profile}"
+
+
+def extract_text(file_path: str, profile: str = ocr.PROFILE_DEFAULT) -> str:
+    # Imported lazily so this module stays usable without a configured Django app
+    from .extraction_cache import cached_text
 
-    # Naive parsing heuristics; in production use robust parsers/LLMs
+    return cached_text(file_path, extractor_version(profile), lambda path: _extract_text_uncached(path, profile))
+
+
+# "<name> [-:] <qty> x <unit price>", e.g. "Office Chair - 2 x 150.00"; the
+# name is whatever precedes the match
+_ITEM_RE = re.compile(
+    r"[\s:–-]+(?P<qty>\d+)\s*[x×*]\s*[$€£]?\s?(?P<price>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)(?!\S)",
+    re.IGNORECASE,
+)
+# Item names must contain a letter and must not be a summary line
+_ITEM_NAME_RE = re.compile(r"(?!(?:sub\s*)?total\b|tax\b).*?[^\W\d_]", re.IGNORECASE)
+# "Vendor: ACME Ltd", "Vendor name - ACME Ltd", "Payment terms: Net 30"
+_FIELD_RE = re.compile(r"\b(?P<field>vendor|terms)(?:\s+name)?\s*[:\-]\s*(?P<value>.*)$", re.IGNORECASE)
+_ITEM_MARKERS = frozenset("xX×*")
+
+
+def parse_proforma_text(text: str) -> Dict[str, Any]:
+    """Parse vendor, terms and ``name qty x price`` item lines in a single pass."""
     vendor = ""
     terms = ""
     items = []
     total = 0.0
 
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-    for line in lines:
-        if line.lower().startswith("vendor") or "vendor:" in line.lower():
-            vendor = line.split(":", 1)[-1].strip()
-        if line.lower().startswith("terms") or "terms:" in line.lower():
-            terms = line.split(":", 1)[-1].strip()
-        # naive item pattern: Item - qty x price
-        if "x" in line and any(c.isdigit() for c in line):
-            try:
-                parts = line.split(" ")
-                name = parts[0]
-                qty = int([p for p in parts if p.isdigit()][0])
-                price_tokens = [p for p in parts if p.replace(".", "", 1).isdigit()]
-                unit_price = float(price_tokens[-1])
-                items.append({"name": name, "quantity": qty, "unit_price": unit_price})
-                total += qty * unit_price
-            except Exception:
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        lowered = line.lower()
+        if "vendor" in lowered or "terms" in lowered:
+            field = _FIELD_RE.search(line)
+            if field:
+                if field.group("field").lower() == "vendor":
+                    vendor = field.group("value").strip()
+                else:
+                    terms = field.group("value").strip()
                 continue
+        if _ITEM_MARKERS.isdisjoint(line):
+            continue
+        item = _ITEM_RE.search(line)
+        if item is None:
+            continue
+        name = line[: item.start()]
+        if not _ITEM_NAME_RE.match(name):
+            continue
+        qty = int(item.group("qty"))
+        unit_price = float(item.group("price").replace(",", ""))
+        items.append({"name": name, "quantity": qty, "unit_price": unit_price})
+        total += qty * unit_price
 
     return {"vendor": vendor, "terms": terms, "items": items, "total": round(total, 2)}
 
 
+@metrics.timed(metrics.PHASE_DOCUMENTS)
+def extract_proforma_metadata(file_path: str) -> Dict[str, Any]:
+    return parse_proforma_text(extract_text(file_path, ocr.PROFILE_PROFORMA))
+
+
+@metrics.timed(metrics.PHASE_DOCUMENTS)
 def generate_po_document(po_number: str, data: Dict[str, Any], output_dir: Path) -> Path:
     output_dir.mkdir(parents=True, exist_ok=True)
     out_path = output_dir / f"{po_number}.json"
     with open(out_path, "w", encoding="utf-8") as f:
-        json.dump({"po_number": po_number, **data}, f, indent=2)
+        json.dump({"po_number": po_number, **data}, f, separators=(",", ":"))
     return out_path
 
 
-def validate_receipt_against_po(receipt_path: str, po_data: Dict[str, Any]) -> Dict[str, Any]:
-    text = ""
-    if receipt_path.lower().endswith(".pdf"):
-        text = extract_text_from_pdf(receipt_path)
+def iter_text_chunks(file_path: str, profile: str = ocr.PROFILE_DEFAULT) -> Iterator[str]:
+    """Yield document text lazily: one chunk per PDF page, or the OCR text of an image.
+
+    Cached text is yielded in one piece; a fully consumed stream whose pages
+    were all read is written back to the cache so the next read of the same
+    bytes is free.
+    """
+    from django.conf import settings
+
+    from . import extraction_cache
+
+    digest = None
+    if settings.EXTRACTION_CACHE_ENABLED:
+        try:
+            digest = extraction_cache.file_digest(file_path)
+        except OSError:
+            digest = None
+    if digest:
+        cached = extraction_cache.lookup(digest, extractor_version(profile))
+        if cached is not None:
+            yield cached
+            return
+
+    pages: List[Result] = []
+    if file_path.lower().endswith(".pdf"):
+        import pdfplumber
+
+        try:
+            with pdfplumber.open(file_path) as pdf:
+                for page in pdf.pages:
+                    pages.append(_page_text(page, profile))
+                    yield pages[-1][0]
+        except Exception:
+            return
     else:
-        text = extract_text_from_image(receipt_path)
+        pages.append(_read_image(file_path, profile))
+        yield pages[-1][0]
+    text, complete = _join(pages)
+    if digest and complete:
+        extraction_cache.store(digest, extractor_version(profile), text)
+
+
+# A standalone amount: "1,234.50", "1234.5", "$12", "KES1,000.00", "Total:100" --
+# but not part of a date, time, percentage, reference number or word. The
+# number itself is the "amount" group.
+_AMOUNT = (
+    r"(?:(?<![\w.,/-])(?:[A-Z]{3}|[$€£])\s?|(?<=[^\W\d]:)|(?<![\w.,/:-]))"
+    r"(?P<amount>(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?)(?![\w/:%-]|[.,]\d)"
+)
+_AMOUNT_RE = re.compile(_AMOUNT)
+_TOTAL_LINE_RE = re.compile(
+    r"\b(?:grand\s+total|total(?:\s+(?:due|amount|paid))?|amount\s+(?:due|paid)|balance\s+due)\b[^\d\n]*?"
+    + _AMOUNT,
+    re.IGNORECASE,
+)
+
+
+def _parse_amount(token: str) -> float:
+    return float(token.replace(",", ""))
+
+
+@metrics.timed(metrics.PHASE_DOCUMENTS)
+def validate_receipt_against_po(receipt_path: str, po_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Check a receipt's vendor and total against the PO (see ``validate_receipt_text``)."""
+    return validate_receipt_text(iter_text_chunks(receipt_path, ocr.PROFILE_RECEIPT), po_data)
+
+
+def validate_receipt_text(chunks: Iterable[str], po_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Check the vendor and total of a receipt's text, given as an iterable of chunks (pages).
+
+    Chunks are consumed one by one and reading stops once the vendor has
+    been found and a labelled total ("Total", "Amount due", ...) equal to the
+    PO total has been seen. Without any labelled total the largest amount on
+    the receipt is used, as before.
+    """
+    vendor = (po_data.get("vendor") or "").lower()
+    expected_total = float(po_data.get("total", 0))
+
+    vendor_found = not vendor
+    labelled_total = None
+    total_settled = False
+    largest = None
+    for chunk in chunks:
+        if not vendor_found and vendor in chunk.lower():
+            vendor_found = True
+        if not total_settled:
+            for m in _TOTAL_LINE_RE.finditer(chunk):
+                labelled_total = _parse_amount(m.group("amount"))
+                if abs(labelled_total - expected_total) <= 0.01:
+                    total_settled = True
+                    break
+            if labelled_total is None:
+                for m in _AMOUNT_RE.finditer(chunk):
+                    amount = _parse_amount(m.group("amount"))
+                    if largest is None or amount > largest:
+                        largest = amount
+        if vendor_found and total_settled:
+            break
 
     result = {"matches": True, "issues": []}
-    # naive checks
-    if po_data.get("vendor") and po_data["vendor"].lower() not in text.lower():
+    if not vendor_found:
         result["matches"] = False
         result["issues"].append("Vendor mismatch")
 
-    # check totals approx
-    # try find a number resembling total in receipt
-    numbers = []
-    for token in text.replace(",", " ").split():
-        try:
-            numbers.append(float(token))
-        except Exception:
-            continue
-    if numbers:
-        approx_total = max(numbers)
-        if abs(approx_total - float(po_data.get("total", 0))) > 0.01:
-            result["matches"] = False
-            result["issues"].append("Total amount mismatch")
+    approx_total = labelled_total if labelled_total is not None else largest
+    if not total_settled and approx_total is not None and abs(approx_total - expected_total) > 0.01:
+        result["matches"] = False
+        result["issues"].append("Total amount mismatch")
 
-    return result
\ No newline at end of file
+    return result
@@ -0,0 +1,75 @@
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from ..models import Approval, PurchaseRequest, RequestEvent
+
+# Columns sent to clients, in the order they appear in the event payload
+PAYLOAD_FIELDS = ("id", "request_id", "kind", "level", "status", "data", "created_at")
+
+
+def _previous_state(kind: str, status: str, levels: int, level: Optional[int]):
+    # Every tracked change has a fixed origin, so the "before" state follows from the kind
+    if kind == RequestEvent.KIND_CREATED:
+        return "", 0
+    if kind == RequestEvent.KIND_APPROVED:
+        return PurchaseRequest.STATUS_PENDING, levels & ~Approval.level_bit(level)
+    if kind == RequestEvent.KIND_REJECTED:
+        return PurchaseRequest.STATUS_PENDING, levels
+    return status, levels
+
+
+def emit(kind: str, requests: Iterable[PurchaseRequest], level: Optional[int] = None,
+         data: Optional[Dict[int, Dict[str, Any]]] = None) -> None:
+    """Record ``kind`` for each request, using its current (post-change) state.
+
+    Call inside the transaction making the change so the event commits with it.
+    """
+    rows = []
+    for pr in requests:
+        previous_status, previous_levels = _previous_state(kind, pr.status, pr.approved_levels, level)
+        rows.append(
+            RequestEvent(
+                request_id=pr.pk,
+                owner_id=pr.created_by_id,
+                kind=kind,
+                level=level,
+                status=pr.status,
+                approved_levels=pr.approved_levels,
+                previous_status=previous_status,
+                previous_levels=previous_levels,
+                data=(data or {}).get(pr.pk, {}),
+            )
+        )
+    RequestEvent.objects.bulk_create(rows)
+
+
+def emit_for_ids(kind: str, request_ids: Iterable[int], level: Optional[int] = None,
+                 data: Optional[Dict[int, Dict[str, Any]]] = None) -> None:
+    request_ids = list(request_ids)
+    if request_ids:
+        requests = PurchaseRequest.objects.filter(pk__in=request_ids).only(
+            "pk", "created_by_id", "status", "approved_levels"
+        )
+        emit(kind, requests, level, data)
+
+
+def visible_events(user, after_id: int = 0, limit: int = 100):
+    """Events after ``after_id`` that ``user`` may see, oldest first.
+
+    Ids are handed out at insert but become visible at commit, so a
+    transaction that commits late can add an event below ids a stream has
+    already moved past. Events stop at the first one (visible to ``user`` or
+    not) created less than ``EVENTS_COMMIT_LAG`` seconds ago: anything still
+    uncommitted below it gets that long to show up before the stream passes it.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.EVENTS_COMMIT_LAG)
+    recent_before = RequestEvent.objects.filter(created_at__gt=cutoff, pk__lte=OuterRef("pk"))
+    return (
+        RequestEvent.objects.filter(Q(pk__gt=after_id), RequestEvent.visibility_q(user), ~Exists(recent_before))
+        .order_by("pk")
+        .values(*PAYLOAD_FIELDS)[:limit]
+    )
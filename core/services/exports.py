@@ -0,0 +1,217 @@
+import csv
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import (
+    Approval,
+    ArchivedApproval,
+    ArchivedPurchaseRequest,
+    ArchivedRequestItem,
+    ExportTombstone,
+    PurchaseOrder,
+    PurchaseRequest,
+    RequestItem,
+)
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+CONTENT_TYPES = {
+    FORMAT_CSV: "text/csv; charset=utf-8",
+    FORMAT_NDJSON: "application/x-ndjson",
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+# entity -> (model, exported columns, field the watermark is applied to).
+# Child rows follow their request's updated_at, which every write path bumps;
+# archived rows (see services/archive.py) follow the time they were archived.
+# Rows leaving the requests, items and approvals tables show up in "deletions".
+EXPORTS: Dict[str, Tuple[type, Tuple[str, ...], str]] = {
+    "requests": (
+        PurchaseRequest,
+        (
+            "id",
+            "title",
+            "description",
+            "amount",
+            "status",
+            "vendor",
+            "created_by_id",
+            "created_at",
+            "updated_at",
+            "approved_levels",
+            "extraction_status",
+            "purchase_order_id",
+            "receipt_validated",
+        ),
+        "updated_at",
+    ),
+    "items": (
+        RequestItem,
+        ("id", "request_id", "name", "quantity", "unit_price", "vendor"),
+        "request__updated_at",
+    ),
+    "approvals": (
+        Approval,
+        ("id", "request_id", "approver_id", "level", "status", "comment", "created_at"),
+        "request__updated_at",
+    ),
+    "purchase_orders": (
+        PurchaseOrder,
+        ("id", "number", "request", "vendor", "terms", "total_amount", "document", "created_at"),
+        "request__updated_at",
+    ),
+    "archived_requests": (
+        ArchivedPurchaseRequest,
+        (
+            "id",
+            "title",
+            "description",
+            "amount",
+            "status",
+            "vendor",
+            "created_by_id",
+            "created_at",
+            "updated_at",
+            "approved_levels",
+            "extraction_status",
+            "purchase_order_id",
+            "receipt_validated",
+            "archived_at",
+        ),
+        "archived_at",
+    ),
+    "archived_items": (
+        ArchivedRequestItem,
+        ("id", "request_id", "name", "quantity", "unit_price", "vendor"),
+        "request__archived_at",
+    ),
+    "archived_approvals": (
+        ArchivedApproval,
+        ("id", "request_id", "approver_id", "level", "status", "comment", "created_at"),
+        "request__archived_at",
+    ),
+    "deletions": (
+        ExportTombstone,
+        ("id", "entity", "object_id", "deleted_at"),
+        "deleted_at",
+    ),
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def parse_watermark(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ExportError(f"Invalid watermark {value!r}; expected an ISO 8601 timestamp.")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def format_watermark(value: datetime) -> str:
+    # "Z" rather than "+00:00" so the value survives being pasted into a query string
+    return value.astimezone(dt_timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def export_window(since: Optional[datetime]) -> Tuple[Optional[datetime], datetime]:
+    """``(since, until)`` bounds for an export asked for rows changed after ``since``.
+
+    Timestamps are taken before their transaction commits, so a row stamped
+    just before ``now`` may not be visible yet. ``until`` therefore lags
+    ``EXPORT_WATERMARK_LAG`` seconds behind now, and ``since`` is moved back
+    by as much: consecutive exports overlap, and consumers upsert by id.
+    Only writes whose transaction stays open longer than twice the lag can
+    still be missed.
+    """
+    lag = timedelta(seconds=settings.EXPORT_WATERMARK_LAG)
+    return (None if since is None else since - lag), timezone.now() - lag
+
+
+def record_deletions(entity: str, ids: Iterable[int]) -> None:
+    """Leave a tombstone for each of ``ids`` removed from ``entity``'s table."""
+    now = timezone.now()
+    ExportTombstone.objects.bulk_create(
+        [ExportTombstone(entity=entity, object_id=pk, deleted_at=now) for pk in ids], batch_size=1000
+    )
+
+
+def record_request_deletions(request_ids: Iterable[int]) -> None:
+    """Tombstones for requests about to be deleted and the items and approvals going with them.
+
+    Call before the delete, in the same transaction.
+    """
+    request_ids = list(request_ids)
+    if not request_ids:
+        return
+    record_deletions("requests", request_ids)
+    record_deletions("items", RequestItem.objects.filter(request_id__in=request_ids).values_list("pk", flat=True))
+    record_deletions("approvals", Approval.objects.filter(request_id__in=request_ids).values_list("pk", flat=True))
+
+
+def export_rows(entity: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[Tuple[str, ...], Iterator[tuple]]:
+    """Columns and a lazy row iterator for ``entity``, optionally limited to ``(since, until]``.
+
+    Rows are plain tuples read ``chunk_size`` at a time (server-side cursor on
+    Postgres), so memory stays flat however large the table is.
+    """
+    try:
+        model, columns, watermark = EXPORTS[entity]
+    except KeyError:
+        raise ExportError(f"Unknown export {entity!r}; choose from {', '.join(EXPORTS)}.")
+    qs = model.objects.all()
+    if since is not None:
+        qs = qs.filter(**{f"{watermark}__gt": since})
+    if until is not None:
+        qs = qs.filter(**{f"{watermark}__lte": until})
+    rows = qs.order_by("pk").values_list(*columns).iterator(chunk_size=chunk_size)
+    return tuple("request_id" if c == "request" else c for c in columns), rows
+
+
+class _Echo:
+    """File-like object handing each written CSV line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_lines(columns, rows) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(v) for v in row])
+
+
+def _ndjson_lines(columns, rows) -> Iterator[str]:
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + "\n"
+
+
+def render(entity: str, output: str = FORMAT_CSV, since: Optional[datetime] = None,
+           until: Optional[datetime] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Serialized export of ``entity`` as an iterator of text lines."""
+    if output not in CONTENT_TYPES:
+        raise ExportError(f"Unknown output format {output!r}; choose from {', '.join(CONTENT_TYPES)}.")
+    columns, rows = export_rows(entity, since, until, chunk_size)
+    if output == FORMAT_CSV:
+        return _csv_lines(columns, rows)
+    return _ndjson_lines(columns, rows)
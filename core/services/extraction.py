@@ -0,0 +1,111 @@
+from typing import Any, Dict
+
+from django.db import transaction
+
+from ..models import DocumentExtraction, PurchaseRequest, RequestItem
+from . import approval_policy, jobs, ocr, rollups, search
+from .doc_processing import extract_text, extractor_version, parse_proforma_text
+from .extraction_cache import file_digest
+from .response_cache import touch_request, touch_requests
+
+
+def save_extraction(
+    pr: PurchaseRequest, kind: str, file_path: str, text: str, metadata: Dict[str, Any], profile: str
+) -> None:
+    """Persist the text/metadata of the request's current ``kind`` document, replacing an older one."""
+    DocumentExtraction.objects.update_or_create(
+        request=pr,
+        kind=kind,
+        defaults={
+            "sha256": file_digest(file_path),
+            "extractor_version": extractor_version(profile),
+            "text": text,
+            "metadata": metadata,
+        },
+    )
+
+
+class ProformaChanged(Exception):
+    """The proforma was replaced while it was being read; the job is retried with the new one."""
+
+
+@jobs.non_atomic
+def run_proforma_extraction(payload: Dict[str, Any]) -> None:
+    """Populate items/amount of a request from its uploaded proforma.
+
+    The document is read (parsing, OCR) before the request is locked, so
+    approvals and edits of the request aren't blocked meanwhile; the result
+    is written under the lock after re-checking the request. Requests that
+    are no longer awaiting extraction are skipped so a re-delivered job is
+    harmless.
+    """
+    pending = PurchaseRequest.objects.filter(
+        pk=payload["request_id"], extraction_status=PurchaseRequest.EXTRACTION_PENDING
+    )
+    pr = pending.first()
+    if pr is None:
+        return
+    proforma = pr.proforma.name
+    meta = None
+    if proforma:
+        text = extract_text(pr.proforma.path, ocr.PROFILE_PROFORMA)
+        meta = parse_proforma_text(text)
+    with transaction.atomic():
+        pr = pending.select_for_update().first()
+        if pr is None:
+            return
+        if pr.proforma.name != proforma:
+            raise ProformaChanged(f"Proforma of request {pr.pk} changed during extraction")
+        with rollups.tracking([pr.pk]):
+            if meta is not None:
+                save_extraction(pr, DocumentExtraction.KIND_PROFORMA, pr.proforma.path, text, meta, ocr.PROFILE_PROFORMA)
+                if meta.get("vendor"):
+                    # add vendor and items if not provided
+                    RequestItem.objects.bulk_create(
+                        [
+                            RequestItem(
+                                request=pr,
+                                name=item.get("name", "Item"),
+                                quantity=item.get("quantity", 1),
+                                unit_price=item.get("unit_price", 0),
+                                vendor=meta.get("vendor", ""),
+                            )
+                            for item in meta.get("items", [])
+                        ]
+                    )
+                    pr.amount = pr.items_total()
+                    pr.vendor = pr.vendor or meta["vendor"]
+            approval_policy.route(pr)
+            pr.extraction_status = PurchaseRequest.EXTRACTION_COMPLETED
+            pr.save(update_fields=["amount", "vendor", "required_levels", "extraction_status", "updated_at"])
+    search.index_requests([pr.pk])
+    touch_request(pr)
+
+
+def run_receipt_extraction(payload: Dict[str, Any]) -> None:
+    """Keep the full text of a submitted receipt for search.
+
+    Validation reads receipts only as far as it needs to, so the complete
+    text is produced here, off the request path.
+    """
+    pr = PurchaseRequest.objects.filter(pk=payload["request_id"]).first()
+    # A newer upload has its own job
+    if pr is None or not pr.receipt or pr.receipt.name != payload.get("receipt"):
+        return
+    text = extract_text(pr.receipt.path, ocr.PROFILE_RECEIPT)
+    save_extraction(
+        pr,
+        DocumentExtraction.KIND_RECEIPT,
+        pr.receipt.path,
+        text,
+        {"validation": payload.get("validation")},
+        ocr.PROFILE_RECEIPT,
+    )
+    search.index_requests([pr.pk])
+
+
+def mark_proforma_extraction_failed(payload: Dict[str, Any]) -> None:
+    if PurchaseRequest.objects.filter(
+        pk=payload["request_id"], extraction_status=PurchaseRequest.EXTRACTION_PENDING
+    ).update(extraction_status=PurchaseRequest.EXTRACTION_FAILED):
+        touch_requests([payload["request_id"]])
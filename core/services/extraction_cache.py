@@ -0,0 +1,117 @@
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from ..models import ExtractionCacheEntry
+from ..storage import digest_for_path
+
+_CHUNK_SIZE = 1024 * 1024
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+_evict_lock = threading.Lock()
+_next_evict = 0.0
+
+
+def file_digest(file_path: str) -> str:
+    # Content-addressed uploads carry their digest in the name; no need to re-read them
+    digest = digest_for_path(file_path)
+    if digest:
+        return digest
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+def stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters of this process plus persisted cache size."""
+    with _stats_lock:
+        counters = dict(_stats)
+    agg = ExtractionCacheEntry.objects.aggregate(entries=Count("pk"), bytes=Sum("size"))
+    counters["entries"] = agg["entries"] or 0
+    counters["bytes"] = agg["bytes"] or 0
+    return counters
+
+
+def lookup(digest: str, version: str) -> Optional[str]:
+    entry = ExtractionCacheEntry.objects.filter(digest=digest, extractor_version=version).only("pk", "text").first()
+    if entry is None:
+        _count("misses")
+        return None
+    _count("hits")
+    ExtractionCacheEntry.objects.filter(pk=entry.pk).update(hits=F("hits") + 1, last_used_at=timezone.now())
+    return entry.text
+
+
+def store(digest: str, version: str, text: str) -> None:
+    # Empty output is indistinguishable from a failed extraction; don't pin it
+    if not text:
+        return
+    ExtractionCacheEntry.objects.bulk_create(
+        [ExtractionCacheEntry(digest=digest, extractor_version=version, text=text, size=len(text.encode("utf-8")))],
+        ignore_conflicts=True,
+    )
+    _scheduled_evict()
+
+
+def _scheduled_evict() -> None:
+    # Sizing the cache sums the whole table: once per EXTRACTION_CACHE_EVICT_INTERVAL per process, not per store
+    global _next_evict
+    now = time.monotonic()
+    with _evict_lock:
+        if now < _next_evict:
+            return
+        _next_evict = now + settings.EXTRACTION_CACHE_EVICT_INTERVAL
+    evict()
+
+
+def cached_text(file_path: str, version: str, extract: Callable[[str], Tuple[str, bool]]) -> str:
+    """Return the text of ``extract(file_path)``, reusing a previous result for identical bytes.
+
+    ``extract`` returns ``(text, complete)``; incomplete text (a page timed
+    out, OCR failed) is returned but not cached, so the next read tries again.
+    """
+    if not settings.EXTRACTION_CACHE_ENABLED:
+        return extract(file_path)[0]
+    try:
+        digest = file_digest(file_path)
+    except OSError:
+        return extract(file_path)[0]
+    text = lookup(digest, version)
+    if text is None:
+        text, complete = extract(file_path)
+        if complete:
+            store(digest, version, text)
+    return text
+
+
+def evict(max_bytes: int = None) -> int:
+    """Drop least recently used entries until the cache fits in ``max_bytes``."""
+    if max_bytes is None:
+        max_bytes = settings.EXTRACTION_CACHE_MAX_BYTES
+    total = ExtractionCacheEntry.objects.aggregate(total=Sum("size"))["total"] or 0
+    excess = total - max_bytes
+    if excess <= 0:
+        return 0
+    victims = []
+    for pk, size in ExtractionCacheEntry.objects.order_by("last_used_at", "pk").values_list("pk", "size").iterator():
+        victims.append(pk)
+        excess -= size
+        if excess <= 0:
+            break
+    deleted, _ = ExtractionCacheEntry.objects.filter(pk__in=victims).delete()
+    _count("evictions", deleted)
+    return deleted
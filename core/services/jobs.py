@@ -0,0 +1,127 @@
+import logging
+import traceback
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from ..models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# kind -> (handler, on_final_failure); both are dotted paths taking the job payload
+JOB_HANDLERS = {
+    "extract_proforma": (
+        "core.services.extraction.run_proforma_extraction",
+        "core.services.extraction.mark_proforma_extraction_failed",
+    ),
+    "extract_receipt": ("core.services.extraction.run_receipt_extraction", None),
+    "reroute_requests": ("core.services.approval_policy.reroute_pending", None),
+}
+
+
+def enqueue(kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None, delay: float = 0) -> BackgroundJob:
+    """Queue a job; ``delay`` seconds keep it from being claimed before then."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return BackgroundJob.objects.create(
+        kind=kind,
+        payload=payload,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def _claimable(now):
+    # Queued jobs that are due, or running jobs whose worker let the lease expire
+    return Q(status=BackgroundJob.STATUS_QUEUED, run_after__lte=now) | Q(
+        status=BackgroundJob.STATUS_RUNNING, locked_until__lt=now
+    )
+
+
+def claim_job(worker_id: str, visibility_timeout: int, kinds=None) -> Optional[BackgroundJob]:
+    """Lease the next due job to ``worker_id``.
+
+    Claiming is a conditional UPDATE, so concurrent workers never receive the
+    same job and no broker or ``SKIP LOCKED`` support is needed.
+    """
+    now = timezone.now()
+    candidates = BackgroundJob.objects.filter(_claimable(now))
+    if kinds:
+        candidates = candidates.filter(kind__in=kinds)
+    for pk in candidates.order_by("run_after", "pk").values_list("pk", flat=True)[:10]:
+        claimed = (
+            BackgroundJob.objects.filter(_claimable(now), pk=pk)
+            .update(
+                status=BackgroundJob.STATUS_RUNNING,
+                locked_by=worker_id,
+                locked_until=now + timedelta(seconds=visibility_timeout),
+                attempts=F("attempts") + 1,
+                updated_at=now,
+            )
+        )
+        if not claimed:
+            continue
+        job = BackgroundJob.objects.get(pk=pk)
+        if job.attempts > job.max_attempts:
+            # Lease expired on the final attempt (worker crashed or hung)
+            _finish(job, BackgroundJob.STATUS_FAILED, job.last_error or "Visibility timeout exceeded")
+            _run_failure_hook(job)
+            continue
+        return job
+    return None
+
+
+def _finish(job: BackgroundJob, status: str, error: str = "", run_after=None) -> bool:
+    fields = {"status": status, "last_error": error, "locked_until": None, "updated_at": timezone.now()}
+    if run_after is not None:
+        fields["run_after"] = run_after
+    # Only the worker holding the lease may settle the job
+    return bool(
+        BackgroundJob.objects.filter(pk=job.pk, locked_by=job.locked_by, status=BackgroundJob.STATUS_RUNNING)
+        .update(**fields)
+    )
+
+
+def _run_failure_hook(job: BackgroundJob) -> None:
+    hook = JOB_HANDLERS.get(job.kind, (None, None))[1]
+    if not hook:
+        return
+    try:
+        import_string(hook)(job.payload)
+    except Exception:
+        logger.exception("Failure hook for job %s raised", job.pk)
+
+
+def non_atomic(handler):
+    """Run ``handler`` outside the job transaction; it opens its own, e.g. to keep slow work out of locks."""
+    handler.job_atomic = False
+    return handler
+
+
+def run_job(job: BackgroundJob) -> None:
+    handler_path = JOB_HANDLERS.get(job.kind, (None, None))[0]
+    try:
+        if not handler_path:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        handler = import_string(handler_path)
+        if getattr(handler, "job_atomic", True):
+            with transaction.atomic():
+                handler(job.payload)
+        else:
+            handler(job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Job %s (%s) attempt %s failed", job.pk, job.kind, job.attempts)
+        if job.attempts >= job.max_attempts:
+            if _finish(job, BackgroundJob.STATUS_FAILED, error):
+                _run_failure_hook(job)
+        else:
+            backoff = settings.JOB_RETRY_BACKOFF * (2 ** (job.attempts - 1))
+            _finish(job, BackgroundJob.STATUS_QUEUED, error, run_after=timezone.now() + timedelta(seconds=backoff))
+        return
+    _finish(job, BackgroundJob.STATUS_SUCCEEDED)
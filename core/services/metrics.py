@@ -0,0 +1,275 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+# Phases reported next to "db" and "total"
+PHASE_SERIALIZE = "serialize"
+PHASE_DOCUMENTS = "documents"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+# Most seconds a process's new figures wait before being written to METRICS_DIR
+FLUSH_INTERVAL = 1.0
+
+
+class RequestTimings:
+    """What one request spent on database queries and on each phase."""
+
+    __slots__ = ("started", "db_queries", "db_time", "phases", "_active")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.phases: Dict[str, float] = defaultdict(float)
+        self._active = set()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: float) -> str:
+        """``Server-Timing`` header value (durations in milliseconds)."""
+        parts = [f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"']
+        parts += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in sorted(self.phases.items())]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def start() -> Tuple[RequestTimings, contextvars.Token]:
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def stop(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+def current() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def timed(phase: str):
+    """Add the time spent in the block (or decorated function) to a phase of the current request.
+
+    Nested or recursive use of the same phase is counted once; outside a
+    request (job workers, management commands) it does nothing.
+    """
+    timings = current()
+    if timings is None or phase in timings._active:
+        yield
+        return
+    timings._active.add(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.phases[phase] += time.perf_counter() - started
+        timings._active.discard(phase)
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook counting and timing queries for the current request."""
+    timings = current()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_queries += 1
+        timings.db_time += time.perf_counter() - started
+
+
+def install_query_wrapper(sender=None, connection=None, **kwargs) -> None:
+    """``connection_created`` receiver: every new database connection reports its queries."""
+    if query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_wrapper)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**labels) -> str:
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _shared_directory() -> str:
+    from django.conf import settings
+
+    return settings.METRICS_DIR
+
+
+class Registry:
+    """Per-process aggregates by endpoint (URL name) and method, rendered in the Prometheus text format.
+
+    With ``METRICS_DIR`` set, each process also writes its figures to
+    ``<METRICS_DIR>/<pid>.json`` (from a timer, at most ``FLUSH_INTERVAL``
+    seconds after they change, and before rendering) and ``render`` sums the
+    files of every process, so a scrape reports the whole server whichever
+    worker answers it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_timer = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests = defaultdict(int)  # (endpoint, method, status) -> count
+            self._durations = {}  # (endpoint, method) -> _Histogram
+            self._query_counts = {}  # (endpoint, method) -> _Histogram
+            self._db_seconds = defaultdict(float)
+            self._phase_seconds = defaultdict(float)  # (endpoint, method, phase) -> seconds
+
+    def observe(self, endpoint: str, method: str, status: int, duration: float, timings: RequestTimings) -> None:
+        key = (endpoint, method)
+        with self._lock:
+            self._requests[(endpoint, method, status)] += 1
+            self._durations.setdefault(key, _Histogram(DURATION_BUCKETS)).observe(duration)
+            self._query_counts.setdefault(key, _Histogram(QUERY_COUNT_BUCKETS)).observe(timings.db_queries)
+            self._db_seconds[key] += timings.db_time
+            for phase, seconds in timings.phases.items():
+                self._phase_seconds[(endpoint, method, phase)] += seconds
+            schedule = self._flush_timer is None
+            if schedule:
+                self._flush_timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+                self._flush_timer.daemon = True
+        if schedule and _shared_directory():
+            self._flush_timer.start()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": [[*key, count] for key, count in self._requests.items()],
+                "durations": [[*key, h.counts, h.sum, h.count] for key, h in self._durations.items()],
+                "query_counts": [[*key, h.counts, h.sum, h.count] for key, h in self._query_counts.items()],
+                "db_seconds": [[*key, seconds] for key, seconds in self._db_seconds.items()],
+                "phase_seconds": [[*key, seconds] for key, seconds in self._phase_seconds.items()],
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        """Add the figures of another process's ``snapshot()``."""
+        with self._lock:
+            for endpoint, method, status, count in snapshot["requests"]:
+                self._requests[(endpoint, method, status)] += count
+            for name, histograms, buckets in (
+                ("durations", self._durations, DURATION_BUCKETS),
+                ("query_counts", self._query_counts, QUERY_COUNT_BUCKETS),
+            ):
+                for endpoint, method, counts, total, count in snapshot[name]:
+                    histogram = histograms.setdefault((endpoint, method), _Histogram(buckets))
+                    histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                    histogram.sum += total
+                    histogram.count += count
+            for endpoint, method, seconds in snapshot["db_seconds"]:
+                self._db_seconds[(endpoint, method)] += seconds
+            for endpoint, method, phase, seconds in snapshot["phase_seconds"]:
+                self._phase_seconds[(endpoint, method, phase)] += seconds
+
+    def flush(self) -> None:
+        """Write this process's figures to its file under ``METRICS_DIR``."""
+        with self._lock:
+            self._flush_timer = None
+        directory = _shared_directory()
+        if not directory:
+            return
+        data = json.dumps(self.snapshot())
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _histogram_lines(name, histograms):
+        for (endpoint, method), histogram in sorted(histograms.items()):
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                yield f"{name}_bucket{_labels(endpoint=endpoint, method=method, le=bound)} {count}"
+            yield f'{name}_bucket{_labels(endpoint=endpoint, method=method, le="+Inf")} {histogram.count}'
+            yield f"{name}_sum{_labels(endpoint=endpoint, method=method)} {_format_number(histogram.sum)}"
+            yield f"{name}_count{_labels(endpoint=endpoint, method=method)} {histogram.count}"
+
+    def render(self) -> str:
+        directory = _shared_directory()
+        if not directory:
+            return self._render()
+        self.flush()
+        # Files of exited workers stay, so the counters never go backwards
+        combined = Registry()
+        for name in os.listdir(directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    combined.merge(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return combined._render()
+
+    def _render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP p2p_http_requests_total Requests handled, by endpoint, method and status.",
+                "# TYPE p2p_http_requests_total counter",
+            ]
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f"p2p_http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}")
+            lines += [
+                "# HELP p2p_http_request_duration_seconds Time to produce the response.",
+                "# TYPE p2p_http_request_duration_seconds histogram",
+            ]
+            lines += self._histogram_lines("p2p_http_request_duration_seconds", self._durations)
+            lines += [
+                "# HELP p2p_db_queries_per_request Database queries issued per request.",
+                "# TYPE p2p_db_queries_per_request histogram",
+            ]
+            lines += self._histogram_lines("p2p_db_queries_per_request", self._query_counts)
+            lines += [
+                "# HELP p2p_db_query_seconds_total Time spent in database queries.",
+                "# TYPE p2p_db_query_seconds_total counter",
+            ]
+            for (endpoint, method), seconds in sorted(self._db_seconds.items()):
+                lines.append(f"p2p_db_query_seconds_total{_labels(endpoint=endpoint, method=method)} {seconds!r}")
+            lines += [
+                "# HELP p2p_phase_seconds_total Time spent serializing and processing documents.",
+                "# TYPE p2p_phase_seconds_total counter",
+            ]
+            for (endpoint, method, phase), seconds in sorted(self._phase_seconds.items()):
+                labels = _labels(endpoint=endpoint, method=method, phase=phase)
+                lines.append(f"p2p_phase_seconds_total{labels} {seconds!r}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
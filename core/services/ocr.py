@@ -0,0 +1,185 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Tuple
+
+# PIL and pytesseract are imported on first use: most processes never OCR anything
+if TYPE_CHECKING:  # pragma: no cover
+    from PIL import Image
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Tesseract spawns an OpenMP thread per core by default; with several
+# tesseract processes running side by side that only oversubscribes the CPU
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+# Page segmentation modes (tesseract --psm) per document type
+PROFILE_DEFAULT = "default"
+PROFILE_RECEIPT = "receipt"
+PROFILE_PROFORMA = "proforma"
+PSM = {
+    PROFILE_DEFAULT: 3,  # fully automatic layout analysis
+    PROFILE_RECEIPT: 4,  # a single column of text of variable sizes
+    PROFILE_PROFORMA: 6,  # a single uniform block of text
+}
+
+# Pixels kept around the text when cropping margins
+_CROP_PADDING = 16
+
+
+def _setting(name, default):
+    # This module also runs in PDF pool workers; don't require configured settings
+    from django.conf import settings
+
+    return getattr(settings, name, default) if settings.configured else default
+
+
+def _otsu_threshold(gray: "Image.Image") -> int:
+    """Threshold that best separates the two intensity classes of a grayscale image."""
+    histogram = gray.histogram()
+    total = sum(histogram)
+    weighted_sum = sum(i * count for i, count in enumerate(histogram))
+    background = background_sum = 0
+    best, threshold = -1.0, 127
+    for level, count in enumerate(histogram):
+        background += count
+        if not background:
+            continue
+        foreground = total - background
+        if not foreground:
+            break
+        background_sum += level * count
+        mean_b = background_sum / background
+        mean_f = (weighted_sum - background_sum) / foreground
+        variance = background * foreground * (mean_b - mean_f) ** 2
+        if variance > best:
+            best, threshold = variance, level
+    return threshold
+
+
+def preprocess(img: "Image.Image", dpi: Optional[float] = None) -> "Image.Image":
+    """Prepare a scan or photo for tesseract.
+
+    Applies the EXIF orientation, scales down to ``OCR_TARGET_DPI`` (or to
+    ``OCR_MAX_DIMENSION`` pixels when the resolution is unknown), converts to
+    black and white and crops empty margins. Images are never upscaled.
+    """
+    from PIL import Image, ImageOps
+
+    img = ImageOps.exif_transpose(img)
+    if dpi is None:
+        dpi = (img.info.get("dpi") or (None,))[0]
+    target_dpi = _setting("OCR_TARGET_DPI", 300)
+    if dpi and dpi > target_dpi:
+        scale = target_dpi / float(dpi)
+    else:
+        scale = min(1.0, _setting("OCR_MAX_DIMENSION", 3500) / float(max(img.size)))
+    if scale < 1.0:
+        img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.LANCZOS)
+
+    gray = ImageOps.autocontrast(img.convert("L"))
+    threshold = _otsu_threshold(gray)
+    binary = gray.point(lambda p: 255 if p > threshold else 0)
+
+    # Bounding box of the dark (text) pixels
+    bbox = ImageOps.invert(binary).getbbox()
+    if bbox:
+        left, top, right, bottom = bbox
+        binary = binary.crop(
+            (
+                max(0, left - _CROP_PADDING),
+                max(0, top - _CROP_PADDING),
+                min(binary.width, right + _CROP_PADDING),
+                min(binary.height, bottom + _CROP_PADDING),
+            )
+        )
+    return binary
+
+
+_local_slots = None
+_local_slots_lock = threading.Lock()
+
+
+def _local_semaphore(limit: int) -> threading.BoundedSemaphore:
+    global _local_slots
+    with _local_slots_lock:
+        if _local_slots is None:
+            _local_slots = threading.BoundedSemaphore(limit)
+        return _local_slots
+
+
+@contextmanager
+def ocr_slot():
+    """Hold one of the node's ``OCR_MAX_CONCURRENCY`` tesseract slots.
+
+    Slots are ``flock``-ed files in ``OCR_LOCK_DIR``, so the cap holds across
+    gunicorn workers, job workers and PDF pool processes on the same machine;
+    a crashed holder releases its slot with its file descriptors. Raises
+    ``TimeoutError`` after waiting ``OCR_SLOT_WAIT`` seconds.
+    """
+    limit = max(1, _setting("OCR_MAX_CONCURRENCY", os.cpu_count() or 1))
+    deadline = time.monotonic() + _setting("OCR_SLOT_WAIT", 120)
+    if fcntl is None:
+        semaphore = _local_semaphore(limit)
+        if not semaphore.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise TimeoutError("No OCR slot became free")
+        try:
+            yield
+        finally:
+            semaphore.release()
+        return
+
+    lock_dir = Path(_setting("OCR_LOCK_DIR", "") or Path(tempfile.gettempdir()) / "p2p-ocr-slots")
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    delay = 0.01
+    while True:
+        for slot in range(limit):
+            fd = os.open(lock_dir / f"slot-{slot}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                continue
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+            return
+        if time.monotonic() >= deadline:
+            raise TimeoutError("No OCR slot became free")
+        time.sleep(delay)
+        delay = min(delay * 2, 0.25)
+
+
+def tesseract_config(profile: str = PROFILE_DEFAULT) -> str:
+    return f"--psm {PSM.get(profile, PSM[PROFILE_DEFAULT])}"
+
+
+def recognize(img: "Image.Image", profile: str = PROFILE_DEFAULT, dpi: Optional[float] = None) -> Tuple[str, bool]:
+    """Preprocess ``img`` and OCR it within a concurrency slot and ``OCR_TIMEOUT``.
+
+    Returns ``(text, complete)``: ``("", False)`` when tesseract fails, times
+    out or no slot frees up, so callers can tell that from a page without text.
+    """
+    try:
+        import pytesseract
+
+        prepared = preprocess(img, dpi)
+        with ocr_slot():
+            text = pytesseract.image_to_string(
+                prepared, config=tesseract_config(profile), timeout=_setting("OCR_TIMEOUT", 60)
+            )
+        return text, True
+    except Exception:
+        logger.warning("OCR failed (profile %s)", profile, exc_info=True)
+        return "", False
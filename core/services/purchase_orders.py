@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Sequence
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from ..models import PurchaseOrder, PurchaseOrderSequence, PurchaseRequest
+from . import search
+from .doc_processing import generate_po_document
+
+SEQUENCE_NAME = "purchase_order"
+DEFAULT_TERMS = "Net 30"
+
+
+def format_po_number(value: int) -> str:
+    return f"PO-{value:06d}"
+
+
+@transaction.atomic
+def allocate_po_numbers(count: int = 1) -> List[str]:
+    """Reserve ``count`` consecutive PO numbers.
+
+    The counter row stays locked until the surrounding transaction commits, so
+    numbers are unique under concurrency and a rolled-back approval gives its
+    numbers back instead of leaving a gap.
+    """
+    if count < 1:
+        return []
+    sequence = PurchaseOrderSequence.objects.filter(name=SEQUENCE_NAME)
+    if not sequence.update(last_value=F("last_value") + count):
+        PurchaseOrderSequence.objects.get_or_create(name=SEQUENCE_NAME)
+        sequence.update(last_value=F("last_value") + count)
+    last = sequence.values_list("last_value", flat=True).get()
+    return [format_po_number(value) for value in range(last - count + 1, last + 1)]
+
+
+def build_po_payload(pr: PurchaseRequest) -> Dict[str, Any]:
+    # Works off the (usually prefetched) items; never issues per-field queries
+    items = sorted(pr.items.all(), key=lambda i: i.pk)
+    return {
+        "vendor": items[0].vendor if items else "",
+        "items": [{"name": i.name, "quantity": i.quantity, "unit_price": float(i.unit_price)} for i in items],
+        "total": float(pr.amount),
+        "terms": DEFAULT_TERMS,
+    }
+
+
+@transaction.atomic
+def create_purchase_orders(requests: Sequence[PurchaseRequest]) -> List[PurchaseOrder]:
+    """Generate the PO document and row for each approved request and link them."""
+    requests = list(requests)
+    if not requests:
+        return []
+    output_dir = settings.MEDIA_ROOT / "purchase_orders"
+    orders = []
+    for pr, number in zip(requests, allocate_po_numbers(len(requests))):
+        data = build_po_payload(pr)
+        doc_path = generate_po_document(number, data, output_dir)
+        orders.append(
+            PurchaseOrder(
+                number=number,
+                vendor=data["vendor"],
+                terms=data["terms"],
+                total_amount=pr.amount,
+                document=str(doc_path.relative_to(settings.MEDIA_ROOT)),
+            )
+        )
+    PurchaseOrder.objects.bulk_create(orders)
+    vendor_set = []
+    for pr, po in zip(requests, orders):
+        pr.purchase_order = po
+        if not pr.vendor and po.vendor:
+            pr.vendor = po.vendor
+            vendor_set.append(pr.pk)
+    PurchaseRequest.objects.bulk_update(requests, ["purchase_order", "vendor"])
+    # The vendor is indexed for search
+    search.index_requests(vendor_set)
+    return orders
+
+
+def create_purchase_order(pr: PurchaseRequest) -> PurchaseOrder:
+    return create_purchase_orders([pr])[0]
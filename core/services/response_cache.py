@@ -0,0 +1,95 @@
+import hashlib
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from ..models import CacheVersion, PurchaseRequest, User
+
+# Roles whose request lists span other users' requests; any change bumps them
+SHARED_LIST_SCOPES = [f"role:{role}" for role in (User.ROLE_APPROVER_L1, User.ROLE_APPROVER_L2, User.ROLE_FINANCE)]
+
+
+def list_scope(user) -> str:
+    # Staff only ever see their own requests; everyone else sees role-wide lists
+    if user.role == User.ROLE_STAFF:
+        return f"user:{user.pk}"
+    return f"role:{user.role}"
+
+
+def bump_list_versions(owner_ids: Iterable[int]) -> None:
+    keys = SHARED_LIST_SCOPES + [f"user:{pk}" for pk in set(owner_ids)]
+    CacheVersion.objects.bulk_create([CacheVersion(key=key) for key in keys], ignore_conflicts=True)
+    CacheVersion.objects.filter(key__in=keys).update(value=F("value") + 1)
+
+
+def touch_requests(request_ids: Iterable[int], owner_ids: Optional[Iterable[int]] = None) -> None:
+    """Invalidate cached representations after requests were changed."""
+    request_ids = list(request_ids)
+    if not request_ids:
+        return
+    if owner_ids is None:
+        owner_ids = PurchaseRequest.objects.filter(pk__in=request_ids).values_list("created_by_id", flat=True).distinct()
+    # updated_at doubles as the watermark for incremental exports
+    PurchaseRequest.objects.filter(pk__in=request_ids).update(version=F("version") + 1, updated_at=timezone.now())
+    bump_list_versions(owner_ids)
+
+
+def touch_request(pr: PurchaseRequest) -> None:
+    touch_requests([pr.pk], [pr.created_by_id])
+
+
+def list_version(user) -> int:
+    return CacheVersion.objects.filter(key=list_scope(user)).values_list("value", flat=True).first() or 0
+
+
+def _etag(*parts) -> str:
+    return '"' + hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _variant(request) -> tuple:
+    # Everything besides the data that changes the rendered bytes
+    return request.get_host(), request.get_full_path(), request.accepted_media_type
+
+
+def list_etag(request) -> str:
+    user = request.user
+    scope = list_scope(user)
+    # Approver lists also include requests the approver reviewed, so they are per user
+    owner = user.pk if user.role in User.APPROVER_ROLES else ""
+    return _etag("list", scope, owner, list_version(user), *_variant(request))
+
+
+def detail_etag(request, pk, version) -> str:
+    return _etag("detail", pk, version, *_variant(request))
+
+
+def _not_modified(request, etag: str) -> bool:
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def conditional_response(request, etag: str, render) -> Response:
+    """Answer with ``304`` when the client holds ``etag``, else a cached or freshly rendered payload."""
+    if _not_modified(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        key = f"response:{etag}"
+        data = cache.get(key)
+        if data is None:
+            response = render()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        else:
+            response = Response(data)
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,137 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+
+from django.db.models import F
+
+from ..models import ArchivedPurchaseRequest, PurchaseRequest, SpendRollup
+
+# Counters kept per rollup row, in the order used by the delta tuples below
+MEASURES = (
+    "request_count",
+    "amount",
+    "po_count",
+    "po_amount",
+    "receipt_validated_count",
+    "receipt_validated_amount",
+)
+SNAPSHOT_FIELDS = ("pk", "status", "amount", "vendor", "created_by_id", "created_at", "purchase_order_id", "receipt_validated")
+
+Key = Tuple[str, str, str]
+ZERO = Decimal("0")
+
+
+def contributions(row: dict) -> Dict[Key, tuple]:
+    """What one request (as a ``SNAPSHOT_FIELDS`` dict) adds to each rollup row."""
+    amount = row["amount"] or ZERO
+    has_po = row["purchase_order_id"] is not None
+    validated = has_po and bool(row["receipt_validated"])
+    measures = (1, amount, int(has_po), amount if has_po else ZERO, int(validated), amount if validated else ZERO)
+    status = row["status"]
+    return {
+        (SpendRollup.DIMENSION_ALL, "", status): measures,
+        (SpendRollup.DIMENSION_VENDOR, row["vendor"] or "", status): measures,
+        (SpendRollup.DIMENSION_CREATOR, str(row["created_by_id"]), status): measures,
+        (SpendRollup.DIMENSION_MONTH, row["created_at"].strftime("%Y-%m"), status): measures,
+    }
+
+
+def accumulate(rows: Iterable[dict], totals=None, sign: int = 1) -> Dict[Key, list]:
+    totals = totals if totals is not None else defaultdict(lambda: [0, ZERO, 0, ZERO, 0, ZERO])
+    for row in rows:
+        for key, measures in contributions(row).items():
+            current = totals[key]
+            for i, value in enumerate(measures):
+                current[i] += sign * value
+    return totals
+
+
+def _snapshot(request_ids, lock: bool = False) -> list:
+    if not request_ids:
+        return []
+    qs = PurchaseRequest.objects.filter(pk__in=request_ids)
+    if lock:
+        # Same lock order as PurchaseRequest._lock_for_review
+        qs = qs.select_for_update().order_by("pk")
+    return list(qs.values(*SNAPSHOT_FIELDS))
+
+
+def apply(deltas: Dict[Key, list]) -> None:
+    deltas = {key: values for key, values in deltas.items() if any(values)}
+    if not deltas:
+        return
+    SpendRollup.objects.bulk_create(
+        [SpendRollup(dimension=d, bucket=b, status=s) for d, b, s in deltas], ignore_conflicts=True
+    )
+    for (dimension, bucket, status), values in deltas.items():
+        SpendRollup.objects.filter(dimension=dimension, bucket=bucket, status=status).update(
+            **{name: F(name) + value for name, value in zip(MEASURES, values) if value}
+        )
+
+
+class RollupChange:
+    """Captures the rollup contribution of some requests before a change and applies the difference after it."""
+
+    def __init__(self, request_ids: Iterable[int] = ()):
+        self.request_ids = set(request_ids)
+        # Lock up front so no concurrent change lands between "before" and "after"
+        self.before = _snapshot(self.request_ids, lock=True)
+
+    def add(self, request_id: int) -> None:
+        """Include a request created during the change."""
+        self.request_ids.add(request_id)
+
+    def commit(self) -> None:
+        deltas = accumulate(self.before, sign=-1)
+        accumulate(_snapshot(self.request_ids), deltas)
+        apply(deltas)
+
+
+@contextmanager
+def tracking(request_ids: Iterable[int] = ()):
+    """Keep the rollups in step with whatever the block does to ``request_ids``.
+
+    Run it inside the transaction making the change so rollups and requests
+    commit together.
+    """
+    change = RollupChange(request_ids)
+    yield change
+    change.commit()
+
+
+def summary() -> dict:
+    rows = SpendRollup.objects.filter(request_count__gt=0).values("dimension", "bucket", "status", *MEASURES)
+    grouped = defaultdict(dict)
+    for row in rows:
+        entry = grouped[row["dimension"]].setdefault(
+            row["bucket"], {"key": row["bucket"], **{name: 0 for name in MEASURES}, "by_status": {}}
+        )
+        for name in MEASURES:
+            entry[name] += row[name]
+        entry["by_status"][row["status"]] = {"count": row["request_count"], "amount": row["amount"]}
+
+    def ordered(dimension, sort_key):
+        return sorted(grouped.get(dimension, {}).values(), key=sort_key)
+
+    overall = grouped.get(SpendRollup.DIMENSION_ALL, {}).get("", {name: 0 for name in MEASURES})
+    return {
+        "by_status": [
+            {"status": status, **values} for status, values in sorted(overall.get("by_status", {}).items())
+        ],
+        "by_vendor": ordered(SpendRollup.DIMENSION_VENDOR, lambda e: -e["amount"]),
+        "by_creator": ordered(SpendRollup.DIMENSION_CREATOR, lambda e: -e["amount"]),
+        "by_month": ordered(SpendRollup.DIMENSION_MONTH, lambda e: e["key"]),
+        "purchase_orders": {
+            "count": overall["po_count"],
+            "total": overall["po_amount"],
+            "receipt_validated_count": overall["receipt_validated_count"],
+            "receipt_validated_total": overall["receipt_validated_amount"],
+        },
+    }
+
+
+def compute_from_scratch(chunk_size: int = 2000) -> Dict[Key, list]:
+    # Archived requests still count towards the summary
+    totals = accumulate(PurchaseRequest.objects.values(*SNAPSHOT_FIELDS).iterator(chunk_size=chunk_size))
+    return accumulate(ArchivedPurchaseRequest.objects.values(*SNAPSHOT_FIELDS).iterator(chunk_size=chunk_size), totals)
@@ -0,0 +1,61 @@
+from decimal import Decimal
+from typing import Sequence
+
+# Synthetic proformas and receipts for seed data and load tests. No Django imports:
+# the HTTP load scripts in benchmarks/ use this without configuring settings.
+VENDORS = [
+    "ACME Supplies Ltd",
+    "Nairobi Office Mart",
+    "Kigali Tech Solutions",
+    "Lagos Print & Paper Co.",
+    "Accra Furniture Works",
+    "Boxwell Logistics",
+]
+PRODUCTS = [
+    ("Office Chair", 150),
+    ("Standing Desk", 420),
+    ("Box of pens", 6),
+    ("Paper A4 ream", 5),
+    ("Toner cartridge", 85),
+    ("Laptop 14in", 1100),
+    ("USB-C dock", 140),
+    ("Whiteboard", 60),
+    ("Extension cable 5m", 12),
+    ("Projector", 650),
+]
+
+
+def simple_pdf(lines: Sequence[str]) -> bytes:
+    """A minimal one-page PDF with ``lines`` as its text layer (Helvetica, no OCR needed)."""
+
+    def escape(line):
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    content = ("BT /F1 11 Tf 15 TL 50 800 Td " + " ".join(f"({escape(line)}) '" for line in lines) + " ET").encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+    ]
+    out, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
+
+
+def proforma_pdf(number: int, vendor: str, items) -> bytes:
+    lines = ["PROFORMA INVOICE", f"Invoice no: PF-{number}", f"Vendor: {vendor}", "Terms: Net 30"]
+    lines += [f"{item.name} - {item.quantity} x {item.unit_price:.2f}" for item in items]
+    lines.append(f"Total: {sum(item.quantity * item.unit_price for item in items):.2f}")
+    return simple_pdf(lines)
+
+
+def receipt_pdf(number: int, vendor: str, total) -> bytes:
+    return simple_pdf([vendor, f"Receipt no. R-{number}", f"Total: {Decimal(total):.2f}", "Thank you"])
@@ -0,0 +1,130 @@
+import re
+from collections import defaultdict
+from functools import reduce
+from operator import and_, or_
+from typing import Iterable, List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+
+from ..models import DocumentExtraction, PurchaseRequest, SearchDocument
+
+# Bounds the indexed document text per request (Postgres tsvectors max out at 1 MB)
+MAX_BODY_CHARS = 200_000
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_POSTGRES_SQL = """
+    SELECT d.request_id, ts_rank_cd(d.search_vector, q) AS rank
+    FROM core_searchdocument d, websearch_to_tsquery('english', %s) q
+    WHERE d.search_vector @@ q {owner} {within}
+    ORDER BY rank DESC, d.request_id DESC
+    LIMIT %s
+"""
+# bm25() is lower-is-better; columns weighted like the Postgres A/A/B/C labels.
+# The rowid is the request id, so the content table is only joined to filter by owner
+_SQLITE_SQL = """
+    SELECT f.rowid, -bm25(core_search_fts, 10.0, 10.0, 4.0, 1.0) AS rank
+    FROM core_search_fts f {join}
+    WHERE core_search_fts MATCH %s {owner} {within}
+    ORDER BY rank DESC, f.rowid DESC
+    LIMIT %s
+"""
+
+
+def index_requests(request_ids: Iterable[int]) -> None:
+    """(Re)build the search documents of the given requests from their current state."""
+    request_ids = list(request_ids)
+    if not request_ids:
+        return
+    bodies = defaultdict(list)
+    for request_id, text in (
+        DocumentExtraction.objects.filter(request_id__in=request_ids).order_by("kind").values_list("request_id", "text")
+    ):
+        bodies[request_id].append(text)
+    docs = [
+        SearchDocument(
+            request_id=pk,
+            owner_id=owner_id,
+            title=title,
+            vendor=vendor,
+            description=description,
+            body="\n".join(bodies[pk])[:MAX_BODY_CHARS],
+        )
+        for pk, owner_id, title, vendor, description in PurchaseRequest.objects.filter(pk__in=request_ids).values_list(
+            "pk", "created_by_id", "title", "vendor", "description"
+        )
+    ]
+    SearchDocument.objects.bulk_create(
+        docs,
+        update_conflicts=True,
+        unique_fields=["request"],
+        update_fields=["owner_id", "title", "vendor", "description", "body"],
+    )
+
+
+def _query_groups(text: str) -> List[List[str]]:
+    """Tokens of ``text`` as OR-ed groups of AND-ed terms; only a bare OR between terms is special."""
+    groups = [[]]
+    for token in _TOKEN_RE.findall(text):
+        if token.lower() == "or":
+            if groups[-1]:
+                groups.append([])
+            continue
+        groups[-1].append(token)
+    return [group for group in groups if group]
+
+
+def _fts5_query(text: str) -> str:
+    # Quote every token so user input can't use (or break on) FTS5 query syntax;
+    # only a bare OR between terms is kept, like websearch_to_tsquery on Postgres
+    return " OR ".join(" ".join(f'"{token}"' for token in group) for group in _query_groups(text))
+
+
+def _search_icontains(text: str, limit: int, owner_id: Optional[int], within: Optional[QuerySet]):
+    # Databases without a full-text index: unranked substring matches, newest first
+    groups = _query_groups(text)
+    if not groups:
+        return []
+
+    def term(token):
+        return reduce(or_, (Q(**{f"{field}__icontains": token}) for field in ("title", "vendor", "description", "body")))
+
+    docs = SearchDocument.objects.filter(reduce(or_, (reduce(and_, map(term, group)) for group in groups)))
+    if owner_id is not None:
+        docs = docs.filter(owner_id=owner_id)
+    if within is not None:
+        docs = docs.filter(request__in=within.values("pk"))
+    return [(request_id, 0.0) for request_id in docs.order_by("-request_id").values_list("request_id", flat=True)[:limit]]
+
+
+def search(text: str, limit: int = 50, owner_id: Optional[int] = None,
+           within: Optional[QuerySet] = None) -> List[Tuple[int, float]]:
+    """``(request_id, rank)`` pairs of the best matches for ``text``, best first.
+
+    ``owner_id`` and ``within`` (a ``PurchaseRequest`` queryset, e.g. the
+    caller's visible requests) are applied in the index query, before the
+    limit. Backends other than Postgres and SQLite fall back to unranked
+    ``icontains`` matching.
+    """
+    if connection.vendor == "postgresql":
+        sql, query, column = _POSTGRES_SQL, text, "d.request_id"
+    elif connection.vendor == "sqlite":
+        sql, query, column = _SQLITE_SQL, _fts5_query(text), "f.rowid"
+    else:
+        return _search_icontains(text, limit, owner_id, within)
+    if not query.strip():
+        return []
+    params = [query]
+    join = owner = restrict = ""
+    if owner_id is not None:
+        join = "JOIN core_searchdocument d ON d.request_id = f.rowid"
+        owner = "AND d.owner_id = %s"
+        params.append(owner_id)
+    if within is not None:
+        within_sql, within_params = within.values("pk").query.sql_with_params()
+        restrict = f"AND {column} IN ({within_sql})"
+        params.extend(within_params)
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(join=join, owner=owner, within=restrict), params)
+        return [(request_id, float(rank)) for request_id, rank in cursor.fetchall()]
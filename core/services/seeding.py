@@ -0,0 +1,166 @@
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Approval, PurchaseRequest, RequestItem, User
+from ..storage import upload_storage
+from . import response_cache, rollups, search
+from .purchase_orders import create_purchase_orders
+from .sample_documents import PRODUCTS, VENDORS, proforma_pdf, receipt_pdf
+
+SEED_ROLES = (User.ROLE_STAFF, User.ROLE_APPROVER_L1, User.ROLE_APPROVER_L2, User.ROLE_FINANCE)
+LEVEL_1, LEVEL_2 = Approval.level_bit(1), Approval.level_bit(2)
+
+
+def username(prefix: str, role: str, n: int) -> str:
+    return f"{prefix}-{role.replace('_', '-')}-{n}"
+
+
+@dataclass
+class SeedResult:
+    users: Dict[str, List[str]] = field(default_factory=dict)
+    requests: int = 0
+    items: int = 0
+    approvals: int = 0
+    purchase_orders: int = 0
+    receipts: int = 0
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+
+def seed_users(prefix: str, password: str, counts: Dict[str, int]) -> Dict[str, List[User]]:
+    """Create (or reuse) ``counts[role]`` users per role named ``<prefix>-<role>-<n>``."""
+    hashed = make_password(password)  # hashing is slow; every seeded user shares one hash
+    wanted = {role: [username(prefix, role, n) for n in range(1, counts.get(role, 0) + 1)] for role in SEED_ROLES}
+    existing = set(User.objects.filter(username__in=[u for names in wanted.values() for u in names]).values_list(
+        "username", flat=True
+    ))
+    User.objects.bulk_create(
+        [
+            User(username=name, password=hashed, role=role, email=f"{name}@example.com")
+            for role, names in wanted.items()
+            for name in names
+            if name not in existing
+        ]
+    )
+    by_name = {u.username: u for u in User.objects.filter(username__in=[u for names in wanted.values() for u in names])}
+    return {role: [by_name[name] for name in names] for role, names in wanted.items()}
+
+
+def _store(filename: str, data: bytes) -> str:
+    return upload_storage().save(filename, ContentFile(data))
+
+
+@transaction.atomic
+def _seed_batch(rng, start: int, size: int, users, days: int, max_items: int, ratios, files: bool,
+                receipt_ratio: float, result: SeedResult) -> None:
+    now = timezone.now()
+    staff, level1, level2 = users[User.ROLE_STAFF], users[User.ROLE_APPROVER_L1], users[User.ROLE_APPROVER_L2]
+    requests, items_by_request, outcomes = [], [], []
+    for n in range(start, start + size):
+        vendor = rng.choice(VENDORS)
+        items = []
+        for _ in range(rng.randint(1, max_items)):
+            name, price = rng.choice(PRODUCTS)
+            unit_price = Decimal(str(round(price * rng.uniform(0.8, 1.2), 2)))
+            items.append(RequestItem(name=name, quantity=rng.randint(1, 10), unit_price=unit_price, vendor=vendor))
+        amount = sum(item.quantity * item.unit_price for item in items)
+        outcome = rng.choices(("approved", "rejected", "partial", "pending"), weights=ratios)[0]
+        status = {"approved": PurchaseRequest.STATUS_APPROVED, "rejected": PurchaseRequest.STATUS_REJECTED}.get(
+            outcome, PurchaseRequest.STATUS_PENDING
+        )
+        levels = {"approved": LEVEL_1 | LEVEL_2, "partial": LEVEL_1}.get(outcome, 0)
+        if outcome == "rejected" and rng.random() < 0.5:
+            levels = LEVEL_1  # rejected at level 2 after a level-1 approval
+        pr = PurchaseRequest(
+            title=f"{items[0].name} for team {n % 50}",
+            description=f"Seeded request #{n}",
+            amount=amount,
+            status=status,
+            vendor=vendor,
+            approved_levels=levels,
+            created_by=rng.choice(staff),
+            created_at=now - timedelta(seconds=rng.randint(0, days * 86400)),
+        )
+        if files:
+            pr.proforma = _store(f"proforma-{n}.pdf", proforma_pdf(n, vendor, items))
+        requests.append(pr)
+        items_by_request.append(items)
+        outcomes.append(outcome)
+    PurchaseRequest.objects.bulk_create(requests)
+
+    with rollups.tracking() as change:
+        approvals, all_items = [], []
+        for pr, items, outcome in zip(requests, items_by_request, outcomes):
+            change.add(pr.pk)
+            for item in items:
+                item.request = pr
+                all_items.append(item)
+            reviewed = pr.created_at + timedelta(hours=rng.randint(1, 48))
+            if pr.approved_levels & LEVEL_1:
+                approvals.append(Approval(request=pr, approver=rng.choice(level1), level=1,
+                                          status=Approval.STATUS_APPROVED, created_at=reviewed))
+            if pr.approved_levels & LEVEL_2:
+                approvals.append(Approval(request=pr, approver=rng.choice(level2), level=2,
+                                          status=Approval.STATUS_APPROVED, created_at=reviewed + timedelta(hours=4)))
+            if outcome == "rejected":
+                level = 2 if pr.approved_levels else 1
+                approvals.append(Approval(request=pr, approver=rng.choice(level2 if level == 2 else level1),
+                                          level=level, status=Approval.STATUS_REJECTED,
+                                          comment="Over budget", created_at=reviewed + timedelta(hours=4)))
+        RequestItem.objects.bulk_create(all_items)
+        Approval.objects.bulk_create(approvals)
+
+        approved_ids = [pr.pk for pr, outcome in zip(requests, outcomes) if outcome == "approved"]
+        approved = list(PurchaseRequest.objects.filter(pk__in=approved_ids).order_by("pk").prefetch_related("items"))
+        orders = create_purchase_orders(approved)
+        receipted = []
+        for pr, po in zip(approved, orders):
+            if rng.random() < receipt_ratio:
+                pr.receipt_validated = rng.random() < 0.9
+                if files:
+                    total = po.total_amount if pr.receipt_validated else po.total_amount * Decimal("1.1")
+                    pr.receipt = _store(f"receipt-{pr.pk}.pdf", receipt_pdf(pr.pk, po.vendor, total))
+                receipted.append(pr)
+        if receipted:
+            PurchaseRequest.objects.bulk_update(receipted, ["receipt", "receipt_validated"])
+
+    search.index_requests([pr.pk for pr in requests])
+    result.requests += len(requests)
+    result.items += len(all_items)
+    result.approvals += len(approvals)
+    result.purchase_orders += len(orders)
+    result.receipts += len(receipted)
+    for pr in requests:
+        result.statuses[pr.status] = result.statuses.get(pr.status, 0) + 1
+
+
+def seed(requests: int, users: Dict[str, int], prefix: str = "seed", password: str = "seed-password",
+         days: int = 180, max_items: int = 4, ratios=(0.3, 0.1, 0.2, 0.4), files: bool = False,
+         receipt_ratio: float = 0.6, batch_size: int = 500, random_seed=None) -> SeedResult:
+    """Generate users per role and ``requests`` requests in various workflow states.
+
+    ``ratios`` weighs the outcomes (approved with a PO, rejected, approved at
+    level 1 only, pending); ``receipt_ratio`` of the approved ones get a
+    receipt. With ``files`` every request carries a synthetic proforma PDF and
+    receipted ones a receipt PDF. Rollups and the search index are kept in
+    step; no change events are emitted.
+    """
+    for role in (User.ROLE_STAFF, User.ROLE_APPROVER_L1, User.ROLE_APPROVER_L2):
+        if requests and not users.get(role):
+            raise ValueError(f"Seeding requests needs at least one {role} user.")
+    rng = random.Random(random_seed)
+    seeded = seed_users(prefix, password, users)
+    result = SeedResult(users={role: [u.username for u in role_users] for role, role_users in seeded.items()})
+    first = PurchaseRequest.objects.count() + 1
+    for start in range(first, first + requests, batch_size):
+        size = min(batch_size, first + requests - start)
+        _seed_batch(rng, start, size, seeded, days, max_items, ratios, files, receipt_ratio, result)
+    response_cache.bump_list_versions([u.pk for u in seeded[User.ROLE_STAFF]])
+    return result
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+BLOB_PREFIX = "blobs"
+_DIGEST_IN_PATH_RE = re.compile(
+    r"(?:^|[\\/])" + BLOB_PREFIX + r"[\\/][0-9a-f]{2}[\\/][0-9a-f]{2}[\\/](?P<digest>[0-9a-f]{64})(?:\.\w+)?$"
+)
+_EXTENSION_RE = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+def digest_for_path(path: str) -> Optional[str]:
+    """SHA-256 of a stored blob, read from its content-addressed name; None for other files."""
+    match = _DIGEST_IN_PATH_RE.search(str(path))
+    return match.group("digest") if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Stores every upload once, at ``blobs/ab/cd/<sha256><ext>``.
+
+    The content is hashed while it is copied into place, identical uploads
+    share one file, and ``StoredBlob`` counts the references to it:
+    ``_save`` adds one, ``delete`` drops one and removes the file with the
+    last reference. The upload's own file name is not kept (only its
+    extension, which extraction dispatches on).
+
+    A blob's file is only created or removed while its ``StoredBlob`` row is
+    locked (see ``_lock``), so an upload of the same bytes can't lose its
+    file to a concurrent delete of the last reference.
+    """
+
+    @staticmethod
+    def _lock(name, digest, size=0):
+        """The ``StoredBlob`` row of ``name``, created if missing, locked until the transaction ends.
+
+        Call inside ``transaction.atomic()``. Creating the row first makes
+        the lock cover uploads of the name that haven't committed yet.
+        """
+        from .models import StoredBlob
+
+        while True:
+            StoredBlob.objects.bulk_create([StoredBlob(name=name, digest=digest, size=size)], ignore_conflicts=True)
+            blob = StoredBlob.objects.select_for_update().filter(name=name).first()
+            # None when a concurrent remove_if_unreferenced deleted the row while we waited for it
+            if blob is not None:
+                return blob
+
+    def _save(self, name, content):
+        from .models import StoredBlob
+
+        ext = os.path.splitext(name)[1].lower()
+        if not _EXTENSION_RE.match(ext):
+            ext = ""
+        blob_dir = self.path(BLOB_PREFIX)
+        os.makedirs(blob_dir, exist_ok=True)
+
+        # Hash while copying into a temp file next to the blobs, then move it into place
+        sha, size = hashlib.sha256(), 0
+        fd, tmp_path = tempfile.mkstemp(dir=blob_dir, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    sha.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+            digest = sha.hexdigest()
+            name = f"{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+            full_path = self.path(name)
+            with transaction.atomic():
+                blob = self._lock(name, digest, size)
+                if os.path.exists(full_path):
+                    os.unlink(tmp_path)
+                else:
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(tmp_path, self.file_permissions_mode)
+                    os.replace(tmp_path, full_path)
+                StoredBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content; the same name means the same bytes
+        return name
+
+    def delete(self, name):
+        """Drop one reference; the file goes once nothing refers to it (after commit)."""
+        from .models import StoredBlob
+
+        if not name:
+            return
+        if digest_for_path(name) is None:
+            # Uploads stored before content addressing have no reference count
+            super().delete(name)
+            return
+        with transaction.atomic():
+            blob = StoredBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None or blob.ref_count == 0:
+                return
+            StoredBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") - 1)
+            if blob.ref_count == 1:
+                transaction.on_commit(lambda: self.remove_if_unreferenced(name))
+
+    def remove_if_unreferenced(self, name):
+        """Delete the file behind ``name`` and its ``StoredBlob`` row when nothing refers to it any more."""
+        from .models import StoredBlob
+
+        digest = digest_for_path(name)
+        if digest is None:
+            # Leftover temp files of interrupted uploads
+            super().delete(name)
+            return
+        with transaction.atomic():
+            # An upload of the same bytes may have taken a new reference meanwhile
+            blob = self._lock(name, digest)
+            if blob.ref_count == 0:
+                super().delete(name)
+                blob.delete()
+
+    def digest(self, name) -> Optional[str]:
+        return digest_for_path(name)
+
+    def orphaned_files(self, min_age: float = 3600):
+        """Blob files without a ``StoredBlob`` row that are older than ``min_age`` seconds."""
+        from .models import StoredBlob
+
+        root = self.path(BLOB_PREFIX)
+        cutoff = time.time() - min_age
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                if os.path.getmtime(full_path) > cutoff:
+                    continue
+                name = os.path.relpath(full_path, self.location).replace(os.sep, "/")
+                if filename.startswith(".upload-") or not StoredBlob.objects.filter(name=name).exists():
+                    yield name
+
+
+@lru_cache(maxsize=None)
+def upload_storage() -> ContentAddressedStorage:
+    """Storage of request attachments (a callable so the instance is built lazily)."""
+    return ContentAddressedStorage()
+
+
+def release(names: Iterable[str]) -> None:
+    """Give up the references of files that are no longer attached to anything."""
+    storage = upload_storage()
+    for name in names:
+        if name:
+            storage.delete(name)
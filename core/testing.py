@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+# Most queries each PurchaseRequestViewSet action may issue for one call, JWT
+# authentication included. They must not depend on the number of rows
+# involved (page size, bulk batch, items per request): growth means an N+1.
+QUERY_BUDGETS = {
+    "list": 2,
+    "retrieve": 4,
+    "create": 19,
+    "update": 23,
+    "partial_update": 19,
+    "destroy": 23,
+    "approve": 17,
+    "approve_final": 35,
+    "reject": 25,
+    "bulk_approve": 15,
+    "bulk_approve_final": 36,
+    "bulk_reject": 24,
+    "submit_receipt": 29,
+    "search": 2,
+    "summary": 2,
+    "export": 1,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_query_budget(action: str, budget: int = None, using: str = DEFAULT_DB_ALIAS):
+    """Fail if the block runs more queries than ``QUERY_BUDGETS[action]`` (or ``budget``).
+
+    Yields the ``CaptureQueriesContext``, so callers can also inspect the
+    captured queries. Works outside ``TestCase`` too: capturing forces
+    ``connection.queries`` logging on for the duration of the block.
+    """
+    limit = QUERY_BUDGETS[action] if budget is None else budget
+    with CaptureQueriesContext(connections[using]) as captured:
+        yield captured
+    if len(captured) > limit:
+        queries = "\n".join(f"  {i}. {query['sql']}" for i, query in enumerate(captured.captured_queries, 1))
+        raise QueryBudgetExceeded(f"{action}: {len(captured)} queries, budget is {limit}:\n{queries}")
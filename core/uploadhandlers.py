@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class UploadTooLarge(APIException, RequestDataTooBig):
+    # APIException: 413 from DRF views; RequestDataTooBig: 400 from plain Django views (admin)
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Uploaded file is too large."
+    default_code = "upload_too_large"
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """Reject uploads over ``MAX_UPLOAD_SIZE`` before they are buffered.
+
+    Runs ahead of Django's memory/temporary-file handlers: a declared
+    ``Content-Length`` over the limit fails before any body is read, and a
+    file that turns out larger fails at the first chunk past the limit.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.limit = settings.MAX_UPLOAD_SIZE
+        # Leave room for the multipart envelope and the other form fields
+        if content_length and content_length > self.limit + settings.DATA_UPLOAD_MAX_MEMORY_SIZE:
+            raise UploadTooLarge(f"Request body exceeds the {self.limit} byte upload limit.")
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.limit:
+            raise UploadTooLarge(f"{self.file_name} exceeds the {self.limit} byte upload limit.")
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
@@ -2,7 +2,14 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from .views import PurchaseRequestViewSet
+from .views import (
+    PurchaseRequestViewSet,
+    create_request_async,
+    prometheus_metrics,
+    request_events,
+    request_events_ticket,
+    submit_receipt_async,
+)
 
 router = DefaultRouter()
 router.register(r"requests", PurchaseRequestViewSet, basename="requests")
@@ -10,5 +17,12 @@ router.register(r"requests", PurchaseRequestViewSet, basename="requests")
 urlpatterns = [
     path("auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    # Before the router so "events" isn't taken for a request id
+    path("requests/events/", request_events, name="request_events"),
+    path("requests/events/ticket/", request_events_ticket, name="request_events_ticket"),
+    # Async variants of the upload endpoints for the ASGI deployment
+    path("async/requests/", create_request_async, name="requests_create_async"),
+    path("async/requests/<int:pk>/submit_receipt/", submit_receipt_async, name="requests_submit_receipt_async"),
+    path("metrics/", prometheus_metrics, name="metrics"),
     path("", include(router.urls)),
 ]
\ No newline at end of file
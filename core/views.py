@@ -1,101 +1,245 @@
-from django.db import transaction
-from django.utils import timezone
+import asyncio
+import contextvars
+import hmac
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.parsers import MultiPartParser, FormParser
-
-from .models import PurchaseRequest, RequestItem, Approval, PurchaseOrder, User
-from .serializers import (
-    PurchaseRequestSerializer,
-    RequestItemSerializer,
-    ApprovalSerializer,
-    PurchaseOrderSerializer,
-)
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
+
+from .authentication import issue_stream_ticket, stream_ticket_user
+from .models import PurchaseRequest, Approval, RequestEvent, User
+from .pagination import CreatedAtCursorPagination
+from .serializers import PurchaseRequestSerializer, PurchaseRequestListSerializer, BulkReviewSerializer
 from .permissions import IsApprover, IsFinance, IsStaffCanEditPending
-from .services.doc_processing import extract_proforma_metadata, generate_po_document, validate_receipt_against_po
+from .services import archive, events, exports, jobs, metrics, response_cache, rollups, search
+from .services.doc_processing import validate_receipt_against_po
+from .services.purchase_orders import create_purchase_order, create_purchase_orders
+from .storage import release
+
+
+def _changed(results):
+    """Ids whose state a bulk review actually changed."""
+    unchanged = (
+        PurchaseRequest.BULK_ALREADY_APPROVED,
+        PurchaseRequest.BULK_NOT_PENDING,
+        PurchaseRequest.BULK_NOT_FOUND,
+    )
+    return [pk for pk, outcome in results.items() if outcome not in unchanged]
+
+
+def create_request(serializer):
+    """Save a validated create serializer and fan the new request out (events, search, extraction)."""
+    with rollups.tracking() as change:
+        serializer.save()
+        instance: PurchaseRequest = serializer.instance
+        change.add(instance.pk)
+    events.emit(RequestEvent.KIND_CREATED, [instance], data={instance.pk: {"title": instance.title}})
+    search.index_requests([instance.pk])
+    # If proforma uploaded, extract metadata to populate items/vendor in the background
+    if instance.proforma:
+        instance.extraction_status = PurchaseRequest.EXTRACTION_PENDING
+        instance.save(update_fields=["extraction_status"])
+        jobs.enqueue("extract_proforma", {"request_id": instance.pk})
+    response_cache.bump_list_versions([instance.created_by_id])
+    return instance
+
+
+def store_receipt(pr: PurchaseRequest, file):
+    with transaction.atomic():
+        # Read the file being replaced under the row lock, so concurrent uploads each release the right one
+        previous = PurchaseRequest.objects.select_for_update().filter(pk=pr.pk).values_list("receipt", flat=True).first()
+        pr.receipt = file
+        pr.save(update_fields=["receipt"])
+        # The upload took a reference of its own, also when its bytes (and name) equal the previous receipt's
+        if previous:
+            release([previous])
+
+
+def receipt_po_data(pr: PurchaseRequest):
+    """What a receipt is checked against, or None while the request has no PO."""
+    if not pr.purchase_order:
+        return None
+    return {"vendor": pr.purchase_order.vendor, "total": float(pr.purchase_order.total_amount)}
+
+
+def record_receipt(pr: PurchaseRequest, validation: dict):
+    """Persist the validation outcome of a stored receipt and queue its text extraction."""
+    if pr.purchase_order_id:
+        with transaction.atomic(), rollups.tracking([pr.pk]):
+            pr.receipt_validated = bool(validation.get("matches"))
+            pr.save(update_fields=["receipt_validated"])
+            events.emit(RequestEvent.KIND_RECEIPT_VALIDATED, [pr], data={pr.pk: {"matches": pr.receipt_validated}})
+    response_cache.touch_request(pr)
+    jobs.enqueue("extract_receipt", {"request_id": pr.pk, "receipt": pr.receipt.name, "validation": validation})
 
 
 class PurchaseRequestViewSet(viewsets.ModelViewSet):
-    queryset = PurchaseRequest.objects.select_related("created_by", "purchase_order").prefetch_related("items", "approvals")
+    queryset = PurchaseRequest.objects.select_related("created_by", "purchase_order").prefetch_related(
+        "items", Prefetch("approvals", queryset=Approval.objects.select_related("approver"))
+    )
     serializer_class = PurchaseRequestSerializer
     permission_classes = [IsAuthenticated, IsStaffCanEditPending]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    pagination_class = CreatedAtCursorPagination
+
+    def get_serializer_class(self):
+        if self.action in ("list", "search"):
+            return PurchaseRequestListSerializer
+        return super().get_serializer_class()
 
     def get_queryset(self):
         user = self.request.user
-        qs = super().get_queryset()
-        if user.role == User.ROLE_STAFF:
-            return qs.filter(created_by=user)
-        if user.role in (User.ROLE_APPROVER_L1, User.ROLE_APPROVER_L2):
-            # Pending requests or ones they've reviewed
-            level = 1 if user.role == User.ROLE_APPROVER_L1 else 2
-            reviewed = qs.filter(approvals__approver=user)
-            pending = qs.filter(status=PurchaseRequest.STATUS_PENDING).exclude(approvals__level=level, approvals__status=Approval.STATUS_APPROVED)
-            return (pending | reviewed).distinct()
-        if user.role == User.ROLE_FINANCE:
-            return qs
-        return qs.none()
+        if self.action in ("list", "search"):
+            # The list representation is flat: skip the nested prefetches and wide columns
+            qs = PurchaseRequest.objects.only(*PurchaseRequestListSerializer.Meta.fields)
+        else:
+            qs = super().get_queryset()
+        return qs.filter(PurchaseRequest.visibility_q(user))
+
+    def list(self, request, *args, **kwargs):
+        # Conditional GET: the ETag is derived from the caller's list version, so an
+        # unchanged list costs one small lookup instead of a query + serialization
+        etag = response_cache.list_etag(request)
+        render = super().list
+        return response_cache.conditional_response(request, etag, lambda: render(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        version = (
+            self.get_queryset().prefetch_related(None).filter(pk=kwargs["pk"]).values_list("version", flat=True).first()
+        )
+        if version is None:
+            return self._retrieve_archived(request, kwargs["pk"]) or super().retrieve(request, *args, **kwargs)
+        etag = response_cache.detail_etag(request, kwargs["pk"], version)
+        render = super().retrieve
+        return response_cache.conditional_response(request, etag, lambda: render(request, *args, **kwargs))
+
+    def _retrieve_archived(self, request, pk):
+        """Read-through to the archive for requests moved there by ``archive_requests``; None if not found."""
+        archived = archive.visible(request.user).filter(pk=pk).first()
+        if archived is None:
+            return None
+        # Archived rows never change; the prefix keeps their tags apart from the live request's
+        etag = response_cache.detail_etag(request, pk, f"archived-{archived.version}")
+        return response_cache.conditional_response(request, etag, lambda: Response(self.get_serializer(archived).data))
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save()
-        instance: PurchaseRequest = serializer.instance
-        # If proforma uploaded, extract metadata to populate items/vendor
-        if instance.proforma:
-            meta = extract_proforma_metadata(instance.proforma.path)
-            if meta.get("vendor"):
-                # add vendor and items if not provided
-                for item in meta.get("items", []):
-                    RequestItem.objects.create(
-                        request=instance,
-                        name=item.get("name", "Item"),
-                        quantity=item.get("quantity", 1),
-                        unit_price=item.get("unit_price", 0),
-                        vendor=meta.get("vendor", ""),
-                    )
-                instance.amount = sum(i.total_price for i in instance.items.all())
-                instance.save(update_fields=["amount"])
+        create_request(serializer)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        with rollups.tracking([serializer.instance.pk]):
+            serializer.save()
+        search.index_requests([serializer.instance.pk])
+        response_cache.touch_request(serializer.instance)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        owner_id = instance.created_by_id
+        files = [instance.proforma.name, instance.receipt.name]
+        exports.record_request_deletions([instance.pk])
+        with rollups.tracking([instance.pk]):
+            instance.delete()
+        release(files)
+        response_cache.bump_list_versions([owner_id])
 
     @action(detail=True, methods=["patch"], permission_classes=[IsAuthenticated, IsApprover])
     def approve(self, request, pk=None):
         pr = self.get_object()
         try:
-            with transaction.atomic():
+            with transaction.atomic(), rollups.tracking([pr.pk]):
+                levels_before = pr.approved_levels
                 pr.approve(request.user)
+                if pr.approved_levels != levels_before:
+                    events.emit(RequestEvent.KIND_APPROVED, [pr], level=Approval.level_for_role(request.user.role))
                 # If approved overall and no PO yet, generate PO
                 if pr.status == PurchaseRequest.STATUS_APPROVED and not pr.purchase_order:
-                    # naive PO number
-                    po_number = f"PO-{pr.pk}-{int(timezone.now().timestamp())}"
-                    data = {
-                        "vendor": pr.items.first().vendor if pr.items.exists() else "",
-                        "items": [
-                            {"name": i.name, "quantity": i.quantity, "unit_price": float(i.unit_price)} for i in pr.items.all()
-                        ],
-                        "total": float(pr.amount),
-                        "terms": "Net 30",
-                    }
-                    doc_path = generate_po_document(po_number, data, settings.MEDIA_ROOT / "purchase_orders")
-                    po = PurchaseOrder.objects.create(number=po_number, vendor=data["vendor"], terms=data["terms"], total_amount=pr.amount)
-                    # attach file path
-                    relative = doc_path.relative_to(settings.MEDIA_ROOT)
-                    po.document.name = str(relative)
-                    po.save()
-                    pr.purchase_order = po
-                    pr.save(update_fields=["purchase_order"])
+                    po = create_purchase_order(pr)
+                    events.emit(RequestEvent.KIND_PO_GENERATED, [pr], data={pr.pk: {"number": po.number}})
+                response_cache.touch_request(pr)
         except Exception as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(self.get_serializer(pr).data)
 
+    def _bulk_review_response(self, results):
+        return Response({"results": [{"id": pk, "result": outcome} for pk, outcome in results.items()]})
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[IsAuthenticated, IsApprover],
+        parser_classes=[JSONParser, FormParser, MultiPartParser],
+    )
+    def bulk_approve(self, request):
+        serializer = BulkReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic(), rollups.tracking(serializer.validated_data["ids"]):
+                results = PurchaseRequest.bulk_approve(request.user, serializer.validated_data["ids"])
+                changed = _changed(results)
+                events.emit_for_ids(RequestEvent.KIND_APPROVED, changed, level=Approval.level_for_role(request.user.role))
+                completed = [pk for pk, outcome in results.items() if outcome == PurchaseRequest.BULK_APPROVED]
+                if completed:
+                    approved = list(PurchaseRequest.objects.filter(pk__in=completed).prefetch_related("items"))
+                    orders = create_purchase_orders(approved)
+                    events.emit(
+                        RequestEvent.KIND_PO_GENERATED,
+                        approved,
+                        data={pr.pk: {"number": po.number} for pr, po in zip(approved, orders)},
+                    )
+                response_cache.touch_requests(changed)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._bulk_review_response(results)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[IsAuthenticated, IsApprover],
+        parser_classes=[JSONParser, FormParser, MultiPartParser],
+    )
+    def bulk_reject(self, request):
+        serializer = BulkReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic(), rollups.tracking(serializer.validated_data["ids"]):
+                results = PurchaseRequest.bulk_reject(
+                    request.user, serializer.validated_data["ids"], serializer.validated_data.get("reason", "")
+                )
+                changed = _changed(results)
+                events.emit_for_ids(RequestEvent.KIND_REJECTED, changed, level=Approval.level_for_role(request.user.role))
+                response_cache.touch_requests(changed)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._bulk_review_response(results)
+
     @action(detail=True, methods=["patch"], permission_classes=[IsAuthenticated, IsApprover])
     def reject(self, request, pk=None):
         pr = self.get_object()
         reason = request.data.get("reason", "")
         try:
-            with transaction.atomic():
+            with transaction.atomic(), rollups.tracking([pr.pk]):
                 pr.reject(request.user, reason)
+                events.emit(RequestEvent.KIND_REJECTED, [pr], level=Approval.level_for_role(request.user.role))
+                response_cache.touch_request(pr)
         except Exception as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response(self.get_serializer(pr).data)
@@ -103,18 +247,286 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated], parser_classes=[MultiPartParser, FormParser])
     def submit_receipt(self, request, pk=None):
         pr = self.get_object()
-        if pr.created_by != request.user:
+        if pr.created_by_id != request.user.pk:
             return Response({"detail": "Only the creator can submit a receipt."}, status=status.HTTP_403_FORBIDDEN)
         file = request.data.get("receipt")
         if not file:
             return Response({"detail": "No receipt file provided."}, status=status.HTTP_400_BAD_REQUEST)
-        pr.receipt = file
-        pr.save(update_fields=["receipt"])
+        store_receipt(pr, file)
         validation = {}
-        if pr.purchase_order:
-            po_data = {
-                "vendor": pr.purchase_order.vendor,
-                "total": float(pr.purchase_order.total_amount),
-            }
+        po_data = receipt_po_data(pr)
+        if po_data:
             validation = validate_receipt_against_po(pr.receipt.path, po_data)
-        return Response({"request": self.get_serializer(pr).data, "validation": validation})
\ No newline at end of file
+        record_receipt(pr, validation)
+        return Response({"request": self.get_serializer(pr).data, "validation": validation})
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """Full-text search over title, description, vendor and extracted document text, best match first."""
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            return Response({"detail": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+        except ValueError:
+            return Response({"detail": "'limit' must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        user = request.user
+        # Visibility is applied in the index query, before its limit: staff through the
+        # indexed owner column, approvers through their queue and review history
+        if user.role == User.ROLE_STAFF:
+            ranks = dict(search.search(text, limit, owner_id=user.pk))
+        elif user.role == User.ROLE_FINANCE:
+            ranks = dict(search.search(text, limit))
+        else:
+            visible_requests = PurchaseRequest.objects.filter(PurchaseRequest.visibility_q(user))
+            ranks = dict(search.search(text, limit, within=visible_requests))
+        visible = {pr.pk: pr for pr in self.get_queryset().filter(pk__in=ranks)}
+        ordered = [visible[pk] for pk in ranks if pk in visible][:limit]
+        data = self.get_serializer(ordered, many=True).data
+        for row, pr in zip(data, ordered):
+            row["rank"] = ranks[pr.pk]
+        return Response({"results": data})
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated, IsFinance])
+    def summary(self, request):
+        """Spend totals by status, vendor, creator and month, read from the rollup table."""
+        return Response(rollups.summary())
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated, IsFinance])
+    def export(self, request):
+        """Stream a full or incremental dump of one table as CSV or NDJSON."""
+        entity = request.query_params.get("entity", "requests")
+        output = request.query_params.get("output", exports.FORMAT_CSV)
+        try:
+            # ``until`` bounds this export; pass it as ``since`` next time to only get what changed
+            since, until = exports.export_window(exports.parse_watermark(request.query_params.get("since")))
+            lines = exports.render(entity, output, since=since, until=until)
+        except exports.ExportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(lines, content_type=exports.CONTENT_TYPES[output])
+        response["Content-Disposition"] = f'attachment; filename="{entity}.{output}"'
+        response["X-Export-Watermark"] = exports.format_watermark(until)
+        return response
+
+
+def _api_request(request, parsers=()) -> Request:
+    """Wrap a plain Django request for the views below that run outside DRF's (sync) view machinery."""
+    return Request(
+        request,
+        parsers=[parser() for parser in parsers],
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+
+
+def _authenticate(drf_request: Request):
+    try:
+        user = drf_request.user
+    except Exception:
+        return None
+    return user if user and user.is_authenticated else None
+
+
+def _sse(event) -> str:
+    payload = json.dumps(event, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return f"id: {event['id']}\nevent: {event['kind']}\ndata: {payload}\n\n"
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def request_events_ticket(request):
+    """Short-lived ticket for ``GET /api/requests/events/?ticket=`` (``EventSource`` can't send headers)."""
+    return Response({"ticket": issue_stream_ticket(request.user), "expires_in": settings.EVENTS_TICKET_TTL})
+
+
+async def request_events(request):
+    """Server-Sent Events stream of request changes visible to the caller.
+
+    Authenticates with the Authorization header or a ``?ticket=`` from
+    ``request_events_ticket``. Resumes after ``Last-Event-ID`` (or
+    ``?last_event_id=``); without one it starts with the next change. The
+    stream ends after ``EVENTS_STREAM_MAX_SECONDS`` and the browser
+    reconnects where it left off.
+
+    Under WSGI the stream is a plain generator capped at
+    ``EVENTS_WSGI_STREAM_SECONDS``: each open stream holds a worker thread,
+    and WSGI servers would buffer an async one until it ended.
+    """
+    ticket = request.GET.get("ticket")
+    if ticket:
+        user = await sync_to_async(stream_ticket_user)(ticket)
+    else:
+        user = await sync_to_async(_authenticate)(_api_request(request))
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        return JsonResponse({"detail": "Last-Event-ID must be an integer."}, status=400)
+    if last_id is None:
+        last_id = await RequestEvent.objects.order_by("-pk").values_list("pk", flat=True).afirst() or 0
+
+    def sync_stream():
+        nonlocal last_id
+        deadline = time.monotonic() + min(settings.EVENTS_STREAM_MAX_SECONDS, settings.EVENTS_WSGI_STREAM_SECONDS)
+        heartbeat = time.monotonic() + settings.EVENTS_HEARTBEAT_SECONDS
+        yield f"retry: {int(settings.EVENTS_RETRY_MS)}\n\n"
+        while time.monotonic() < deadline:
+            batch = list(events.visible_events(user, last_id))
+            for event in batch:
+                last_id = event["id"]
+                yield _sse(event)
+            if batch:
+                continue
+            if time.monotonic() >= heartbeat:
+                heartbeat = time.monotonic() + settings.EVENTS_HEARTBEAT_SECONDS
+                yield ": keep-alive\n\n"
+            # Runs after the request cycle closed its connection; don't keep one open across the sleeps
+            close_old_connections()
+            time.sleep(settings.EVENTS_POLL_INTERVAL)
+
+    async def stream():
+        nonlocal last_id
+        deadline = time.monotonic() + settings.EVENTS_STREAM_MAX_SECONDS
+        heartbeat = time.monotonic() + settings.EVENTS_HEARTBEAT_SECONDS
+        yield f"retry: {int(settings.EVENTS_RETRY_MS)}\n\n"
+        while time.monotonic() < deadline:
+            batch = [event async for event in events.visible_events(user, last_id)]
+            for event in batch:
+                last_id = event["id"]
+                yield _sse(event)
+            if batch:
+                continue
+            if time.monotonic() >= heartbeat:
+                heartbeat = time.monotonic() + settings.EVENTS_HEARTBEAT_SECONDS
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(settings.EVENTS_POLL_INTERVAL)
+
+    asgi = isinstance(request, ASGIRequest)
+    response = StreamingHttpResponse(stream() if asgi else sync_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Keep reverse proxies (nginx) from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+# Async (ASGI) variants of the upload endpoints. Database work goes through the
+# async ORM or sync_to_async; PDF parsing and OCR run on a thread pool so the
+# event loop keeps serving other requests while a document is being read.
+
+_document_executor = None
+_document_executor_lock = threading.Lock()
+
+
+def document_executor() -> ThreadPoolExecutor:
+    global _document_executor
+    with _document_executor_lock:
+        if _document_executor is None:
+            _document_executor = ThreadPoolExecutor(
+                max_workers=settings.DOCUMENT_EXECUTOR_WORKERS, thread_name_prefix="documents"
+            )
+        return _document_executor
+
+
+def _document_task(func, *args):
+    try:
+        return func(*args)
+    finally:
+        # Executor threads outlive the request; don't leave their connections open
+        close_old_connections()
+
+
+def _error(detail, status_code):
+    return JsonResponse({"detail": str(detail)}, status=status_code)
+
+
+async def _authenticated_request(request, parsers=()):
+    """``(drf_request, error_response)`` for a POST to one of the async endpoints."""
+    if request.method != "POST":
+        return None, _error(f'Method "{request.method}" not allowed.', 405)
+    drf_request = _api_request(request, parsers)
+    if await sync_to_async(_authenticate)(drf_request) is None:
+        return None, _error("Authentication credentials were not provided.", 401)
+    return drf_request, None
+
+
+async def _request_data(drf_request: Request):
+    # Multipart parsing writes large files to temporary files; keep it off the loop
+    return await sync_to_async(lambda: drf_request.data)()
+
+
+def _create_response(serializer):
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    with transaction.atomic():
+        create_request(serializer)
+    return JsonResponse(serializer.data, status=201)
+
+
+@csrf_exempt
+async def create_request_async(request):
+    """``POST /api/async/requests/``: same contract as ``POST /api/requests/``."""
+    drf_request, error = await _authenticated_request(request, PurchaseRequestViewSet.parser_classes)
+    if error:
+        return error
+    try:
+        data = await _request_data(drf_request)
+    except APIException as e:
+        return _error(e.detail, e.status_code)
+    serializer = PurchaseRequestSerializer(data=data, context={"request": drf_request})
+    return await sync_to_async(_create_response)(serializer)
+
+
+@csrf_exempt
+async def submit_receipt_async(request, pk):
+    """``POST /api/async/requests/{id}/submit_receipt/``: same contract as the sync action."""
+    drf_request, error = await _authenticated_request(request, (MultiPartParser, FormParser))
+    if error:
+        return error
+    user = drf_request.user
+    pr = (
+        await PurchaseRequest.objects.select_related("purchase_order")
+        .filter(PurchaseRequest.visibility_q(user), pk=pk)
+        .afirst()
+    )
+    if pr is None:
+        return _error("No PurchaseRequest matches the given query.", 404)
+    if pr.created_by_id != user.pk:
+        return _error("Only the creator can submit a receipt.", 403)
+    try:
+        data = await _request_data(drf_request)
+    except APIException as e:
+        return _error(e.detail, e.status_code)
+    file = data.get("receipt")
+    if not file:
+        return _error("No receipt file provided.", 400)
+
+    await sync_to_async(store_receipt)(pr, file)
+    validation = {}
+    po_data = receipt_po_data(pr)
+    if po_data:
+        # Run in a copy of this context so the document time lands in this request's Server-Timing
+        validation = await asyncio.get_running_loop().run_in_executor(
+            document_executor(),
+            contextvars.copy_context().run,
+            _document_task,
+            validate_receipt_against_po,
+            pr.receipt.path,
+            po_data,
+        )
+    await sync_to_async(record_receipt)(pr, validation)
+
+    pr = await PurchaseRequestViewSet.queryset.aget(pk=pr.pk)
+    serializer = PurchaseRequestSerializer(pr, context={"request": drf_request})
+    return JsonResponse({"request": await sync_to_async(lambda: serializer.data)(), "validation": validation})
+
+
+def prometheus_metrics(request):
+    """Per-endpoint request, query and phase timings of this process, in the Prometheus text format."""
+    token = settings.METRICS_TOKEN
+    if token:
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return HttpResponse("Unauthorized", status=401, content_type="text/plain")
+    elif not settings.DEBUG:
+        raise Http404
+    return HttpResponse(metrics.registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,34 @@
+"""gunicorn settings, read from the working directory by every ``gunicorn`` command.
+
+The app is loaded once in the master process and the workers are forked from
+it (``preload_app``), sharing the imported code copy-on-write instead of each
+importing it again: workers start faster and use less memory. The worker class
+comes from the command line (see the Dockerfile's ``SERVER_PROFILE``); the
+number of workers from ``WEB_CONCURRENCY``.
+"""
+import os
+
+
+def _flag(name: str, default: str = "true") -> bool:
+    return os.getenv(name, default).lower() == "true"
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+preload_app = _flag("GUNICORN_PRELOAD")
+
+
+def on_starting(server):
+    # Metrics files are per worker pid; start every server from zero
+    directory = os.getenv("METRICS_DIR")
+    if directory and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith((".json", ".tmp")):
+                os.unlink(os.path.join(directory, name))
+
+
+def when_ready(server):
+    # Runs in the master after the app was loaded and before any worker is forked
+    if server.cfg.preload_app:
+        from config.warmup import warm_up
+
+        warm_up(document_libraries=_flag("GUNICORN_PRELOAD_DOCUMENT_LIBS"))